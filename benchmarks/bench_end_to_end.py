@@ -0,0 +1,280 @@
+"""
+End-to-End Pipeline Benchmark
+
+Runs APIExtractor, IncrementalExtractor, ResponseTransformer and
+DatabaseLoader against the local mock API (benchmarks/mock_api.py) and a
+temporary SQLite database, and records records/s, p50/p99 request latency
+and peak RSS per stage. Results are saved as JSON so runs of different
+versions can be compared.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --records 50000 --latency 0.002
+    python benchmarks/bench_end_to_end.py --rate-limit-ratio 0.05 --compress --payload-bytes 512
+    python benchmarks/bench_end_to_end.py --compact  # records as RecordBatches
+    python benchmarks/bench_end_to_end.py --compare benchmarks/results/end_to_end-v1.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from benchmarks.mock_api import MockAPIServer, timestamp_of
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+from src.extractors.incremental_extractor import IncrementalExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.transformers.response_transformer import ResponseTransformer
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+
+STAGES = ('extract', 'incremental', 'transform', 'load')
+
+
+def percentile(values: List[float], share: float) -> Optional[float]:
+    """Nearest-rank percentile, or None without values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(share * len(ordered))) - 1))]
+
+
+def current_rss() -> int:
+    """Resident set size of this process in bytes"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        # No /proc (e.g. macOS): fall back to the lifetime peak
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class RSSSampler:
+    """Track the peak RSS while a stage runs by sampling from a thread"""
+    
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def __enter__(self) -> 'RSSSampler':
+        self.peak = current_rss()
+        self._thread = threading.Thread(target=self._sample, name='rss-sampler', daemon=True)
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss())
+    
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, current_rss())
+
+
+class LatencyRecorder:
+    """Client hooks collecting request latencies and retries"""
+    
+    def __init__(self, client: RESTClient):
+        self.latencies: List[float] = []
+        self.retries = 0
+        client.add_hook('after_response', self._after_response)
+        client.add_hook('on_retry', self._on_retry)
+    
+    def _after_response(self, event):
+        if event.timing is not None:
+            self.latencies.append(event.timing.total)
+    
+    def _on_retry(self, event):
+        self.retries += 1
+    
+    def reset(self):
+        self.latencies = []
+        self.retries = 0
+
+
+def run_stage(name: str, func, recorder: Optional[LatencyRecorder] = None) -> Dict[str, Any]:
+    """Run one stage and measure it; func returns the number of records processed"""
+    if recorder is not None:
+        recorder.reset()
+    with RSSSampler() as rss:
+        start = time.perf_counter()
+        records = func()
+        elapsed = time.perf_counter() - start
+    
+    result = {
+        'records': records,
+        'seconds': round(elapsed, 4),
+        'records_per_second': round(records / elapsed, 1) if elapsed else None,
+        'peak_rss_mb': round(rss.peak / 2 ** 20, 1)
+    }
+    if recorder is not None:
+        p50 = percentile(recorder.latencies, 0.50)
+        p99 = percentile(recorder.latencies, 0.99)
+        result.update({
+            'requests': len(recorder.latencies),
+            'retries': recorder.retries,
+            'latency_p50_ms': round(p50 * 1000, 2) if p50 is not None else None,
+            'latency_p99_ms': round(p99 * 1000, 2) if p99 is not None else None
+        })
+    print(
+        f"  {name:<12} {result['records']:>9} records {elapsed:8.2f}s "
+        f"{result['records_per_second'] or 0:>12,.0f} records/s  peak RSS {result['peak_rss_mb']:7.1f} MB"
+        + (f"  p50 {result['latency_p50_ms']}ms p99 {result['latency_p99_ms']}ms"
+           f"  retries {result['retries']}" if recorder is not None else '')
+    )
+    return result
+
+
+def git_revision() -> Optional[str]:
+    """Short commit of the working tree, with -dirty for local changes"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(args, workdir: str) -> Dict[str, Any]:
+    """Run every stage against a fresh mock API and return the results"""
+    server = MockAPIServer(
+        records=args.records,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+        payload_bytes=args.payload_bytes,
+        compress=args.compress,
+        max_page_size=max(args.page_size, 1000)
+    )
+    url = args.url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    stages: Dict[str, Dict[str, Any]] = {}
+    data: Dict[str, List[Dict[str, Any]]] = {}
+    
+    with server:
+        client = RESTClient(server.base_url, max_retries=args.max_retries, backoff_factor=0.01, log_every=0)
+        recorder = LatencyRecorder(client)
+        
+        def extract():
+            data['raw'] = APIExtractor(client).extract(
+                'records', pagination=True, page_size=args.page_size, compact=args.compact
+            )
+            return len(data['raw'])
+        
+        def incremental():
+            # Start from a watermark halfway through, so half the records are new
+            state_file = os.path.join(workdir, 'last_sync.json')
+            with open(state_file, 'w') as f:
+                json.dump({'last_sync': timestamp_of(args.records // 2).isoformat()}, f)
+            extractor = IncrementalExtractor(client, last_sync_file=state_file)
+            return len(extractor.extract_incremental('records', compact=args.compact))
+        
+        def transform():
+            data['transformed'] = ResponseTransformer().transform(data.pop('raw'))
+            return len(data['transformed'])
+        
+        def load():
+            loader = DatabaseLoader(url)
+            try:
+                return loader.load(data.pop('transformed'), 'bench_records', load_mode='replace')['records_loaded']
+            finally:
+                loader._get_engine().dispose()
+        
+        print(f"Benchmarking {args.records} records, page size {args.page_size} against {server.base_url}")
+        stages['extract'] = run_stage('extract', extract, recorder)
+        stages['incremental'] = run_stage('incremental', incremental, recorder)
+        stages['transform'] = run_stage('transform', transform)
+        stages['load'] = run_stage('load', load)
+    
+    return {
+        'benchmark': 'end_to_end',
+        'revision': git_revision(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'config': {
+            'records': args.records,
+            'page_size': args.page_size,
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'rate_limit_ratio': args.rate_limit_ratio,
+            'payload_bytes': args.payload_bytes,
+            'compress': args.compress,
+            'compact': args.compact,
+            'sink': url.split('://')[0]
+        },
+        'server': {
+            'requests': server.requests_served,
+            'rate_limited': server.rate_limited,
+            'bytes_sent': server.bytes_sent
+        },
+        'stages': stages
+    }
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any]):
+    """Print throughput and memory of each stage relative to a baseline run"""
+    print(f"Compared with {baseline.get('revision') or 'baseline'} ({baseline.get('timestamp')}):")
+    if baseline.get('config') != result['config']:
+        print("  warning: the runs used different configurations")
+    for stage in STAGES:
+        new, old = result['stages'].get(stage), baseline.get('stages', {}).get(stage)
+        if not new or not old or not old.get('records_per_second'):
+            continue
+        speedup = (new['records_per_second'] or 0) / old['records_per_second']
+        print(
+            f"  {stage:<12} {old['records_per_second']:>12,.0f} -> {new['records_per_second'] or 0:>12,.0f} "
+            f"records/s ({speedup:5.2f}x)  peak RSS {old['peak_rss_mb']:.1f} -> {new['peak_rss_mb']:.1f} MB"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=20000)
+    parser.add_argument('--page-size', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra seconds per response, up to this')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='share of requests answered 429')
+    parser.add_argument('--payload-bytes', type=int, default=0, help='padding characters per record')
+    parser.add_argument('--compress', action='store_true', help='gzip responses')
+    parser.add_argument('--compact', action='store_true', help='pass records as RecordBatches')
+    parser.add_argument('--max-retries', type=int, default=10)
+    parser.add_argument('--url', help='database URL (defaults to a temporary SQLite file)')
+    parser.add_argument('--output', help='results file (defaults to benchmarks/results/end_to_end-<revision>.json)')
+    parser.add_argument('--compare', help='results file of an earlier run to compare with')
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(level=logging.WARNING)
+    with tempfile.TemporaryDirectory() as workdir:
+        result = run_benchmark(args, workdir)
+    
+    output = args.output or os.path.join(RESULTS_DIR, f"end_to_end-{result['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved results to {output}")
+    
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+    return result
+
+
+if __name__ == '__main__':
+    main()
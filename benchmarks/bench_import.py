@@ -0,0 +1,75 @@
+"""
+Import Time Benchmark
+
+Measures the cold import time of the package's entry points in fresh
+interpreters and lists the heavy dependencies each one loads.
+
+Usage:
+    python benchmarks/bench_import.py --runs 10
+    python benchmarks/bench_import.py --max-seconds 0.5  # exit 1 if slower
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    'import src',
+    'from src import RESTClient',
+    'from src import APIExtractor',
+    'from src import ResponseTransformer',
+    'from src import DatabaseLoader',
+    'from src import OAuthClient',
+]
+
+HEAVY_MODULES = ('pandas', 'sqlalchemy', 'requests_oauthlib', 'dateutil', 'yaml', 'pyarrow')
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+exec({statement!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'heavy': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, runs: int):
+    """Import in fresh interpreters and return (median seconds, heavy modules loaded)"""
+    timings = []
+    heavy = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output)
+        timings.append(result['seconds'])
+        heavy = result['heavy']
+    return statistics.median(timings), heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per target')
+    parser.add_argument('--max-seconds', type=float, help="fail if 'from src import RESTClient' is slower")
+    args = parser.parse_args()
+    
+    print(f"Median import time over {args.runs} runs")
+    results = {}
+    for statement in TARGETS:
+        seconds, heavy = measure(statement, args.runs)
+        results[statement] = seconds
+        print(f"  {statement:<38} {seconds * 1000:8.1f} ms  {', '.join(heavy) or '-'}")
+        
+    if args.max_seconds is not None and results['from src import RESTClient'] > args.max_seconds:
+        print(f"RESTClient import exceeds {args.max_seconds}s")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
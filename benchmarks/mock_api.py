@@ -0,0 +1,282 @@
+"""
+Mock REST API
+
+Local, configurable API server for benchmarks and tests. GET /records
+serves deterministic synthetic records with page pagination
+(?page=&per_page=) or cursor pagination (?cursor=&limit=), and can add
+latency, answer a share of requests with 429, pad records to a payload
+size and gzip responses.
+
+Usage:
+    python benchmarks/mock_api.py --records 100000 --latency 0.005 --rate-limit-ratio 0.02
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# updated_at of record 0; each following record is one second later
+BASE_TIMESTAMP = datetime(2024, 1, 1)
+
+CITIES = ('Berlin', 'Lisbon', 'Osaka', 'Toronto', 'Nairobi', 'Lima')
+
+
+def make_record(index: int, payload_bytes: int = 0) -> Dict[str, Any]:
+    """Build the record with the given index"""
+    record = {
+        'id': index,
+        'name': f'customer-{index}',
+        'email': f'customer-{index}@example.com',
+        'amount': round(index * 1.25, 2),
+        'active': index % 3 != 0,
+        'updated_at': (BASE_TIMESTAMP + timedelta(seconds=index)).isoformat(),
+        'address': {'city': CITIES[index % len(CITIES)], 'zip': f'{index % 100000:05d}'}
+    }
+    if payload_bytes:
+        record['notes'] = 'x' * payload_bytes
+    return record
+
+
+def timestamp_of(index: int) -> datetime:
+    """updated_at of the record with the given index"""
+    return BASE_TIMESTAMP + timedelta(seconds=index)
+
+
+def _encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(f'offset:{offset}'.encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()).decode().split(':', 1)[1])
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+class MockAPIServer:
+    """Threaded HTTP server serving synthetic paginated records"""
+    
+    def __init__(
+        self,
+        records: int = 10000,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_limit_ratio: float = 0.0,
+        payload_bytes: int = 0,
+        compress: bool = False,
+        max_page_size: int = 1000,
+        seed: int = 0,
+        host: str = '127.0.0.1',
+        port: int = 0
+    ):
+        """
+        Initialize mock API server
+        
+        Args:
+            records: Number of records the API holds
+            latency: Seconds added to every response
+            jitter: Up to this many seconds added at random on top of latency
+            rate_limit_ratio: Share of requests answered with 429 (Retry-After: 0)
+            payload_bytes: Characters of padding added to every record
+            compress: gzip bodies for clients sending Accept-Encoding: gzip
+            max_page_size: Largest per_page/limit honoured
+            seed: Seed for jitter and 429 injection, so runs are repeatable
+            host: Interface to bind
+            port: Port to listen on (0 picks a free port)
+        """
+        self.records = records
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit_ratio = rate_limit_ratio
+        self.payload_bytes = payload_bytes
+        self.compress = compress
+        self.max_page_size = max_page_size
+        self.host = host
+        self.port = port
+        self.requests_served = 0
+        self.rate_limited = 0
+        self.bytes_sent = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+    
+    @property
+    def base_url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("Mock API server is not running")
+        return f"http://{self.host}:{self._server.server_address[1]}"
+    
+    def start(self) -> str:
+        """
+        Start serving from a background thread
+        
+        Returns:
+            Base URL of the API
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='mock-api', daemon=True).start()
+        logger.info(f"Mock API serving {self.records} records on {self.base_url}")
+        return self.base_url
+    
+    def stop(self):
+        """Stop the server"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self) -> 'MockAPIServer':
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+    
+    def _draw(self) -> Tuple[bool, float]:
+        """Decide whether to rate limit a request and how long to delay it"""
+        with self._lock:
+            self.requests_served += 1
+            limited = self._random.random() < self.rate_limit_ratio
+            if limited:
+                self.rate_limited += 1
+            delay = self.latency + (self._random.random() * self.jitter if self.jitter else 0.0)
+        return limited, delay
+    
+    def _first_index(self, query: Dict[str, List[str]]) -> int:
+        """First record index matching an updated_at_gte filter"""
+        since = query.get('updated_at_gte')
+        if not since:
+            return 0
+        delta = (datetime.fromisoformat(since[0].replace('Z', '')) - BASE_TIMESTAMP).total_seconds()
+        return max(0, math.ceil(delta))
+    
+    def page(self, query: Dict[str, List[str]]) -> Dict[str, Any]:
+        """
+        Build the response payload for a query
+        
+        Args:
+            query: Parsed query string
+        
+        Returns:
+            Page payload with 'data' and pagination fields
+        """
+        first = self._first_index(query)
+        available = max(0, self.records - first)
+        
+        if 'cursor' in query or 'limit' in query:
+            limit = min(int(query.get('limit', ['100'])[0]), self.max_page_size)
+            offset = _decode_cursor(query['cursor'][0]) if query.get('cursor', [''])[0] else 0
+            end = min(offset + limit, available)
+            return {
+                'data': [make_record(first + i, self.payload_bytes) for i in range(offset, end)],
+                'next_cursor': _encode_cursor(end) if end < available else None,
+                'has_more': end < available
+            }
+        
+        per_page = min(int(query.get('per_page', ['100'])[0]), self.max_page_size)
+        page = max(int(query.get('page', ['1'])[0]), 1)
+        offset = (page - 1) * per_page
+        end = min(offset + per_page, available)
+        total_pages = max(1, math.ceil(available / per_page))
+        return {
+            'data': [make_record(first + i, self.payload_bytes) for i in range(offset, end)],
+            'page': page,
+            'per_page': per_page,
+            'total_pages': total_pages,
+            'has_more': page < total_pages
+        }
+    
+    def _handler_class(self):
+        api = self
+        
+        class MockAPIHandler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body are separate writes; without this, Nagle's
+            # algorithm and delayed ACKs add ~40ms to small keep-alive responses
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                limited, delay = api._draw()
+                if delay:
+                    time.sleep(delay)
+                if limited:
+                    self._send(429, b'{"error": "rate limited"}', {'Retry-After': '0'})
+                    return
+                
+                url = urlsplit(self.path)
+                if url.path.rstrip('/') != '/records':
+                    self._send(404, b'{"error": "not found"}')
+                    return
+                try:
+                    payload = api.page(parse_qs(url.query))
+                except ValueError as e:
+                    self._send(400, json.dumps({'error': str(e)}).encode())
+                    return
+                
+                body = json.dumps(payload, separators=(',', ':')).encode()
+                headers = {}
+                if api.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    body = gzip.compress(body, compresslevel=1)
+                    headers['Content-Encoding'] = 'gzip'
+                self._send(200, body, headers)
+            
+            def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+                with api._lock:
+                    api.bytes_sent += len(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+        
+        return MockAPIHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random extra seconds, up to this')
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.0, help='share of requests answered 429')
+    parser.add_argument('--payload-bytes', type=int, default=0, help='padding characters per record')
+    parser.add_argument('--compress', action='store_true', help='gzip responses')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+    
+    server = MockAPIServer(
+        records=args.records,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit_ratio=args.rate_limit_ratio,
+        payload_bytes=args.payload_bytes,
+        compress=args.compress,
+        port=args.port
+    )
+    print(f"Serving {args.records} records on {server.start()}/records (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -94,8 +94,8 @@ def main():
         print("=" * 60)
         
     except Exception as e:
-        error_handler = ErrorHandler()
-        error_info = error_handler.handle_error(e, context={'endpoint': '/users'})
+        with ErrorHandler() as error_handler:
+            error_info = error_handler.handle_error(e, context={'endpoint': '/users'})
         print(f"❌ Error: {error_info['error_message']}")
         raise
 
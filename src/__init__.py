@@ -1,10 +1,19 @@
 # API Data Integration Package
+# Names are imported from their submodules on first use, so importing the
+# package does not pull in pandas, sqlalchemy or requests_oauthlib.
 
-from .clients import RESTClient, OAuthClient, BaseClient
-from .extractors import APIExtractor, IncrementalExtractor
-from .transformers import ResponseTransformer
-from .loaders import DatabaseLoader
-from .utils import RateLimiter, ErrorHandler
+from typing import TYPE_CHECKING
+
+from ._lazy import attach
+
+if TYPE_CHECKING:
+    from .clients import RESTClient, OAuthClient, BaseClient
+    from .extractors import APIExtractor, IncrementalExtractor
+    from .transformers import ResponseTransformer
+    from .loaders import DatabaseLoader
+    from .validators import SchemaValidator
+    from .pipeline import PipelineRunner
+    from .utils import RateLimiter, ErrorHandler, RecordBatch
 
 __all__ = [
     'RESTClient',
@@ -14,7 +23,24 @@ __all__ = [
     'IncrementalExtractor',
     'ResponseTransformer',
     'DatabaseLoader',
+    'SchemaValidator',
+    'PipelineRunner',
     'RateLimiter',
-    'ErrorHandler'
+    'ErrorHandler',
+    'RecordBatch'
 ]
 
+__getattr__, __dir__ = attach(__name__, {
+    'RESTClient': '.clients',
+    'OAuthClient': '.clients',
+    'BaseClient': '.clients',
+    'APIExtractor': '.extractors',
+    'IncrementalExtractor': '.extractors',
+    'ResponseTransformer': '.transformers',
+    'DatabaseLoader': '.loaders',
+    'SchemaValidator': '.validators',
+    'PipelineRunner': '.pipeline',
+    'RateLimiter': '.utils',
+    'ErrorHandler': '.utils',
+    'RecordBatch': '.utils'
+})
@@ -0,0 +1,38 @@
+"""
+Lazy Imports
+Package attributes that import their submodule on first access
+"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def attach(package: str, exports: Dict[str, str]) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    Build a package's module-level __getattr__ and __dir__
+    
+    Importing the package stays cheap; the submodule defining a name (and
+    whatever heavy dependencies it has) is imported the first time the name
+    is used, then cached in the package namespace.
+    
+    Args:
+        package: The package's __name__
+        exports: Attribute name -> relative module defining it, e.g.
+            {'RESTClient': '.rest_client'}
+    
+    Returns:
+        (__getattr__, __dir__) for the package
+    """
+    namespace = importlib.import_module(package).__dict__
+    
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(exports[name], package), name)
+        namespace[name] = value
+        return value
+    
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+    
+    return __getattr__, __dir__
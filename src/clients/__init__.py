@@ -1,8 +1,20 @@
 # API Clients Package
 
-from .base_client import BaseClient
-from .rest_client import RESTClient
-from .oauth_client import OAuthClient
+from typing import TYPE_CHECKING
 
-__all__ = ['BaseClient', 'RESTClient', 'OAuthClient']
+from .._lazy import attach
 
+if TYPE_CHECKING:
+    from .base_client import BaseClient
+    from .rest_client import RESTClient
+    from .oauth_client import OAuthClient
+    from .graphql_client import GraphQLClient
+
+__all__ = ['BaseClient', 'RESTClient', 'OAuthClient', 'GraphQLClient']
+
+__getattr__, __dir__ = attach(__name__, {
+    'BaseClient': '.base_client',
+    'RESTClient': '.rest_client',
+    'OAuthClient': '.oauth_client',
+    'GraphQLClient': '.graphql_client'
+})
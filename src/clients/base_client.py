@@ -5,13 +5,45 @@ Base class for all API clients
 
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from itertools import count
+from typing import Dict, Any, Callable, Optional
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from ..utils.metrics import default_registry
+from .hooks import (
+    HOOK_EVENTS, HookedRetry, RequestEvent, TimedHTTPAdapter,
+    mark_headers, run_hooks, start_clock, stop_clock
+)
 
 logger = logging.getLogger(__name__)
 
+REQUESTS = default_registry.counter(
+    'api_requests_total', 'API requests by method and final status code', ('method', 'status')
+)
+REQUEST_DURATION = default_registry.histogram(
+    'api_request_duration_seconds', 'API request latency including retries', ('method',)
+)
+RESPONSE_BYTES = default_registry.counter(
+    'api_response_bytes_total', 'API response body bytes', ('method',)
+)
+RETRIES = default_registry.counter(
+    'api_retries_total', 'API requests retried by the session', ('method',)
+)
+RATE_LIMITED = default_registry.counter(
+    'api_rate_limited_total', 'API responses with status 429', ('method',)
+)
+
+
+def _response_size(response: requests.Response, stream: bool) -> int:
+    """Body size, from the downloaded content or the Content-Length header"""
+    content = getattr(response, '_content', None)
+    if not stream and isinstance(content, bytes):
+        return len(content)
+    try:
+        return int(response.headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        return 0
+
 
 class BaseClient(ABC):
     """Base class for API clients"""
@@ -21,7 +53,8 @@ class BaseClient(ABC):
         base_url: str,
         timeout: int = 30,
         max_retries: int = 3,
-        backoff_factor: float = 1.0
+        backoff_factor: float = 1.0,
+        log_every: int = 1
     ):
         """
         Initialize base client
@@ -31,33 +64,64 @@ class BaseClient(ABC):
             timeout: Request timeout in seconds
             max_retries: Maximum number of retries
             backoff_factor: Backoff factor for retries
+            log_every: Log one in every log_every requests at INFO level
+                (0 to log none); failures are always logged
         """
         self.base_url = base_url.rstrip('/')
         self.timeout = timeout
+        self.log_every = log_every
+        self._request_counter = count(1)
+        self.hooks: Dict[str, list] = {name: [] for name in HOOK_EVENTS}
         self.session = self._create_session(max_retries, backoff_factor)
     
     def _create_session(self, max_retries: int, backoff_factor: float) -> requests.Session:
         """Create requests session with retry strategy"""
         session = requests.Session()
         
-        retry_strategy = Retry(
+        retry_strategy = HookedRetry(
             total=max_retries,
             backoff_factor=backoff_factor,
             status_forcelist=[429, 500, 502, 503, 504],
             allowed_methods=["HEAD", "GET", "OPTIONS", "POST", "PUT", "DELETE"]
         )
         
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        adapter = TimedHTTPAdapter(max_retries=retry_strategy)
         session.mount("http://", adapter)
         session.mount("https://", adapter)
+        session.hooks['response'].append(mark_headers)
         
         return session
     
+    def add_hook(self, event: str, callback: Callable[[RequestEvent], Any]):
+        """
+        Register a request hook
+        
+        Every hook receives the RequestEvent of the request. after_response
+        and on_error hooks see its timing (connect, time to first byte, body
+        download, total) and response size; on_retry hooks run before each
+        retry the session makes.
+        
+        Args:
+            event: 'before_request', 'after_response', 'on_retry' or 'on_error'
+            callback: Function called with the RequestEvent
+        """
+        if event not in self.hooks:
+            raise ValueError(f"Unknown hook event: {event}")
+        self.hooks[event].append(callback)
+    
+    def remove_hook(self, event: str, callback: Callable[[RequestEvent], Any]):
+        """Unregister a request hook"""
+        self.hooks[event].remove(callback)
+    
     @abstractmethod
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests"""
         pass
     
+    def _get_session(self) -> requests.Session:
+        """Get the session requests are sent with"""
+        return self.session
+    
     def _build_url(self, endpoint: str) -> str:
         """Build full URL from endpoint"""
         endpoint = endpoint.lstrip('/')
@@ -67,7 +131,8 @@ class BaseClient(ABC):
         self,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False
     ) -> requests.Response:
         """
         Make GET request
@@ -76,27 +141,12 @@ class BaseClient(ABC):
             endpoint: API endpoint
             params: Query parameters
             headers: Additional headers
+            stream: Defer downloading the body until it is read
             
         Returns:
             Response object
         """
-        url = self._build_url(endpoint)
-        request_headers = {**self._get_headers(), **(headers or {})}
-        
-        logger.info(f"GET {url}")
-        
-        try:
-            response = self.session.get(
-                url,
-                params=params,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"GET request failed: {str(e)}")
-            raise
+        return self._send('GET', endpoint, headers, stream=stream, params=params)
     
     def post(
         self,
@@ -117,24 +167,7 @@ class BaseClient(ABC):
         Returns:
             Response object
         """
-        url = self._build_url(endpoint)
-        request_headers = {**self._get_headers(), **(headers or {})}
-        
-        logger.info(f"POST {url}")
-        
-        try:
-            response = self.session.post(
-                url,
-                data=data,
-                json=json,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"POST request failed: {str(e)}")
-            raise
+        return self._send('POST', endpoint, headers, data=data, json=json)
     
     def put(
         self,
@@ -144,24 +177,7 @@ class BaseClient(ABC):
         headers: Optional[Dict[str, str]] = None
     ) -> requests.Response:
         """Make PUT request"""
-        url = self._build_url(endpoint)
-        request_headers = {**self._get_headers(), **(headers or {})}
-        
-        logger.info(f"PUT {url}")
-        
-        try:
-            response = self.session.put(
-                url,
-                data=data,
-                json=json,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"PUT request failed: {str(e)}")
-            raise
+        return self._send('PUT', endpoint, headers, data=data, json=json)
     
     def delete(
         self,
@@ -169,20 +185,66 @@ class BaseClient(ABC):
         headers: Optional[Dict[str, str]] = None
     ) -> requests.Response:
         """Make DELETE request"""
+        return self._send('DELETE', endpoint, headers)
+    
+    def _send(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[Dict[str, str]],
+        stream: bool = False,
+        **kwargs
+    ) -> requests.Response:
+        """Send a request through the session, running hooks and recording metrics"""
         url = self._build_url(endpoint)
         request_headers = {**self._get_headers(), **(headers or {})}
         
-        logger.info(f"DELETE {url}")
+        if self.log_every and next(self._request_counter) % self.log_every == 0:
+            logger.info("%s %s", method, url)
+        
+        event = RequestEvent(method, url, endpoint)
+        run_hooks(self.hooks, 'before_request', event)
+        clock = start_clock(event, lambda e: run_hooks(self.hooks, 'on_retry', e))
         
         try:
-            response = self.session.delete(
-                url,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
+            send = getattr(self._get_session(), method.lower())
+            if stream:
+                kwargs['stream'] = True
+            event.response = send(url, headers=request_headers, timeout=self.timeout, **kwargs)
+            event.response.raise_for_status()
         except requests.exceptions.RequestException as e:
-            logger.error(f"DELETE request failed: {str(e)}")
+            event.error = e
+            if event.response is None:
+                event.response = getattr(e, 'response', None)
+            self._finish(event, clock, stream)
+            logger.error("%s request failed: %s", method, e)
+            run_hooks(self.hooks, 'on_error', event)
             raise
-
+        finally:
+            stop_clock()
+            
+        self._finish(event, clock, stream)
+        run_hooks(self.hooks, 'after_response', event)
+        return event.response
+    
+    def _finish(self, event: RequestEvent, clock, stream: bool):
+        """Fill in the event's timing and size and record request metrics"""
+        event.timing = clock.timing(stream)
+        method, response = event.method, event.response
+        REQUEST_DURATION.labels(method).observe(event.timing.total)
+        if response is None:
+            REQUESTS.labels(method, 'error').inc()
+            return
+            
+        status = event.status_code
+        event.response_size = _response_size(response, stream)
+        REQUESTS.labels(method, status).inc()
+        RESPONSE_BYTES.labels(method).inc(event.response_size)
+        
+        rate_limited = status == 429
+        retries = getattr(getattr(response, 'raw', None), 'retries', None)
+        if isinstance(retries, Retry) and retries.history:
+            RETRIES.labels(method).inc(len(retries.history))
+            rate_limited += sum(1 for attempt in retries.history if attempt.status == 429)
+        if rate_limited:
+            RATE_LIMITED.labels(method).inc(rate_limited)
@@ -0,0 +1,308 @@
+"""
+GraphQL API Client
+GraphQL client with query batching, persisted queries and cursor pagination
+"""
+
+import hashlib
+import logging
+import re
+from typing import Dict, Any, Iterator, List, NamedTuple, Optional, Sequence
+from .base_client import BaseClient
+
+logger = logging.getLogger(__name__)
+
+# Error code or message of a persisted query hash the server does not know
+PERSISTED_QUERY_NOT_FOUND = 'PERSISTED_QUERY_NOT_FOUND'
+
+_VARIABLE = re.compile(r'\$([_A-Za-z][_0-9A-Za-z]*)')
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL response holds errors"""
+    
+    def __init__(self, errors: List[Dict[str, Any]], data: Optional[Dict[str, Any]] = None):
+        """
+        Initialize GraphQL error
+        
+        Args:
+            errors: The response's errors list
+            data: Partial data returned with the errors
+        """
+        messages = '; '.join(str(error.get('message', error)) for error in errors)
+        super().__init__(messages or 'GraphQL request failed')
+        self.errors = errors
+        self.data = data
+
+
+class GraphQLRequest(NamedTuple):
+    """One GraphQL operation"""
+    query: str
+    variables: Optional[Dict[str, Any]] = None
+    operation_name: Optional[str] = None
+
+
+def _is_persisted_query_miss(errors: List[Dict[str, Any]]) -> bool:
+    for error in errors:
+        code = (error.get('extensions') or {}).get('code', '')
+        if code == PERSISTED_QUERY_NOT_FOUND or error.get('message') == 'PersistedQueryNotFound':
+            return True
+    return False
+
+
+def get_path(data: Any, path: str) -> Any:
+    """Value at a dotted path such as 'organization.repositories'"""
+    for key in path.split('.') if path else ():
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+class GraphQLClient(BaseClient):
+    """GraphQL API client"""
+    
+    def __init__(
+        self,
+        base_url: str,
+        endpoint: str = 'graphql',
+        api_key: Optional[str] = None,
+        api_key_header: str = "Authorization",
+        persisted_queries: bool = False,
+        max_batch_size: int = 20,
+        timeout: int = 30,
+        max_retries: int = 3,
+        log_every: int = 1,
+        backoff_factor: float = 1.0
+    ):
+        """
+        Initialize GraphQL client
+        
+        Args:
+            base_url: Base URL for the API
+            endpoint: Path of the GraphQL endpoint
+            api_key: API key or token, e.g. 'Bearer <token>'
+            api_key_header: Header name for the API key
+            persisted_queries: Send the query's SHA-256 hash instead of its
+                text (Apollo automatic persisted queries); the text is only
+                sent when the server does not know the hash yet
+            max_batch_size: Operations sent in one HTTP request by
+                execute_batch and execute_aliased
+            timeout: Request timeout
+            max_retries: Maximum retries
+            log_every: Log one in every log_every requests (0 for none)
+            backoff_factor: Backoff factor for retries
+        """
+        super().__init__(base_url, timeout, max_retries, backoff_factor, log_every=log_every)
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.endpoint = endpoint
+        self.api_key = api_key
+        self.api_key_header = api_key_header
+        self.persisted_queries = persisted_queries
+        self.max_batch_size = max_batch_size
+        self._hashes: Dict[str, str] = {}
+    
+    def _get_headers(self) -> Dict[str, str]:
+        """Get headers including API key"""
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        
+        if self.api_key:
+            headers[self.api_key_header] = self.api_key
+        
+        return headers
+    
+    def execute(
+        self,
+        query: str,
+        variables: Optional[Dict[str, Any]] = None,
+        operation_name: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Run one GraphQL operation
+        
+        Args:
+            query: GraphQL document
+            variables: Variables of the operation
+            operation_name: Operation to run if the document holds several
+        
+        Returns:
+            The response's data
+        
+        Raises:
+            GraphQLError: If the response holds errors
+        """
+        return self._post([GraphQLRequest(query, variables, operation_name)], batched=False)[0]
+    
+    def execute_batch(self, operations: Sequence[Any]) -> List[Dict[str, Any]]:
+        """
+        Run many operations with array batching
+        
+        Operations are sent as JSON arrays of up to max_batch_size, which
+        the server answers with an array of results; Apollo Server, Hasura
+        and graphql-java among others support this.
+        
+        Args:
+            operations: GraphQLRequests, or (query, variables) tuples
+        
+        Returns:
+            Data of each operation, in order
+        
+        Raises:
+            GraphQLError: If any operation failed
+        """
+        batch = [
+            operation if isinstance(operation, GraphQLRequest) else GraphQLRequest(*operation)
+            for operation in operations
+        ]
+        results: List[Dict[str, Any]] = []
+        for start in range(0, len(batch), self.max_batch_size):
+            results.extend(self._post(batch[start:start + self.max_batch_size], batched=True))
+        return results
+    
+    def execute_aliased(
+        self,
+        selection: str,
+        variable_sets: Sequence[Dict[str, Any]],
+        variable_types: Dict[str, str]
+    ) -> List[Any]:
+        """
+        Run one field selection for many variable sets with aliased fields
+        
+        For servers without array batching: up to max_batch_size copies of
+        the selection are sent in one query, each under its own alias and
+        with its own variables. For example, selection
+        'customer(id: $id) { id name }' with variable_types {'id': 'ID!'}
+        fetches many customers in one request.
+        
+        Args:
+            selection: Field selection referencing $variables
+            variable_sets: Variables of each copy
+            variable_types: GraphQL type of each variable
+        
+        Returns:
+            Value of the field for each variable set, in order
+        
+        Raises:
+            GraphQLError: If the response holds errors
+        """
+        results: List[Any] = []
+        for start in range(0, len(variable_sets), self.max_batch_size):
+            chunk = variable_sets[start:start + self.max_batch_size]
+            declarations, fields, variables = [], [], {}
+            for i, values in enumerate(chunk):
+                for name, graphql_type in variable_types.items():
+                    declarations.append(f"${name}_{i}: {graphql_type}")
+                    variables[f"{name}_{i}"] = values.get(name)
+                fields.append(f"r{i}: " + _VARIABLE.sub(lambda m: f"${m.group(1)}_{i}", selection))
+            header = f"query Aliased({', '.join(declarations)})" if declarations else "query Aliased"
+            query = header + " {\n  " + "\n  ".join(fields) + "\n}"
+            data = self.execute(query, variables)
+            results.extend(data.get(f"r{i}") for i in range(len(chunk)))
+        return results
+    
+    def paginate(
+        self,
+        query: str,
+        connection: str,
+        variables: Optional[Dict[str, Any]] = None,
+        page_size: int = 100,
+        first_variable: str = 'first',
+        after_variable: str = 'after'
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Yield the nodes of a Relay connection one page at a time
+        
+        The query must take the page size and cursor as variables and select
+        pageInfo { hasNextPage endCursor } with edges { node } or nodes on
+        the connection. Pages are requested until hasNextPage is false.
+        
+        Args:
+            query: GraphQL document
+            connection: Dotted path of the connection in the data, e.g.
+                'organization.repositories'
+            variables: Other variables of the query
+            page_size: Value of the first variable
+            first_variable: Name of the page size variable
+            after_variable: Name of the cursor variable
+        
+        Yields:
+            Lists of nodes
+        """
+        cursor = None
+        while True:
+            page_variables = {**(variables or {}), first_variable: page_size}
+            if cursor is not None:
+                page_variables[after_variable] = cursor
+            data = self.execute(query, page_variables)
+            
+            found = get_path(data, connection)
+            if found is None:
+                raise GraphQLError([{'message': f"Connection {connection} not found in response"}], data)
+            if 'nodes' in found:
+                nodes = found['nodes'] or []
+            else:
+                nodes = [edge['node'] for edge in found.get('edges') or []]
+            yield nodes
+            
+            page_info = found.get('pageInfo') or {}
+            next_cursor = page_info.get('endCursor')
+            if not page_info.get('hasNextPage') or not nodes:
+                return
+            if next_cursor is None or next_cursor == cursor:
+                logger.warning(f"Cursor of {connection} did not advance, stopping")
+                return
+            cursor = next_cursor
+    
+    def _post(self, operations: List[GraphQLRequest], batched: bool) -> List[Dict[str, Any]]:
+        """Send operations, as an array when batched, and return their data"""
+        bodies = [self._body(operation, persisted=self.persisted_queries) for operation in operations]
+        results = self._send_bodies(bodies, batched)
+        
+        if self.persisted_queries:
+            misses = [i for i, result in enumerate(results) if _is_persisted_query_miss(result.get('errors') or [])]
+            if misses:
+                logger.debug(f"Registering {len(misses)} persisted queries")
+                retried = self._send_bodies(
+                    [self._body(operations[i], persisted=False) for i in misses], batched
+                )
+                for i, result in zip(misses, retried):
+                    results[i] = result
+        
+        data = []
+        for result in results:
+            if result.get('errors'):
+                raise GraphQLError(result['errors'], result.get('data'))
+            data.append(result.get('data') or {})
+        return data
+    
+    def _send_bodies(self, bodies: List[Dict[str, Any]], batched: bool) -> List[Dict[str, Any]]:
+        if not batched:
+            return [self.post(self.endpoint, json=bodies[0]).json()]
+        results = self.post(self.endpoint, json=bodies).json()
+        if not isinstance(results, list) or len(results) != len(bodies):
+            raise GraphQLError([{'message': "Server did not answer the batch with one result per operation"}])
+        return results
+    
+    def _body(self, operation: GraphQLRequest, persisted: bool) -> Dict[str, Any]:
+        """Request body of an operation; with persisted, the hash always and the text only if not"""
+        body: Dict[str, Any] = {}
+        if operation.variables:
+            body['variables'] = operation.variables
+        if operation.operation_name:
+            body['operationName'] = operation.operation_name
+        if self.persisted_queries:
+            body['extensions'] = {
+                'persistedQuery': {'version': 1, 'sha256Hash': self._hash(operation.query)}
+            }
+        if not persisted:
+            body['query'] = operation.query
+        return body
+    
+    def _hash(self, query: str) -> str:
+        digest = self._hashes.get(query)
+        if digest is None:
+            digest = self._hashes[query] = hashlib.sha256(query.encode('utf-8')).hexdigest()
+        return digest
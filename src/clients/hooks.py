@@ -0,0 +1,172 @@
+"""
+Request Hooks
+Request lifecycle events and timing for API clients
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+HOOK_EVENTS = ('before_request', 'after_response', 'on_retry', 'on_error')
+
+# Timing of the request running on this thread
+_local = threading.local()
+
+
+class RequestTiming(NamedTuple):
+    """
+    Phases of a request in seconds
+    
+    ttfb runs from the start of the request, including connecting and any
+    retries, to the response headers. download is the time spent reading
+    the body and is None for streamed responses, whose body is read later.
+    Phases that could not be measured are None.
+    """
+    connect: float
+    ttfb: Optional[float]
+    download: Optional[float]
+    total: float
+
+
+class RequestEvent:
+    """State of one client request, passed to every hook"""
+    
+    def __init__(self, method: str, url: str, endpoint: str):
+        """
+        Initialize request event
+        
+        Args:
+            method: HTTP method
+            url: Full request URL
+            endpoint: Endpoint passed to the client
+        """
+        self.method = method
+        self.url = url
+        self.endpoint = endpoint
+        self.response: Optional[requests.Response] = None
+        self.error: Optional[Exception] = None
+        self.retries = 0
+        self.retry_reason: Optional[str] = None
+        self.timing: Optional[RequestTiming] = None
+        self.response_size: Optional[int] = None
+    
+    @property
+    def status_code(self) -> Optional[int]:
+        return getattr(self.response, 'status_code', None)
+
+
+class _RequestClock:
+    """Marks collected while a request runs"""
+    
+    def __init__(self, event: RequestEvent, on_retry: Callable[[RequestEvent], None]):
+        self.event = event
+        self.on_retry = on_retry
+        self.start = time.perf_counter()
+        self.connect = 0.0
+        self.headers_at: Optional[float] = None
+    
+    def timing(self, stream: bool) -> RequestTiming:
+        end = time.perf_counter()
+        if self.headers_at is None:
+            return RequestTiming(self.connect, None, None, end - self.start)
+        return RequestTiming(
+            self.connect,
+            self.headers_at - self.start,
+            None if stream else end - self.headers_at,
+            end - self.start
+        )
+
+
+def start_clock(event: RequestEvent, on_retry: Callable[[RequestEvent], None]) -> _RequestClock:
+    """Start timing a request on the current thread"""
+    clock = _local.clock = _RequestClock(event, on_retry)
+    return clock
+
+
+def stop_clock():
+    """Stop timing the current thread's request"""
+    _local.clock = None
+
+
+def _current_clock() -> Optional[_RequestClock]:
+    return getattr(_local, 'clock', None)
+
+
+def mark_headers(response: requests.Response, *args, **kwargs) -> requests.Response:
+    """requests response hook marking when the headers arrived"""
+    clock = _current_clock()
+    if clock is not None:
+        clock.headers_at = time.perf_counter()
+    return response
+
+
+class _TimedConnectionMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            clock = _current_clock()
+            if clock is not None:
+                clock.connect += time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections report how long they took to open"""
+    
+    def get_connection_with_tls_context(self, *args, **kwargs):
+        return self._timed(super().get_connection_with_tls_context(*args, **kwargs))
+    
+    def get_connection(self, *args, **kwargs):
+        return self._timed(super().get_connection(*args, **kwargs))
+    
+    @staticmethod
+    def _timed(pool):
+        if isinstance(pool, HTTPSConnectionPool):
+            if issubclass(pool.ConnectionCls, HTTPSConnection):
+                pool.ConnectionCls = _TimedHTTPSConnection
+        elif issubclass(pool.ConnectionCls, HTTPConnection):
+            pool.ConnectionCls = _TimedHTTPConnection
+        return pool
+
+
+class HookedRetry(Retry):
+    """Retry that reports each retry to the running request's on_retry hooks"""
+    
+    def increment(self, method=None, url=None, response=None, error=None, *args, **kwargs):
+        retry = super().increment(method, url, response, error, *args, **kwargs)
+        clock = _current_clock()
+        if clock is not None:
+            clock.event.retries += 1
+            clock.event.retry_reason = (
+                f"status {response.status}" if response is not None and response.status
+                else type(error).__name__ if error is not None else 'unknown'
+            )
+            clock.on_retry(clock.event)
+        return retry
+
+
+def run_hooks(hooks: Dict[str, List[Callable]], name: str, event: RequestEvent):
+    """Call the hooks registered for an event; hook errors are logged, not raised"""
+    for hook in hooks[name]:
+        try:
+            hook(event)
+        except Exception as e:
+            logger.warning("%s hook %r failed: %s", name, hook, e)
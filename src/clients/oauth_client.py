@@ -4,7 +4,7 @@ Client for OAuth2 authenticated APIs
 """
 
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Optional
 from datetime import datetime, timedelta
 import requests
 from requests_oauthlib import OAuth2Session
@@ -23,7 +23,10 @@ class OAuthClient(BaseClient):
         client_secret: str,
         token_url: str,
         scope: Optional[list] = None,
-        timeout: int = 30
+        timeout: int = 30,
+        log_every: int = 1,
+        max_retries: int = 3,
+        backoff_factor: float = 1.0
     ):
         """
         Initialize OAuth client
@@ -35,8 +38,11 @@ class OAuthClient(BaseClient):
             token_url: OAuth token endpoint URL
             scope: OAuth scopes
             timeout: Request timeout
+            log_every: Log one in every log_every requests (0 for none)
+            max_retries: Maximum retries
+            backoff_factor: Backoff factor for retries
         """
-        super().__init__(base_url, timeout)
+        super().__init__(base_url, timeout, max_retries, backoff_factor, log_every=log_every)
         self.client_id = client_id
         self.client_secret = client_secret
         self.token_url = token_url
@@ -63,6 +69,10 @@ class OAuthClient(BaseClient):
                 client_id=self.client_id,
                 token=token
             )
+            # Share the retrying, timed adapters and hooks of the base session
+            for prefix, adapter in self.session.adapters.items():
+                self.oauth_session.mount(prefix, adapter)
+            self.oauth_session.hooks['response'].extend(self.session.hooks['response'])
             
             # Calculate token expiration
             expires_in = token.get('expires_in', 3600)
@@ -88,57 +98,7 @@ class OAuthClient(BaseClient):
             "Accept": "application/json"
         }
     
-    def get(
-        self,
-        endpoint: str,
-        params: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None
-    ) -> requests.Response:
-        """Make GET request with OAuth"""
+    def _get_session(self) -> requests.Session:
+        """Get the OAuth session, refreshing the token if needed"""
         self._refresh_token_if_needed()
-        url = self._build_url(endpoint)
-        request_headers = {**self._get_headers(), **(headers or {})}
-        
-        logger.info(f"GET {url}")
-        
-        try:
-            response = self.oauth_session.get(
-                url,
-                params=params,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"GET request failed: {str(e)}")
-            raise
-    
-    def post(
-        self,
-        endpoint: str,
-        data: Optional[Dict[str, Any]] = None,
-        json: Optional[Dict[str, Any]] = None,
-        headers: Optional[Dict[str, str]] = None
-    ) -> requests.Response:
-        """Make POST request with OAuth"""
-        self._refresh_token_if_needed()
-        url = self._build_url(endpoint)
-        request_headers = {**self._get_headers(), **(headers or {})}
-        
-        logger.info(f"POST {url}")
-        
-        try:
-            response = self.oauth_session.post(
-                url,
-                data=data,
-                json=json,
-                headers=request_headers,
-                timeout=self.timeout
-            )
-            response.raise_for_status()
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"POST request failed: {str(e)}")
-            raise
-
+        return self.oauth_session
@@ -19,7 +19,9 @@ class RESTClient(BaseClient):
         api_key: Optional[str] = None,
         api_key_header: str = "X-API-Key",
         timeout: int = 30,
-        max_retries: int = 3
+        max_retries: int = 3,
+        log_every: int = 1,
+        backoff_factor: float = 1.0
     ):
         """
         Initialize REST client
@@ -30,8 +32,10 @@ class RESTClient(BaseClient):
             api_key_header: Header name for API key
             timeout: Request timeout
             max_retries: Maximum retries
+            log_every: Log one in every log_every requests (0 for none)
+            backoff_factor: Backoff factor for retries
         """
-        super().__init__(base_url, timeout, max_retries)
+        super().__init__(base_url, timeout, max_retries, backoff_factor, log_every=log_every)
         self.api_key = api_key
         self.api_key_header = api_key_header
     
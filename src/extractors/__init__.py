@@ -1,7 +1,25 @@
 # Extractors Package
 
-from .api_extractor import APIExtractor
-from .incremental_extractor import IncrementalExtractor
+from typing import TYPE_CHECKING
 
-__all__ = ['APIExtractor', 'IncrementalExtractor']
+from .._lazy import attach
 
+if TYPE_CHECKING:
+    from .api_extractor import APIExtractor
+    from .incremental_extractor import IncrementalExtractor
+    from .raw_store import RawResponseStore
+    from .replay_extractor import ReplayExtractor
+    from .graphql_extractor import GraphQLExtractor
+
+__all__ = [
+    'APIExtractor', 'IncrementalExtractor', 'RawResponseStore', 'ReplayExtractor',
+    'GraphQLExtractor'
+]
+
+__getattr__, __dir__ = attach(__name__, {
+    'APIExtractor': '.api_extractor',
+    'IncrementalExtractor': '.incremental_extractor',
+    'RawResponseStore': '.raw_store',
+    'ReplayExtractor': '.replay_extractor',
+    'GraphQLExtractor': '.graphql_extractor'
+})
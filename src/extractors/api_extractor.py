@@ -4,31 +4,47 @@ Extracts data from REST APIs
 """
 
 import logging
-from typing import List, Dict, Any, Optional
+import time
+from itertools import islice
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union
 from ..clients.base_client import BaseClient
+from ..utils.metrics import record_stage
+from ..utils.record_buffer import RecordBuffer
+from ..utils.records import RecordBatch
+from .raw_store import RawResponseStore
+from .response_parsers import parse_response
 
 logger = logging.getLogger(__name__)
 
+# Marks an exhausted record iterator
+_END = object()
+
 
 class APIExtractor:
     """Extract data from APIs"""
     
-    def __init__(self, client: BaseClient):
+    def __init__(self, client: BaseClient, raw_store: Optional[RawResponseStore] = None):
         """
         Initialize API extractor
         
         Args:
             client: API client instance
+            raw_store: Store every response page is written to before it is
+                parsed, so it can be replayed later without the API
         """
         self.client = client
+        self.raw_store = raw_store
     
     def extract(
         self,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None,
         pagination: bool = False,
-        page_size: int = 100
-    ) -> List[Dict[str, Any]]:
+        page_size: int = 100,
+        response_format: Optional[str] = None,
+        compact: bool = False,
+        memory_limit: Optional[int] = None
+    ) -> Union[List[Dict[str, Any]], RecordBatch, RecordBuffer]:
         """
         Extract data from API endpoint
         
@@ -37,55 +53,34 @@ class APIExtractor:
             params: Query parameters
             pagination: Enable pagination
             page_size: Items per page
+            response_format: 'json', 'xml' or 'csv'; detected from the
+                Content-Type header when not set
+            compact: Return a RecordBatch, which stores each record as a
+                tuple, instead of a list of dicts
+            memory_limit: Bytes of records to hold in memory; beyond it
+                records spill to a temporary file and a RecordBuffer is
+                returned, for results too large to hold as a list
             
         Returns:
-            List of records
+            List of records, a RecordBatch when compact is set, or a
+            RecordBuffer when memory_limit is set
         """
+        if compact and memory_limit is not None:
+            raise ValueError("compact and memory_limit cannot be combined")
         try:
-            all_data = []
-            
-            if pagination:
-                page = 1
-                while True:
-                    paginated_params = {
-                        **(params or {}),
-                        'page': page,
-                        'per_page': page_size
-                    }
-                    
-                    response = self.client.get(endpoint, params=paginated_params)
-                    data = response.json()
-                    
-                    # Handle different pagination formats
-                    if isinstance(data, list):
-                        records = data
-                    elif isinstance(data, dict):
-                        records = data.get('data', data.get('results', data.get('items', [])))
-                    else:
-                        records = []
-                    
-                    if not records:
-                        break
-                    
-                    all_data.extend(records)
-                    logger.info(f"Extracted page {page}: {len(records)} records")
-                    
-                    # Check if there are more pages
-                    if isinstance(data, dict):
-                        if not data.get('has_more', True) or page >= data.get('total_pages', page):
-                            break
-                    
-                    page += 1
+            records = self.iter_records(
+                endpoint,
+                params=params,
+                pagination=pagination,
+                page_size=page_size,
+                response_format=response_format
+            )
+            if memory_limit is not None:
+                all_data = RecordBuffer.from_records(records, memory_limit=memory_limit)
+            elif compact:
+                all_data = RecordBatch.from_records(records)
             else:
-                response = self.client.get(endpoint, params=params)
-                data = response.json()
-                
-                if isinstance(data, list):
-                    all_data = data
-                elif isinstance(data, dict):
-                    all_data = data.get('data', data.get('results', data.get('items', [data])))
-                else:
-                    all_data = [data]
+                all_data = list(records)
             
             logger.info(f"Total records extracted: {len(all_data)}")
             return all_data
@@ -94,6 +89,147 @@ class APIExtractor:
             logger.error(f"Error extracting data: {str(e)}")
             raise
     
+    def iter_records(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        pagination: bool = False,
+        page_size: int = 100,
+        response_format: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield records from API endpoint as they are parsed
+        
+        JSON, XML and CSV responses are supported. XML and CSV bodies are
+        streamed, so memory stays bounded regardless of payload size.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            pagination: Enable pagination
+            page_size: Items per page
+            response_format: 'json', 'xml' or 'csv'; detected from the
+                Content-Type header when not set
+                
+        Yields:
+            Records
+        """
+        if not pagination:
+            start = time.perf_counter()
+            records, _ = self._fetch(endpoint, params, True, response_format)
+            yield from self._timed_records(records, time.perf_counter() - start)
+            return
+            
+        page = 1
+        while True:
+            paginated_params = {
+                **(params or {}),
+                'page': page,
+                'per_page': page_size
+            }
+            
+            start = time.perf_counter()
+            records, data = self._fetch(endpoint, paginated_params, False, response_format)
+            count = yield from self._timed_records(records, time.perf_counter() - start)
+            if not count:
+                break
+                
+            logger.info(f"Extracted page {page}: {count} records")
+            
+            # Check if there are more pages
+            if isinstance(data, dict):
+                if not data.get('has_more', True) or page >= data.get('total_pages', page):
+                    break
+                    
+            page += 1
+    
+    @staticmethod
+    def _timed_records(records: Iterator[Dict[str, Any]], elapsed: float) -> Iterator[Dict[str, Any]]:
+        """
+        Yield parsed records, timing their parsing as part of extraction
+        
+        Streamed XML and CSV bodies are downloaded and parsed as records are
+        pulled, so the time spent producing each record is added to elapsed;
+        the time the consumer holds a record is not.
+        
+        Returns:
+            Number of records yielded
+        """
+        count = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                record = next(records, _END)
+                elapsed += time.perf_counter() - start
+                if record is _END:
+                    return count
+                count += 1
+                yield record
+        finally:
+            record_stage('extract', count, elapsed)
+    
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]] = None,
+        pagination: bool = False,
+        page_size: int = 100,
+        response_format: Optional[str] = None,
+        compact: bool = False
+    ) -> Iterator[Union[List[Dict[str, Any]], RecordBatch]]:
+        """
+        Yield records from API endpoint in lists of up to page_size
+        
+        For paginated JSON endpoints each list is one API page; streamed
+        XML and CSV bodies are cut into page_size lists as they are parsed.
+        
+        Args:
+            endpoint: API endpoint
+            params: Query parameters
+            pagination: Enable pagination
+            page_size: Items per page
+            response_format: 'json', 'xml' or 'csv'; detected from the
+                Content-Type header when not set
+            compact: Yield RecordBatches instead of lists; each page starts
+                from the previous page's schema, so pages share it
+                
+        Yields:
+            Lists of records, or RecordBatches when compact is set
+        """
+        records = self.iter_records(
+            endpoint,
+            params=params,
+            pagination=pagination,
+            page_size=page_size,
+            response_format=response_format
+        )
+        try:
+            schema = None
+            while True:
+                if compact:
+                    page = RecordBatch.from_records(islice(records, page_size), schema)
+                    schema = page.schema
+                else:
+                    page = list(islice(records, page_size))
+                if not page:
+                    return
+                yield page
+        finally:
+            records.close()
+    
+    def _fetch(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        wrap_single: bool,
+        response_format: Optional[str]
+    ) -> Tuple[Iterator[Dict[str, Any]], Any]:
+        """Request one page and return its record iterator and decoded JSON payload"""
+        response = self.client.get(endpoint, params=params, stream=True)
+        if self.raw_store is not None:
+            response = self.raw_store.capture(endpoint, params, response)
+        return parse_response(response, wrap_single, response_format)
+    
     def extract_single(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Extract a single record from API
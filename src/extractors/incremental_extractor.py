@@ -5,11 +5,14 @@ Extracts only new/updated data since last sync
 
 import logging
 import json
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 from pathlib import Path
 from datetime import datetime
 from ..clients.base_client import BaseClient
+from ..loaders.sync_state import Watermark
+from ..utils.records import RecordBatch
 from .api_extractor import APIExtractor
+from .raw_store import RawResponseStore
 
 logger = logging.getLogger(__name__)
 
@@ -21,23 +24,43 @@ class IncrementalExtractor(APIExtractor):
         self,
         client: BaseClient,
         timestamp_field: str = 'updated_at',
-        last_sync_file: str = 'last_sync.json'
+        last_sync_file: str = 'last_sync.json',
+        state_store: Optional[Any] = None,
+        state_key: Optional[str] = None,
+        raw_store: Optional[RawResponseStore] = None
     ):
         """
         Initialize incremental extractor
         
+        With a state store (e.g. the DatabaseLoader writing the data) the
+        watermark lives in the target database instead of last_sync_file.
+        Extraction then only sets pending_watermark; pass it to the loader's
+        load or load_stream so it commits in the same transaction as the
+        data, and a crash before that commit simply re-extracts.
+        
         Args:
             client: API client instance
             timestamp_field: Field name containing timestamp
             last_sync_file: Path to file storing last sync timestamp
+            state_store: Object with get_watermark(key), such as DatabaseLoader
+            state_key: Key of the watermark in the state store (defaults to
+                the endpoint being extracted)
+            raw_store: Store every response page is written to, as for
+                APIExtractor
         """
-        super().__init__(client)
+        super().__init__(client, raw_store)
         self.timestamp_field = timestamp_field
         self.last_sync_file = Path(last_sync_file)
+        self.state_store = state_store
+        self.state_key = state_key
+        self.pending_watermark: Optional[Watermark] = None
         self.last_sync_timestamp = self._load_last_sync()
     
-    def _load_last_sync(self) -> Optional[datetime]:
-        """Load last sync timestamp from file"""
+    def _load_last_sync(self, endpoint: Optional[str] = None) -> Optional[datetime]:
+        """Load last sync timestamp from the state store or file"""
+        if self.state_store is not None:
+            key = self.state_key or endpoint
+            return self.state_store.get_watermark(key) if key else None
         if self.last_sync_file.exists():
             try:
                 with open(self.last_sync_file, 'r') as f:
@@ -62,22 +85,42 @@ class IncrementalExtractor(APIExtractor):
         except Exception as e:
             logger.error(f"Error saving last sync: {str(e)}")
     
+    def _is_new(self, record: Dict[str, Any]) -> bool:
+        """Whether a record changed after the last sync"""
+        record_timestamp_str = record.get(self.timestamp_field)
+        if not record_timestamp_str:
+            # If no timestamp field, include the record
+            return True
+        try:
+            record_timestamp = datetime.fromisoformat(record_timestamp_str.replace('Z', '+00:00'))
+            return record_timestamp > self.last_sync_timestamp
+        except Exception:
+            # If timestamp parsing fails, include the record
+            return True
+    
     def extract_incremental(
         self,
         endpoint: str,
-        params: Optional[Dict[str, Any]] = None
-    ) -> List[Dict[str, Any]]:
+        params: Optional[Dict[str, Any]] = None,
+        compact: bool = False
+    ) -> Union[List[Dict[str, Any]], RecordBatch]:
         """
         Extract only records updated since last sync
         
         Args:
             endpoint: API endpoint
             params: Query parameters
+            compact: Return a RecordBatch instead of a list of dicts
             
         Returns:
-            List of new/updated records
+            List of new/updated records, or a RecordBatch when compact is set
         """
         try:
+            if self.state_store is not None:
+                # Re-read so only watermarks committed with their data count
+                self.last_sync_timestamp = self._load_last_sync(endpoint)
+                self.pending_watermark = None
+                
             # Add timestamp filter to params
             query_params = params or {}
             
@@ -90,26 +133,14 @@ class IncrementalExtractor(APIExtractor):
                 logger.info("No previous sync found, extracting all records")
             
             # Extract data
-            all_records = self.extract(endpoint, params=query_params, pagination=True)
+            all_records = self.extract(endpoint, params=query_params, pagination=True, compact=compact)
             
             # Filter records by timestamp (in case API doesn't filter properly)
             if self.last_sync_timestamp and all_records:
-                filtered_records = []
-                for record in all_records:
-                    record_timestamp_str = record.get(self.timestamp_field)
-                    if record_timestamp_str:
-                        try:
-                            record_timestamp = datetime.fromisoformat(record_timestamp_str.replace('Z', '+00:00'))
-                            if record_timestamp > self.last_sync_timestamp:
-                                filtered_records.append(record)
-                        except Exception:
-                            # If timestamp parsing fails, include the record
-                            filtered_records.append(record)
-                    else:
-                        # If no timestamp field, include the record
-                        filtered_records.append(record)
-                
-                all_records = filtered_records
+                if isinstance(all_records, RecordBatch):
+                    all_records = all_records.filter(self._is_new)
+                else:
+                    all_records = [record for record in all_records if self._is_new(record)]
             
             # Update last sync timestamp
             if all_records:
@@ -125,7 +156,10 @@ class IncrementalExtractor(APIExtractor):
                         except Exception:
                             pass
                 
-                self._save_last_sync(latest_timestamp)
+                if self.state_store is not None:
+                    self.pending_watermark = Watermark(self.state_key or endpoint, latest_timestamp)
+                else:
+                    self._save_last_sync(latest_timestamp)
             
             logger.info(f"Extracted {len(all_records)} incremental records")
             return all_records
@@ -0,0 +1,374 @@
+"""
+Raw Response Store
+Append-only landing zone of API response pages, replayable without the network
+"""
+
+import base64
+import gzip
+import io
+import json
+import logging
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from ..utils.metrics import default_registry
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = 'index.jsonl'
+
+# Query parameters set by pagination, ignored when matching replayed pages
+PAGE_PARAMS = ('page', 'per_page')
+
+SEGMENT_SUFFIXES = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+
+CAPTURED_BYTES = default_registry.counter(
+    'raw_store_captured_bytes_total', 'Response body bytes written to the raw store', ('endpoint',)
+)
+
+
+def _import_zstandard():
+    """Import zstandard, which is only needed for zstd segments"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        raise ImportError("zstandard is required for zstd compression: pip install zstandard")
+
+
+def _normalize_params(params: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Params as they read back from JSON, so stored and requested params compare equal"""
+    return json.loads(json.dumps(params or {}, default=str, sort_keys=True))
+
+
+def _as_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Treat naive datetimes as UTC"""
+    if moment is not None and moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment
+
+
+class RawPage(NamedTuple):
+    """One captured response"""
+    endpoint: str
+    params: Dict[str, Any]
+    fetched_at: datetime
+    status: int
+    content_type: Optional[str]
+    url: Optional[str]
+    body: bytes
+    
+    def to_response(self) -> requests.Response:
+        """Rebuild a requests Response, already downloaded, that the response parsers accept"""
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(
+            {'Content-Type': self.content_type} if self.content_type else {}
+        )
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = self.body
+        response._content_consumed = True
+        # Streaming parsers read the body from raw
+        response.raw = io.BytesIO(self.body)
+        return response
+
+
+class _Segment:
+    """Compressed JSONL file being appended to"""
+    
+    def __init__(self, path: Path, compression: str, compression_level: Optional[int]):
+        self.path = path
+        self.lines = 0
+        self.size = 0
+        if compression == 'zstd':
+            zstandard = _import_zstandard()
+            self._flush_mode = zstandard.FLUSH_BLOCK
+            compressor = zstandard.ZstdCompressor(level=compression_level or 3)
+            self.file = compressor.stream_writer(open(path, 'wb'), closefd=True)
+        else:
+            self._flush_mode = None
+            self.file = gzip.open(path, 'wb', compresslevel=compression_level or 6)
+    
+    def write(self, line: bytes) -> int:
+        """Append a line, flushed so it can be read back at once, and return its number"""
+        self.file.write(line)
+        if self._flush_mode is not None:
+            self.file.flush(self._flush_mode)
+        else:
+            self.file.flush()
+        self.lines += 1
+        self.size += len(line)
+        return self.lines - 1
+    
+    def close(self):
+        self.file.close()
+
+
+def _read_lines(path: Path) -> Iterator[bytes]:
+    """Lines of a segment, up to the last flushed line of one still being written"""
+    if path.suffix == '.zst':
+        zstandard = _import_zstandard()
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True, closefd=True)
+        source = io.BufferedReader(raw)
+    else:
+        source = gzip.open(path, 'rb')
+    with source:
+        try:
+            yield from source
+        except EOFError:
+            # The writer has not closed the segment yet
+            return
+
+
+class RawResponseStore:
+    """
+    Append-only store of raw API response pages
+    
+    Every page is written as one JSON line, holding the endpoint, query
+    params, fetch time, status, Content-Type and body, to a gzip (or zstd)
+    compressed segment under a directory per endpoint. Segments roll over
+    at segment_bytes of uncompressed data. index.jsonl records the
+    endpoint, params, time and position of every page, so replays select
+    pages without decompressing the others. Pages are flushed as they are
+    written and can be replayed while the store is still open.
+    
+    One process should write to a store at a time; threads may share it.
+    """
+    
+    def __init__(
+        self,
+        root: str,
+        compression: str = 'gzip',
+        compression_level: Optional[int] = None,
+        segment_bytes: int = 64 * 2 ** 20
+    ):
+        """
+        Initialize raw response store
+        
+        Args:
+            root: Directory of the store, created if missing
+            compression: 'gzip', or 'zstd' (requires zstandard)
+            compression_level: Compression level (gzip 6 and zstd 3 by default)
+            segment_bytes: Uncompressed bytes after which a segment is closed
+                and the next page starts a new one
+        """
+        if compression not in SEGMENT_SUFFIXES:
+            raise ValueError(f"Unsupported compression: {compression}")
+        if compression == 'zstd':
+            _import_zstandard()
+        self.root = Path(root)
+        self.compression = compression
+        self.compression_level = compression_level
+        self.segment_bytes = segment_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._segments: Dict[str, _Segment] = {}
+        self._index_file = None
+        self._lock = threading.Lock()
+    
+    def __enter__(self) -> 'RawResponseStore':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def capture(
+        self,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        response: requests.Response
+    ) -> requests.Response:
+        """
+        Write a response page to the store
+        
+        The body is downloaded if the response was streamed, so a streamed
+        XML or CSV page is held in memory once while it is captured.
+        
+        Args:
+            endpoint: Endpoint passed to the client
+            params: Query parameters of the request
+            response: Successful response
+        
+        Returns:
+            Response over the captured body, to parse in place of the original
+        """
+        try:
+            body = response.content
+        finally:
+            response.close()
+        page = RawPage(
+            endpoint=endpoint,
+            params=_normalize_params(params),
+            fetched_at=datetime.now(timezone.utc),
+            status=response.status_code,
+            content_type=response.headers.get('Content-Type'),
+            url=response.url,
+            body=body
+        )
+        self.write(page)
+        return page.to_response()
+    
+    def write(self, page: RawPage):
+        """Append a page to its endpoint's segment and to the index"""
+        try:
+            text, body_encoding = page.body.decode('utf-8'), 'utf-8'
+        except UnicodeDecodeError:
+            text, body_encoding = base64.b64encode(page.body).decode('ascii'), 'base64'
+        fetched_at = page.fetched_at.isoformat()
+        line = json.dumps({
+            'endpoint': page.endpoint,
+            'params': page.params,
+            'fetched_at': fetched_at,
+            'status': page.status,
+            'content_type': page.content_type,
+            'url': page.url,
+            'body_encoding': body_encoding,
+            'body': text
+        }).encode('utf-8') + b'\n'
+        
+        with self._lock:
+            segment = self._segment_for(page.endpoint)
+            position = segment.write(line)
+            entry = {
+                'endpoint': page.endpoint,
+                'params': page.params,
+                'fetched_at': fetched_at,
+                'segment': segment.path.relative_to(self.root).as_posix(),
+                'line': position,
+                'bytes': len(page.body)
+            }
+            if self._index_file is None:
+                self._index_file = open(self.root / INDEX_FILE, 'a', encoding='utf-8')
+            self._index_file.write(json.dumps(entry) + '\n')
+            self._index_file.flush()
+            if segment.size >= self.segment_bytes:
+                segment.close()
+                del self._segments[page.endpoint]
+        CAPTURED_BYTES.labels(page.endpoint).inc(len(page.body))
+    
+    def _segment_for(self, endpoint: str) -> _Segment:
+        """Open segment of an endpoint, starting one if needed"""
+        segment = self._segments.get(endpoint)
+        if segment is None:
+            directory = self.root / (re.sub(r'[^A-Za-z0-9._-]+', '_', endpoint).strip('_') or '_root')
+            directory.mkdir(parents=True, exist_ok=True)
+            name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+            path = directory / (name + SEGMENT_SUFFIXES[self.compression])
+            segment = self._segments[endpoint] = _Segment(path, self.compression, self.compression_level)
+            logger.debug(f"Started raw segment {path}")
+        return segment
+    
+    def index(
+        self,
+        endpoint: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Index entries of the captured pages, oldest first
+        
+        Args:
+            endpoint: Only pages of this endpoint
+            params: Only pages requested with these params; other params and
+                the pagination params (page, per_page) may differ
+            since: Only pages fetched at or after this time (naive is UTC)
+            until: Only pages fetched before this time (naive is UTC)
+        
+        Returns:
+            Entries with endpoint, params, fetched_at, segment, line and bytes
+        """
+        path = self.root / INDEX_FILE
+        if not path.exists():
+            return []
+        wanted = {
+            key: value for key, value in _normalize_params(params).items() if key not in PAGE_PARAMS
+        }
+        since, until = _as_utc(since), _as_utc(until)
+        
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if endpoint is not None and entry['endpoint'] != endpoint:
+                    continue
+                if any(entry['params'].get(key) != value for key, value in wanted.items()):
+                    continue
+                if since is not None or until is not None:
+                    fetched_at = datetime.fromisoformat(entry['fetched_at'])
+                    if since is not None and fetched_at < since:
+                        continue
+                    if until is not None and fetched_at >= until:
+                        continue
+                entries.append(entry)
+        return entries
+    
+    def pages(
+        self,
+        endpoint: Optional[str] = None,
+        params: Optional[Dict[str, Any]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None
+    ) -> Iterator[RawPage]:
+        """
+        Yield captured pages in the order they were fetched
+        
+        Arguments select pages as in index. Each segment is decompressed
+        once, front to back, and only while it holds selected pages.
+        """
+        current, lines, position = None, None, 0
+        try:
+            for entry in self.index(endpoint, params, since, until):
+                if entry['segment'] != current or entry['line'] < position:
+                    if lines is not None:
+                        lines.close()
+                    current, position = entry['segment'], 0
+                    lines = _read_lines(self.root / current)
+                line = None
+                while position <= entry['line']:
+                    line = next(lines, None)
+                    position += 1
+                    if line is None:
+                        break
+                if line is None:
+                    logger.warning(f"Page {entry['line']} of {current} is missing, skipping")
+                    continue
+                yield self._decode(line)
+        finally:
+            if lines is not None:
+                lines.close()
+    
+    @staticmethod
+    def _decode(line: bytes) -> RawPage:
+        """Page from a segment line"""
+        data = json.loads(line)
+        body = data['body']
+        return RawPage(
+            endpoint=data['endpoint'],
+            params=data['params'],
+            fetched_at=datetime.fromisoformat(data['fetched_at']),
+            status=data['status'],
+            content_type=data['content_type'],
+            url=data.get('url'),
+            body=base64.b64decode(body) if data['body_encoding'] == 'base64' else body.encode('utf-8')
+        )
+    
+    def close(self):
+        """Close open segments and the index; later writes start new segments"""
+        with self._lock:
+            for segment in self._segments.values():
+                segment.close()
+            self._segments = {}
+            if self._index_file is not None:
+                self._index_file.close()
+                self._index_file = None
@@ -0,0 +1,213 @@
+"""
+Response Parsers
+Content-type aware, streaming record parsers for API responses
+"""
+
+import csv
+import io
+import logging
+import xml.etree.ElementTree as ET
+from typing import Iterator, Dict, Any, Optional, Tuple
+from requests.utils import get_encoding_from_headers
+
+logger = logging.getLogger(__name__)
+
+# Keys/elements that wrap the list of records in a response envelope
+ENVELOPE_KEYS = ('data', 'results', 'items')
+
+# Bytes read from the response body at a time
+CSV_CHUNK_SIZE = 64 * 1024
+
+
+def detect_format(response, response_format: Optional[str] = None) -> str:
+    """
+    Detect the payload format of a response
+    
+    Args:
+        response: Response object
+        response_format: Explicit format ('json', 'xml' or 'csv') overriding the header
+        
+    Returns:
+        Format name
+    """
+    if response_format:
+        return response_format.lower()
+        
+    content_type = response.headers.get('Content-Type', '') if response.headers is not None else ''
+    if not isinstance(content_type, str):
+        return 'json'
+    content_type = content_type.lower()
+    if 'csv' in content_type:
+        return 'csv'
+    if 'xml' in content_type:
+        return 'xml'
+    return 'json'
+
+
+def extract_json_records(data: Any, wrap_single: bool = True) -> list:
+    """
+    Pull the list of records out of a decoded JSON payload
+    
+    Args:
+        data: Decoded JSON payload
+        wrap_single: Treat a payload without an envelope as a single record
+        
+    Returns:
+        List of records
+    """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        return data.get('data', data.get('results', data.get('items', [data] if wrap_single else [])))
+    return [data] if wrap_single else []
+
+
+def _local_name(tag: str) -> str:
+    """Strip an XML namespace from a tag"""
+    return tag.rsplit('}', 1)[-1] if '}' in tag else tag
+
+
+def element_to_dict(elem: ET.Element) -> Dict[str, Any]:
+    """
+    Convert an XML element into a record
+    
+    Attributes and child elements become fields; repeated child elements
+    become lists and nested elements become nested dictionaries.
+    """
+    record: Dict[str, Any] = dict(elem.attrib)
+    
+    for child in elem:
+        key = _local_name(child.tag)
+        if len(child) or child.attrib:
+            value = element_to_dict(child)
+        else:
+            value = child.text.strip() if child.text and child.text.strip() else None
+            
+        if key in record:
+            if not isinstance(record[key], list):
+                record[key] = [record[key]]
+            record[key].append(value)
+        else:
+            record[key] = value
+            
+    if elem.text and elem.text.strip() and len(record):
+        record['#text'] = elem.text.strip()
+        
+    return record
+
+
+def iter_xml_records(response, wrap_single: bool = True) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from an XML response with iterparse
+    
+    Children of the root element are records, unless one of them is an
+    envelope element (data/results/items), in which case its children are.
+    Each record element is cleared and detached once yielded, so memory
+    stays bounded regardless of payload size.
+    
+    Args:
+        response: Response object opened with stream=True
+        wrap_single: Yield the root as one record if it holds no record
+            elements; an empty envelope yields nothing
+    """
+    source = response.raw
+    source.decode_content = True
+    
+    stack = []
+    envelope_depth = None
+    yielded = False
+    
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem)
+            depth = len(stack)
+            if depth == 2 and envelope_depth is None and _local_name(elem.tag) in ENVELOPE_KEYS:
+                envelope_depth = 2
+            continue
+            
+        depth = len(stack)
+        record_depth = 3 if envelope_depth else 2
+        is_record = (
+            depth == record_depth
+            and (envelope_depth is None or _local_name(stack[1].tag) in ENVELOPE_KEYS)
+            and (len(elem) or elem.attrib)
+        )
+        
+        if is_record:
+            yield element_to_dict(elem)
+            yielded = True
+            elem.clear()
+            stack[-2].remove(elem)
+        elif depth == 1 and not yielded and envelope_depth is None and wrap_single and (len(elem) or elem.attrib):
+            yield element_to_dict(elem)
+        elif depth == 2 and envelope_depth == 2 and _local_name(elem.tag) in ENVELOPE_KEYS:
+            elem.clear()
+            
+        stack.pop()
+
+
+def iter_csv_records(response) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a CSV response
+    
+    The header row supplies field names; rows are decoded from the raw
+    body in chunks so memory stays bounded. Line endings are kept, so
+    quoted fields spanning several lines come through intact.
+    
+    Args:
+        response: Response object opened with stream=True
+    """
+    content_type = response.headers.get('Content-Type', '') or ''
+    if 'charset' in content_type.lower():
+        encoding = response.encoding or get_encoding_from_headers(response.headers)
+    else:
+        # requests falls back to ISO-8859-1 for text/*; exports are almost always UTF-8
+        encoding = 'utf-8-sig'
+        
+    source = response.raw
+    source.decode_content = True
+    if hasattr(source, 'auto_close'):
+        # urllib3 closes an exhausted body itself, which the io wrappers treat as an error
+        source.auto_close = False
+    text = io.TextIOWrapper(
+        io.BufferedReader(source, CSV_CHUNK_SIZE), encoding=encoding, errors='replace', newline=''
+    )
+    for row in csv.DictReader(text):
+        yield row
+
+
+def parse_response(
+    response,
+    wrap_single: bool = True,
+    response_format: Optional[str] = None
+) -> Tuple[Iterator[Dict[str, Any]], Any]:
+    """
+    Parse a response into an iterator of records
+    
+    Args:
+        response: Response object
+        wrap_single: Treat a payload without an envelope as a single record
+        response_format: Explicit format overriding the Content-Type header
+        
+    Returns:
+        Tuple of (record iterator, decoded JSON payload or None for streamed formats)
+    """
+    fmt = detect_format(response, response_format)
+    
+    if fmt == 'xml':
+        return _closing(response, iter_xml_records(response, wrap_single)), None
+    if fmt == 'csv':
+        return _closing(response, iter_csv_records(response)), None
+    if fmt != 'json':
+        raise ValueError(f"Unsupported response format: {fmt}")
+        
+    data = response.json()
+    return iter(extract_json_records(data, wrap_single)), data
+
+
+def _closing(response, records: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Release the connection once a streamed body is consumed or abandoned"""
+    try:
+        yield from records
+    finally:
+        response.close()
@@ -1,6 +1,22 @@
 # Loaders Package
 
-from .database_loader import DatabaseLoader
+from typing import TYPE_CHECKING
 
-__all__ = ['DatabaseLoader']
+from .._lazy import attach
 
+if TYPE_CHECKING:
+    from .api_writer import APIWriter
+    from .database_loader import DatabaseLoader
+    from .dead_letter import JSONLDeadLetterSink, TableDeadLetterSink
+    from .file_loader import ParquetLoader, ArrowLoader
+
+__all__ = ['APIWriter', 'DatabaseLoader', 'JSONLDeadLetterSink', 'TableDeadLetterSink', 'ParquetLoader', 'ArrowLoader']
+
+__getattr__, __dir__ = attach(__name__, {
+    'APIWriter': '.api_writer',
+    'DatabaseLoader': '.database_loader',
+    'JSONLDeadLetterSink': '.dead_letter',
+    'TableDeadLetterSink': '.dead_letter',
+    'ParquetLoader': '.file_loader',
+    'ArrowLoader': '.file_loader'
+})
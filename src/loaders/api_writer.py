@@ -0,0 +1,292 @@
+"""
+API Writer
+Pushes records to API batch endpoints (reverse ETL)
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Callable, Tuple, Union
+
+import requests
+
+from ..clients.base_client import BaseClient
+from ..utils.metrics import default_registry
+from ..utils.rate_limiter import RateLimiter
+from .dead_letter import DeadLetterSink, make_dead_letter_sink
+
+logger = logging.getLogger(__name__)
+
+WRITTEN_RECORDS = default_registry.counter(
+    'api_writer_records_total', 'Records pushed to API batch endpoints by outcome', ('endpoint', 'outcome')
+)
+
+# Keys of partial-success responses that list the rejected items
+REJECTION_KEYS = ('errors', 'failed', 'rejected', 'failures')
+
+# Per-item statuses that mean the item was not written
+FAILED_STATUSES = ('error', 'failed', 'failure', 'rejected', 'invalid')
+
+# An encoded record and its position in the input
+_Item = Tuple[int, bytes]
+
+
+def default_rejections(payload: Any, batch_size: int) -> Dict[int, str]:
+    """
+    Find the rejected items of a batch response
+    
+    Understands the common shapes of partial-success responses: a list
+    under errors/failed/rejected/failures whose entries carry the item's
+    index, or a results (or items/data) list with one entry per item
+    whose success flag is false, whose status is an error word or an HTTP
+    code of 400 or more, or which holds an error.
+    
+    Args:
+        payload: Decoded JSON response (None for an empty body)
+        batch_size: Records in the batch
+    
+    Returns:
+        Index in the batch -> error message, empty when all were written
+    """
+    if not isinstance(payload, dict):
+        return {}
+    
+    for key in REJECTION_KEYS:
+        entries = payload.get(key)
+        if isinstance(entries, list) and entries and all(isinstance(entry, dict) for entry in entries):
+            rejected = {}
+            for entry in entries:
+                index = entry.get('index', entry.get('idx'))
+                if isinstance(index, int) and 0 <= index < batch_size:
+                    rejected[index] = str(entry.get('message') or entry.get('error') or entry)
+            if rejected:
+                return rejected
+    
+    for key in ('results', 'items', 'data'):
+        results = payload.get(key)
+        if isinstance(results, list) and len(results) == batch_size:
+            rejected = {}
+            for index, result in enumerate(results):
+                if not isinstance(result, dict):
+                    continue
+                status = result.get('status')
+                failed = (
+                    result.get('success') is False
+                    or (isinstance(status, str) and status.lower() in FAILED_STATUSES)
+                    or (isinstance(status, int) and status >= 400)
+                    or bool(result.get('error') or result.get('errors'))
+                )
+                if failed:
+                    rejected[index] = str(result.get('error') or result.get('errors') or result.get('message') or status)
+            return rejected
+    return {}
+
+
+class APIWriter:
+    """Write records to an API batch endpoint"""
+    
+    def __init__(
+        self,
+        client: BaseClient,
+        max_batch_records: int = 100,
+        max_batch_bytes: int = 1024 * 1024,
+        workers: int = 4,
+        rate_limiter: Optional[RateLimiter] = None,
+        records_key: Optional[str] = 'records',
+        max_attempts: int = 3,
+        retry_backoff: float = 1.0,
+        rejections: Callable[[Any, int], Dict[int, str]] = default_rejections,
+        dead_letter: Optional[Union[str, DeadLetterSink]] = None
+    ):
+        """
+        Initialize API writer
+        
+        Records are JSON-encoded once and packed into batches capped by
+        count and by body size. Batches are POSTed by a pool of workers
+        sharing the client's session and connection pool. Items a response
+        reports as rejected are retried on their own; other items of the
+        batch are not resent. Whole batches are retried after connection
+        errors, 429 and 5xx responses, but not after other 4xx responses.
+        
+        Args:
+            client: API client; its session retries each request too
+            max_batch_records: Most records per request
+            max_batch_bytes: Most body bytes per request; a larger record is
+                sent on its own
+            workers: Requests in flight at once (the client's pool keeps up
+                to 10 connections per host)
+            rate_limiter: Limiter waited on before every request; leave it
+                out if the client already has one in a before_request hook
+            records_key: Key of the record list in the body, e.g.
+                {"records": [...]}, or None to send a bare JSON array
+            max_attempts: Attempts per record before it counts as failed
+            retry_backoff: Seconds before the first retry, doubled after each
+            rejections: Function (decoded response, batch size) returning
+                the rejected indexes and their errors; the default reads the
+                common partial-success formats
+            dead_letter: JSONL file path or DeadLetterSink receiving records
+                that failed every attempt
+        """
+        if max_batch_records < 1 or workers < 1 or max_attempts < 1:
+            raise ValueError("max_batch_records, workers and max_attempts must be at least 1")
+        self.client = client
+        self.max_batch_records = max_batch_records
+        self.max_batch_bytes = max_batch_bytes
+        self.workers = workers
+        self.rate_limiter = rate_limiter
+        self.records_key = records_key
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.rejections = rejections
+        self.dead_letter = make_dead_letter_sink(dead_letter)
+        if records_key is None:
+            self._prefix, self._suffix = b'[', b']'
+        else:
+            self._prefix, self._suffix = json.dumps({records_key: []}).encode('utf-8').split(b'[]')
+            self._prefix += b'['
+            self._suffix = b']' + self._suffix
+    
+    def write(self, records: Iterable[Dict[str, Any]], endpoint: str) -> Dict[str, Any]:
+        """
+        Push records to a batch endpoint
+        
+        Records are consumed lazily and at most twice as many batches as
+        workers are pending at once, so any number of records can be
+        streamed through.
+        
+        Args:
+            records: Records to send
+            endpoint: Batch endpoint
+        
+        Returns:
+            Dictionary with records written and failed, requests, bytes
+            sent and throughput
+        """
+        stats = {'records_loaded': 0, 'records_failed': 0, 'batches': 0, 'requests': 0,
+                 'retried_records': 0, 'bytes_sent': 0}
+        lock = threading.Lock()
+        start = time.perf_counter()
+        logger.info(f"Writing records to {endpoint} with {self.workers} workers")
+        
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='api-writer') as executor:
+            pending = set()
+            for batch in self._batches(records):
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(self._send_batch, batch, endpoint, stats, lock))
+            for future in pending:
+                future.result()
+        
+        elapsed = time.perf_counter() - start
+        written, failed = stats['records_loaded'], stats['records_failed']
+        rate = written / elapsed if elapsed > 0 else 0.0
+        logger.info(
+            f"Wrote {written} records to {endpoint} in {stats['requests']} requests "
+            f"({rate:.0f} records/s, {failed} failed)"
+        )
+        return {
+            **stats,
+            'elapsed_seconds': elapsed,
+            'records_per_second': rate,
+            'status': 'success' if not failed else ('partial' if written else 'failed'),
+            'endpoint': endpoint
+        }
+    
+    def load(self, data: Iterable[Dict[str, Any]], table_name: str, **kwargs) -> Dict[str, Any]:
+        """
+        Loader interface, so PipelineRunner can write to an API
+        
+        Args:
+            data: Records to send
+            table_name: Batch endpoint
+            **kwargs: Database load options, ignored
+        
+        Returns:
+            Result of write
+        """
+        return self.write(data, table_name)
+    
+    def load_stream(self, pages: Iterable[Iterable[Dict[str, Any]]], table_name: str, **kwargs) -> Dict[str, Any]:
+        """Write every record of an iterable of pages"""
+        return self.write((record for page in pages for record in page), table_name)
+    
+    def _encode(self, record: Any) -> bytes:
+        if not isinstance(record, dict):
+            record = dict(record)
+        return json.dumps(record, default=str, separators=(',', ':')).encode('utf-8')
+    
+    def _batches(self, records: Iterable[Any]) -> Iterator[List[_Item]]:
+        """Encoded records packed into batches within both caps"""
+        overhead = len(self._prefix) + len(self._suffix)
+        batch: List[_Item] = []
+        size = overhead
+        for position, record in enumerate(records):
+            encoded = self._encode(record)
+            if batch and (
+                len(batch) >= self.max_batch_records
+                or size + len(encoded) + 1 > self.max_batch_bytes
+            ):
+                yield batch
+                batch, size = [], overhead
+            if overhead + len(encoded) > self.max_batch_bytes:
+                logger.warning(f"Record {position} is {len(encoded)} bytes, over max_batch_bytes; sending it alone")
+            batch.append((position, encoded))
+            size += len(encoded) + 1
+        if batch:
+            yield batch
+    
+    def _body(self, items: List[_Item]) -> bytes:
+        return self._prefix + b','.join(encoded for _, encoded in items) + self._suffix
+    
+    def _send_batch(self, items: List[_Item], endpoint: str, stats: Dict[str, int], lock: threading.Lock):
+        """Send a batch, resending rejected items until they are written or out of attempts"""
+        with lock:
+            stats['batches'] += 1
+        errors: Dict[int, str] = {}
+        for attempt in range(self.max_attempts):
+            if attempt:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                with lock:
+                    stats['retried_records'] += len(items)
+            body = self._body(items)
+            if self.rate_limiter is not None:
+                self.rate_limiter.wait_if_needed()
+            with lock:
+                stats['requests'] += 1
+                stats['bytes_sent'] += len(body)
+            try:
+                response = self.client.post(endpoint, data=body, headers={'Content-Type': 'application/json'})
+            except requests.exceptions.RequestException as e:
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                errors = {position: f"{type(e).__name__}: {e}" for position, _ in items}
+                if status is not None and 400 <= status < 500 and status != 429:
+                    break
+                continue
+            
+            try:
+                payload = response.json() if response.content else None
+            except ValueError:
+                payload = None
+            rejected = self.rejections(payload, len(items))
+            written = len(items) - len(rejected)
+            with lock:
+                stats['records_loaded'] += written
+            WRITTEN_RECORDS.labels(endpoint, 'written').inc(written)
+            if not rejected:
+                return
+            logger.debug(f"{len(rejected)} of {len(items)} records rejected by {endpoint}")
+            errors = {items[index][0]: message for index, message in rejected.items()}
+            items = [items[index] for index in sorted(rejected)]
+        
+        with lock:
+            stats['records_failed'] += len(items)
+        WRITTEN_RECORDS.labels(endpoint, 'failed').inc(len(items))
+        logger.warning(f"{len(items)} records failed to write to {endpoint}")
+        if self.dead_letter is not None:
+            self.dead_letter.write(endpoint, [
+                (json.loads(encoded), errors.get(position, 'rejected')) for position, encoded in items
+            ])
@@ -4,30 +4,247 @@ Loads extracted data into databases
 """
 
 import logging
-from typing import List, Dict, Any, Optional
-import pandas as pd
-from sqlalchemy import create_engine, text
+import threading
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
+from typing import List, Dict, Any, Callable, Optional, Union, Iterable, Iterator, Tuple
+from sqlalchemy import create_engine, event, text, Table
+from .dialects import (
+    NATIVE_UPSERT_DIALECTS,
+    bulk_insert,
+    build_upsert_statement,
+    build_merge_sql,
+    create_staging_table,
+    dedupe_rows,
+    normalize_rows
+)
+from .dead_letter import DeadLetterSink, describe_error, make_dead_letter_sink
+from .metadata_cache import TableMetadataCache
+from .schema_evolution import plan_schema_changes, apply_schema_changes
+from .sync_state import Watermark, read_watermark, write_watermark
+from ..utils.metrics import default_registry, record_stage
+from ..utils.records import RecordBatch
 
 logger = logging.getLogger(__name__)
 
+LOAD_BATCH_DURATION = default_registry.histogram(
+    'load_batch_duration_seconds', 'Time to write one load batch', ('table', 'mode')
+)
+
+
+def _dataframe(records: Union[List[Dict[str, Any]], RecordBatch]):
+    """Build a DataFrame, importing pandas only when a load needs it"""
+    import pandas as pd
+    if isinstance(records, RecordBatch):
+        return pd.DataFrame(records.rows, columns=list(records.schema.fields))
+    return pd.DataFrame(records)
+
+
+def _record_batch(table_name: str, load_mode: str, records: int, seconds: float):
+    """Record the duration and size of a written batch"""
+    LOAD_BATCH_DURATION.labels(table_name, load_mode).observe(seconds)
+    record_stage('load', records, seconds)
+
+
+def _iter_batches(
+    records: Iterable[Union[Dict[str, Any], List[Dict[str, Any]], RecordBatch]],
+    batch_size: int
+) -> Iterator[Union[List[Dict[str, Any]], RecordBatch]]:
+    """
+    Regroup a stream of records or pages into batches of batch_size records
+    
+    A stream starting with a RecordBatch is regrouped into RecordBatches,
+    other streams into lists.
+    """
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return
+    if isinstance(first, RecordBatch):
+        yield from _iter_record_batches(first, records, batch_size)
+        return
+        
+    def flatten():
+        for item in chain([first], records):
+            if isinstance(item, (list, tuple, RecordBatch)):
+                yield from item
+            else:
+                yield item
+                
+    flat = flatten()
+    while True:
+        batch = list(islice(flat, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _iter_record_batches(
+    first: RecordBatch,
+    records: Iterator[Union[Dict[str, Any], List[Dict[str, Any]], RecordBatch]],
+    batch_size: int
+) -> Iterator[RecordBatch]:
+    """Regroup a stream of RecordBatches (and stray records) into batch_size batches"""
+    pending = [first]
+    pending_rows = len(first)
+    for item in records:
+        if not isinstance(item, RecordBatch):
+            item = RecordBatch.from_records(item if isinstance(item, (list, tuple)) else [item])
+        pending.append(item)
+        pending_rows += len(item)
+        if pending_rows < batch_size:
+            continue
+        combined = RecordBatch.concat(pending)
+        full = len(combined) - len(combined) % batch_size
+        for i in range(0, full, batch_size):
+            yield combined[i:i + batch_size]
+        pending = [combined[full:]]
+        pending_rows = len(combined) - full
+    if pending_rows:
+        yield RecordBatch.concat(pending)
+
+
+def _use_sqlite_transactions(engine):
+    """
+    Let SQLAlchemy control SQLite transactions
+    
+    pysqlite only emits BEGIN before DML, which breaks savepoints and
+    transactional DDL; this is the recipe from the SQLAlchemy docs. Loads
+    read table metadata before writing, and SQLite fails the upgrade of a
+    deferred transaction's read lock at once instead of waiting for the
+    busy timeout, so transactions take the write lock up front with
+    BEGIN IMMEDIATE and concurrent writers queue for it.
+    """
+    @event.listens_for(engine, 'connect')
+    def disable_pysqlite_begin(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def emit_begin(conn):
+        conn.exec_driver_sql('BEGIN IMMEDIATE')
+
+
+def _partition(
+    data: List[Dict[str, Any]],
+    partitions: int,
+    partition_by: str,
+    key_columns: List[str]
+) -> List[List[Dict[str, Any]]]:
+    """Split records into partitions by key hash or key range"""
+    partitions = max(1, min(partitions, len(data)))
+    if isinstance(data, RecordBatch):
+        return _partition_batch(data, partitions, partition_by, key_columns)
+        
+    
+    if partition_by == 'hash' and key_columns:
+        parts: List[List[Dict[str, Any]]] = [[] for _ in range(partitions)]
+        for record in data:
+            key = tuple(record.get(col) for col in key_columns)
+            parts[hash(key) % partitions].append(record)
+        return parts
+        
+    if partition_by == 'range' and key_columns:
+        def range_key(record):
+            return tuple(record.get(col) for col in key_columns)
+            
+        try:
+            data = sorted(data, key=range_key)
+        except TypeError:
+            # Missing or mixed-type keys; fall back to comparing them as strings
+            data = sorted(data, key=lambda r: tuple(str(v) for v in range_key(r)))
+            
+    size = -(-len(data) // partitions)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+def _partition_batch(
+    data: RecordBatch,
+    partitions: int,
+    partition_by: str,
+    key_columns: List[str]
+) -> List[RecordBatch]:
+    """_partition for a RecordBatch, working on its rows"""
+    schema = data.schema
+    if partition_by == 'hash' and key_columns:
+        key = schema.getter(key_columns)
+        parts: List[List[tuple]] = [[] for _ in range(partitions)]
+        for row in data.rows:
+            parts[hash(key(row)) % partitions].append(row)
+        return [RecordBatch(schema, rows) for rows in parts]
+        
+    if partition_by == 'range' and key_columns:
+        key = schema.getter(key_columns)
+        try:
+            data = RecordBatch(schema, sorted(data.rows, key=key))
+        except TypeError:
+            data = RecordBatch(schema, sorted(data.rows, key=lambda row: tuple(str(v) for v in key(row))))
+            
+    size = -(-len(data) // partitions)
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
 
 class DatabaseLoader:
     """Load data to database"""
     
-    def __init__(self, connection_string: str):
+    # Upserts at least this large go through a staging table in 'auto' mode
+    MERGE_THRESHOLD = 50000
+    
+    # Records used to derive column types when creating a table
+    DDL_SAMPLE_SIZE = 1000
+    
+    def __init__(
+        self,
+        connection_string: str,
+        schema_evolution: bool = False,
+        metadata_ttl: Optional[float] = 300.0,
+        pool_size: Optional[int] = None,
+        max_overflow: Optional[int] = None,
+        engine_options: Optional[Dict[str, Any]] = None,
+        dead_letter: Optional[Union[str, DeadLetterSink]] = None,
+        state_table: str = '_sync_state'
+    ):
         """
         Initialize database loader
         
         Args:
             connection_string: Database connection string
+            schema_evolution: Add columns for new fields and widen column
+                types to fit incoming records instead of raising on unknown fields
+            metadata_ttl: Seconds reflected table definitions are cached
+                (None to cache until invalidate_metadata is called)
+            pool_size: Connections kept open in the engine's pool; size it
+                to the number of load_parallel workers
+            max_overflow: Extra connections allowed beyond pool_size
+            engine_options: Additional keyword arguments for create_engine
+            dead_letter: JSONL file path or DeadLetterSink; when set, a chunk
+                that fails to load is bisected so the good rows are written
+                and only the offending rows are routed here with their error
+            state_table: Table holding incremental sync watermarks
         """
         self.connection_string = connection_string
         self.engine = None
+        self.engine_options = dict(engine_options or {})
+        if pool_size is not None:
+            self.engine_options['pool_size'] = pool_size
+        if max_overflow is not None:
+            self.engine_options['max_overflow'] = max_overflow
+        self.schema_evolution = schema_evolution
+        self.metadata_cache = TableMetadataCache(ttl=metadata_ttl)
+        self._statement_cache: Dict[Any, str] = {}
+        self.dead_letter = make_dead_letter_sink(dead_letter)
+        self.state_table = state_table
+        # Failed records of each thread's open transaction, sent to the sink once it commits
+        self._dead_letters = threading.local()
     
     def _get_engine(self):
         """Get or create database engine"""
         if self.engine is None:
-            self.engine = create_engine(self.connection_string)
+            self.engine = create_engine(self.connection_string, **self.engine_options)
+            if self.engine.dialect.name == 'sqlite':
+                _use_sqlite_transactions(self.engine)
         return self.engine
     
     def load(
@@ -35,18 +252,27 @@ class DatabaseLoader:
         data: List[Dict[str, Any]],
         table_name: str,
         load_mode: str = 'append',
-        unique_key: Optional[str] = None,
-        chunksize: int = 1000
+        unique_key: Optional[Union[str, List[str]]] = None,
+        chunksize: int = 1000,
+        upsert_strategy: str = 'auto',
+        append_method: str = 'bulk',
+        watermark: Optional[Watermark] = None
     ) -> Dict[str, Any]:
         """
         Load data to database table
         
         Args:
-            data: List of records to load
+            data: Records to load, as a list of dicts or a RecordBatch
             table_name: Target table name
             load_mode: 'append', 'replace', or 'upsert'
-            unique_key: Column name for upsert operations
+            unique_key: Column name (or names) for upsert operations
             chunksize: Number of records per batch
+            upsert_strategy: 'insert' for batched INSERT ... ON CONFLICT,
+                'merge' for a staging table merge, or 'auto'
+            append_method: 'bulk' for the dialect's native bulk path (COPY on
+                PostgreSQL), or 'to_sql' for pandas multi-row inserts
+            watermark: Incremental sync watermark (e.g. an IncrementalExtractor's
+                pending_watermark) committed in the same transaction as the data
             
         Returns:
             Dictionary with load results
@@ -56,88 +282,639 @@ class DatabaseLoader:
                 logger.warning("No data to load")
                 return {'records_loaded': 0, 'status': 'skipped'}
             
+            logger.info(f"Loading {len(data)} records to {table_name} using {load_mode} mode")
+            
+            start = time.perf_counter()
             engine = self._get_engine()
-            df = pd.DataFrame(data)
-            
-            logger.info(f"Loading {len(df)} records to {table_name} using {load_mode} mode")
-            
-            if load_mode == 'append':
-                df.to_sql(
-                    table_name,
-                    engine,
-                    if_exists='append',
-                    index=False,
-                    chunksize=chunksize,
-                    method='multi'
-                )
-                
-            elif load_mode == 'replace':
-                df.to_sql(
-                    table_name,
-                    engine,
-                    if_exists='replace',
-                    index=False,
-                    chunksize=chunksize,
-                    method='multi'
-                )
+            records_loaded = len(data)
+            records_deduplicated = 0
+            
+            if load_mode in ('append', 'replace'):
+                if append_method not in ('bulk', 'to_sql'):
+                    raise ValueError(f"Unknown append_method: {append_method}")
+                    
+                with engine.begin() as conn:
+                    if append_method == 'to_sql':
+                        _dataframe(data).to_sql(
+                            table_name,
+                            conn,
+                            if_exists=load_mode,
+                            index=False,
+                            chunksize=chunksize,
+                            method='multi'
+                        )
+                    else:
+                        records_loaded = self._bulk_append(
+                            conn, table_name, data, chunksize, replace=load_mode == 'replace'
+                        )
+                    self._write_watermark(conn, watermark)
                 
             elif load_mode == 'upsert':
                 if not unique_key:
                     raise ValueError("unique_key must be provided for upsert mode")
-                self._upsert(df, table_name, unique_key, chunksize)
+                records_loaded, records_deduplicated = self._upsert(
+                    data, table_name, unique_key, chunksize, upsert_strategy, watermark
+                )
                 
             else:
                 raise ValueError(f"Unknown load_mode: {load_mode}")
             
-            logger.info(f"Successfully loaded {len(df)} records")
+            _record_batch(table_name, load_mode, records_loaded, time.perf_counter() - start)
+            self._flush_dead_letters()
+            logger.info(f"Successfully loaded {records_loaded} records")
+            records_failed = len(data) - records_loaded - records_deduplicated
             return {
-                'records_loaded': len(df),
-                'status': 'success',
+                'records_loaded': records_loaded,
+                'records_deduplicated': records_deduplicated,
+                'records_failed': records_failed,
+                'status': 'partial' if records_failed else 'success',
                 'table': table_name
             }
             
         except Exception as e:
+            self._discard_dead_letters()
             logger.error(f"Error loading data: {str(e)}")
             raise
     
-    def _upsert(
+    def load_stream(
         self,
-        df: pd.DataFrame,
+        records: Iterable[Union[Dict[str, Any], List[Dict[str, Any]], RecordBatch]],
         table_name: str,
-        unique_key: str,
-        chunksize: int = 1000
-    ):
-        """Perform upsert operation"""
+        load_mode: str = 'append',
+        unique_key: Optional[Union[str, List[str]]] = None,
+        batch_size: int = 1000,
+        transaction: str = 'batch',
+        upsert_strategy: str = 'insert',
+        append_method: str = 'bulk',
+        watermark: Optional[Watermark] = None
+    ) -> Dict[str, Any]:
+        """
+        Load records from an iterator in fixed-size batches
+        
+        Accepts an iterator of records or of pages (lists of records or
+        RecordBatches), such as APIExtractor.iter_records, so only one batch
+        is held in memory at a time. All batches are written over a single
+        connection.
+        
+        Args:
+            records: Iterable of records, lists of records or RecordBatches
+            table_name: Target table name
+            load_mode: 'append', 'replace', or 'upsert'; replace only
+                applies to the first batch
+            unique_key: Column name (or names) for upsert operations
+            batch_size: Number of records per batch
+            transaction: 'batch' to commit after every batch, or 'single'
+                to commit once at the end and roll back everything on error
+            upsert_strategy: Upsert strategy used for each batch
+            append_method: 'bulk' or 'to_sql', as for load
+            watermark: Incremental sync watermark committed in the same
+                transaction as the final batch; in 'batch' mode each batch
+                is then committed only once the next one is ready
+            
+        Returns:
+            Dictionary with load results
+        """
+        if load_mode not in ('append', 'replace', 'upsert'):
+            raise ValueError(f"Unknown load_mode: {load_mode}")
+        if load_mode == 'upsert' and not unique_key:
+            raise ValueError("unique_key must be provided for upsert mode")
+        if transaction not in ('batch', 'single'):
+            raise ValueError(f"Unknown transaction mode: {transaction}")
+        if append_method not in ('bulk', 'to_sql'):
+            raise ValueError(f"Unknown append_method: {append_method}")
+            
         engine = self._get_engine()
+        records_loaded = 0
+        records_deduplicated = 0
+        records_failed = 0
+        batches = 0
+        
+        try:
+            with engine.connect() as conn:
+                for batch in _iter_batches(records, batch_size):
+                    if transaction == 'batch' and watermark is not None and batches:
+                        # Commit the previous batch now that it is not the last one
+                        conn.commit()
+                        self._flush_dead_letters()
+                    start = time.perf_counter()
+                    replace = load_mode == 'replace' and batches == 0
+                    deduplicated = 0
+                    if load_mode == 'upsert':
+                        table = self._get_table(conn, table_name)
+                        loaded, deduplicated = self._upsert_rows(
+                            conn, table, batch, unique_key, batch_size, upsert_strategy
+                        )
+                    elif append_method == 'bulk':
+                        loaded = self._bulk_append(conn, table_name, batch, batch_size, replace=replace)
+                    else:
+                        _dataframe(batch).to_sql(
+                            table_name,
+                            conn,
+                            if_exists='replace' if replace else 'append',
+                            index=False,
+                            method='multi'
+                        )
+                        loaded = len(batch)
+                        
+                    _record_batch(table_name, load_mode, loaded, time.perf_counter() - start)
+                    records_loaded += loaded
+                    records_deduplicated += deduplicated
+                    records_failed += len(batch) - loaded - deduplicated
+                    batches += 1
+                    if transaction == 'batch' and watermark is None:
+                        conn.commit()
+                        self._flush_dead_letters()
+                    logger.debug(f"Loaded batch {batches} ({records_loaded} records so far)")
+                    
+                if batches:
+                    self._write_watermark(conn, watermark)
+                conn.commit()
+                self._flush_dead_letters()
+                
+        except Exception as e:
+            self._discard_dead_letters()
+            logger.error(f"Error loading stream after {records_loaded} records: {str(e)}")
+            raise
+            
+        if not batches:
+            logger.warning("No data to load")
+            return {'records_loaded': 0, 'status': 'skipped'}
+            
+        logger.info(f"Successfully loaded {records_loaded} records to {table_name} in {batches} batches")
+        return {
+            'records_loaded': records_loaded,
+            'records_deduplicated': records_deduplicated,
+            'records_failed': records_failed,
+            'batches': batches,
+            'status': 'partial' if records_failed else 'success',
+            'table': table_name
+        }
+    
+    def load_parallel(
+        self,
+        data: List[Dict[str, Any]],
+        table_name: str,
+        load_mode: str = 'append',
+        unique_key: Optional[Union[str, List[str]]] = None,
+        workers: int = 4,
+        partitions: Optional[int] = None,
+        partition_by: str = 'hash',
+        partition_key: Optional[Union[str, List[str]]] = None,
+        chunksize: int = 1000,
+        ordered_commit: bool = False,
+        upsert_strategy: str = 'insert'
+    ) -> Dict[str, Any]:
+        """
+        Load data over several connections at once
         
-        # Get existing columns
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT * FROM {table_name} LIMIT 0"))
-            columns = [col.name for col in result.cursor.description] if hasattr(result, 'cursor') else df.columns.tolist()
+        The data is split into partitions and each partition is written by a
+        worker on its own pooled connection and transaction. Hash partitioning
+        on the unique key keeps all rows of a key in one partition, so
+        concurrent upserts never contend for the same row. Range partitioning
+        sorts by the key and gives each worker a contiguous key range.
         
-        # Process in chunks
-        for i in range(0, len(df), chunksize):
-            chunk = df.iloc[i:i+chunksize]
+        SQLite allows a single writer, so it is always loaded with one worker.
+        
+        Args:
+            data: Records to load, as a list of dicts or a RecordBatch
+            table_name: Target table name
+            load_mode: 'append', 'replace', or 'upsert'
+            unique_key: Column name (or names) for upsert operations
+            workers: Number of concurrent connections
+            partitions: Number of partitions (defaults to workers)
+            partition_by: 'hash' or 'range'
+            partition_key: Column(s) to partition on (defaults to unique_key;
+                without either, data is split into contiguous slices)
+            chunksize: Number of records per batch
+            ordered_commit: Commit partitions in order; a failed partition
+                rolls back every partition after it
+            upsert_strategy: Upsert strategy used within each partition
             
-            # Build upsert query (PostgreSQL syntax)
-            # Adjust for your database
-            set_clause = ', '.join([f"{col} = EXCLUDED.{col}" for col in columns if col != unique_key])
+        Returns:
+            Dictionary with load results
+        """
+        if load_mode not in ('append', 'replace', 'upsert'):
+            raise ValueError(f"Unknown load_mode: {load_mode}")
+        if load_mode == 'upsert' and not unique_key:
+            raise ValueError("unique_key must be provided for upsert mode")
+        if partition_by not in ('hash', 'range'):
+            raise ValueError(f"Unknown partition_by: {partition_by}")
+            
+        if not data:
+            logger.warning("No data to load")
+            return {'records_loaded': 0, 'status': 'skipped'}
+            
+        engine = self._get_engine()
+        if engine.dialect.name == 'sqlite' and workers > 1:
+            logger.warning("SQLite allows a single writer; loading with one worker")
+            workers = 1
             
-            # Convert chunk to list of tuples for insertion
-            values = [tuple(row) for row in chunk.values]
-            columns_str = ', '.join(columns)
-            placeholders = ', '.join(['%s'] * len(columns))
+        pool_capacity = getattr(engine.pool, 'size', lambda: None)()
+        if pool_capacity is not None and pool_capacity + getattr(engine.pool, '_max_overflow', 0) < workers:
+            logger.warning(f"Connection pool is smaller than {workers} workers; raise pool_size")
             
-            upsert_query = f"""
-                INSERT INTO {table_name} ({columns_str})
-                VALUES ({placeholders})
-                ON CONFLICT ({unique_key}) 
-                DO UPDATE SET {set_clause}
-            """
+        rows_to_load = data
+        if load_mode == 'upsert':
+            # A repeated key could straddle two range partitions, so keep its last record up front
+            rows_to_load = dedupe_rows(data, [unique_key] if isinstance(unique_key, str) else list(unique_key))
+        records_deduplicated = len(data) - len(rows_to_load)
             
+        key = partition_key or unique_key
+        key_columns = [key] if isinstance(key, str) else list(key or [])
+        parts = _partition(rows_to_load, partitions or workers, partition_by, key_columns)
+        
+        # Create or replace the table once, before the workers start appending
+        if load_mode != 'upsert':
+            with engine.begin() as conn:
+                self._ensure_table(conn, table_name, data, replace=load_mode == 'replace')
+                
+        commit_turn = threading.Condition()
+        state = {'next': 0, 'failed_at': None}
+        
+        def write_partition(index: int, rows: List[Dict[str, Any]]) -> int:
+            start = time.perf_counter()
             with engine.connect() as conn:
-                conn.execute(text(upsert_query), values)
-                conn.commit()
+                trans = conn.begin()
+                try:
+                    if rows:
+                        if load_mode == 'upsert':
+                            table = self._get_table(conn, table_name)
+                            written, _ = self._upsert_rows(conn, table, rows, unique_key, chunksize, upsert_strategy)
+                        else:
+                            written = self._bulk_append(conn, table_name, rows, chunksize)
+                    else:
+                        written = 0
+                            
+                    if ordered_commit:
+                        with commit_turn:
+                            commit_turn.wait_for(
+                                lambda: state['next'] == index or state['failed_at'] is not None
+                            )
+                            if state['failed_at'] is not None:
+                                raise RuntimeError(
+                                    f"Partition {index} rolled back after partition {state['failed_at']} failed"
+                                )
+                            trans.commit()
+                            state['next'] += 1
+                            commit_turn.notify_all()
+                    else:
+                        trans.commit()
+                        
+                except Exception:
+                    trans.rollback()
+                    self._discard_dead_letters()
+                    if ordered_commit:
+                        with commit_turn:
+                            if state['failed_at'] is None or index < state['failed_at']:
+                                state['failed_at'] = index
+                            commit_turn.notify_all()
+                    raise
+                    
+            self._flush_dead_letters()
+            _record_batch(table_name, load_mode, written, time.perf_counter() - start)
+            return written
+            
+        logger.info(
+            f"Loading {len(data)} records to {table_name} in {len(parts)} "
+            f"{partition_by} partitions on {workers} connections"
+        )
         
-        logger.info(f"Upserted {len(df)} records")
-
+        loaded = [0] * len(parts)
+        errors = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(write_partition, index, rows): index
+                for index, rows in enumerate(parts)
+            }
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    loaded[index] = future.result()
+                except Exception as e:
+                    errors.append((index, e))
+                    
+        records_loaded = sum(loaded)
+        if errors:
+            errors.sort(key=lambda item: item[0])
+            logger.error(
+                f"{len(errors)} of {len(parts)} partitions failed; "
+                f"{records_loaded} records committed: {str(errors[0][1])}"
+            )
+            raise errors[0][1]
+            
+        records_failed = len(data) - records_loaded - records_deduplicated
+        logger.info(f"Successfully loaded {records_loaded} records")
+        return {
+            'records_loaded': records_loaded,
+            'records_deduplicated': records_deduplicated,
+            'records_failed': records_failed,
+            'partitions': loaded,
+            'status': 'partial' if records_failed else 'success',
+            'table': table_name
+        }
+    
+    def get_watermark(self, key: str) -> Optional[datetime]:
+        """
+        Read a committed incremental sync watermark
+        
+        Args:
+            key: Sync key, e.g. the endpoint being synced
+            
+        Returns:
+            Watermark committed with the last load for the key, or None
+        """
+        with self._get_engine().connect() as conn:
+            return read_watermark(conn, self.state_table, key)
+    
+    def invalidate_metadata(self, table_name: Optional[str] = None):
+        """
+        Forget cached table definitions, e.g. after altering a table externally
+        
+        Args:
+            table_name: Table to forget; all tables when not given
+        """
+        self.metadata_cache.invalidate(table_name)
+    
+    def _write_watermark(self, conn, watermark: Optional[Watermark]):
+        """Stage a watermark in the caller's transaction"""
+        if watermark is not None:
+            write_watermark(conn, self.state_table, watermark)
+    
+    def _get_table(self, conn, table_name: str) -> Table:
+        """Get a table definition from the metadata cache"""
+        return self.metadata_cache.get(conn, table_name)
+    
+    def _batch_columns(self, conn, table: Table, data: List[Dict[str, Any]]) -> Tuple[Table, List[str]]:
+        """
+        Table columns present in a batch, in table order
+        
+        With schema evolution enabled the table is first altered to fit the
+        batch and the refreshed definition is returned. Otherwise a field
+        without a column raises ValueError rather than being dropped.
+        """
+        if self.schema_evolution:
+            changes = plan_schema_changes(table, data)
+            if apply_schema_changes(conn, table, changes):
+                self.metadata_cache.invalidate(table.name)
+                table = self._get_table(conn, table.name)
+                
+        if isinstance(data, RecordBatch):
+            present = set(data.schema.fields)
+        else:
+            present = set()
+            for record in data:
+                present.update(record.keys())
+        columns = [col.name for col in table.columns if col.name in present]
+        unknown = present.difference(columns)
+        if unknown:
+            raise ValueError(
+                f"Fields not in {table.name}: {sorted(unknown)}; "
+                f"enable schema_evolution to add them as columns"
+            )
+        return table, columns
+    
+    def _ddl_sample(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Records pandas derives the table's columns from
+        
+        The first DDL_SAMPLE_SIZE records, plus the first record carrying each
+        field they lack, so a field first seen late in the batch still gets
+        a column.
+        """
+        sample = data[:self.DDL_SAMPLE_SIZE]
+        if isinstance(data, RecordBatch):
+            # Every row of a RecordBatch has all of its schema's fields
+            return sample
+            
+        seen = set()
+        for record in sample:
+            seen.update(record.keys())
+        late = []
+        for record in islice(data, self.DDL_SAMPLE_SIZE, None):
+            if not seen.issuperset(record.keys()):
+                seen.update(record.keys())
+                late.append(record)
+        return list(sample) + late if late else sample
+    
+    def _ensure_table(self, conn, table_name: str, data: List[Dict[str, Any]], replace: bool = False):
+        """Create the table from a sample of the data if missing (or always when replacing)"""
+        if replace or not self.metadata_cache.has_table(conn, table_name):
+            _dataframe(self._ddl_sample(data)).head(0).to_sql(
+                table_name,
+                conn,
+                if_exists='replace' if replace else 'fail',
+                index=False
+            )
+            self.metadata_cache.invalidate(table_name)
+    
+    def _bulk_append(
+        self,
+        conn,
+        table_name: str,
+        data: List[Dict[str, Any]],
+        chunksize: int,
+        replace: bool = False
+    ) -> int:
+        """
+        Append records with the dialect's native bulk path
+        
+        Missing tables (and all tables when replace is set) are created from
+        the DDL pandas derives from a sample covering every field; rows are then
+        written by bulk_insert in the caller's transaction.
+        
+        Returns:
+            Number of records written
+        """
+        self._ensure_table(conn, table_name, data, replace)
+            
+        table = self._get_table(conn, table_name)
+        table, columns = self._batch_columns(conn, table, data)
+        paths = set()
+        
+        def write(rows: List[Dict[str, Any]]):
+            paths.add(bulk_insert(conn, table, columns, rows, chunksize, self._statement_cache))
+            
+        loaded = self._write_rows(conn, table_name, data, chunksize, write)
+        logger.debug(f"Appended {loaded} records to {table_name} via {', '.join(sorted(paths))}")
+        return loaded
+    
+    def _upsert(
+        self,
+        data: List[Dict[str, Any]],
+        table_name: str,
+        unique_key: Union[str, List[str]],
+        chunksize: int = 1000,
+        strategy: str = 'auto',
+        watermark: Optional[Watermark] = None
+    ) -> Tuple[int, int]:
+        """
+        Perform upsert operation
+        
+        Rows are written in one transaction, either with the dialect's native
+        INSERT ... ON CONFLICT / ON DUPLICATE KEY statement executed in
+        chunksize batches, or by bulk-inserting into a staging table and
+        merging it into the target with a single statement.
+        
+        Args:
+            data: List of records to upsert
+            table_name: Target table name
+            unique_key: Column or columns of the unique constraint
+            chunksize: Number of records per executemany batch
+            strategy: 'insert', 'merge', or 'auto' to merge large loads
+            watermark: Sync watermark written in the same transaction
+            
+        Returns:
+            Number of records written and number of records skipped
+            because a later record had the same key
+        """
+        engine = self._get_engine()
+        
+        with engine.begin() as conn:
+            table = self._get_table(conn, table_name)
+            loaded, deduplicated = self._upsert_rows(conn, table, data, unique_key, chunksize, strategy)
+            self._write_watermark(conn, watermark)
+        
+        logger.info(f"Upserted {loaded} records")
+        return loaded, deduplicated
+    
+    def _upsert_rows(
+        self,
+        conn,
+        table: Table,
+        data: List[Dict[str, Any]],
+        unique_key: Union[str, List[str]],
+        chunksize: int,
+        strategy: str
+    ) -> Tuple[int, int]:
+        """Upsert records on an open connection; returns records written and repeated keys skipped"""
+        if strategy not in ('auto', 'insert', 'merge'):
+            raise ValueError(f"Unknown upsert strategy: {strategy}")
+            
+        key_columns = [unique_key] if isinstance(unique_key, str) else list(unique_key)
+        missing_keys = [col for col in key_columns if col not in table.c]
+        if missing_keys:
+            raise ValueError(f"Unique key columns not in {table.name}: {missing_keys}")
+            
+        deduped = dedupe_rows(data, key_columns)
+        deduplicated = len(data) - len(deduped)
+        if deduplicated:
+            logger.info(f"Skipping {deduplicated} records whose key repeats later in the batch")
+            data = deduped
+            
+        table, columns = self._batch_columns(conn, table, data)
+        update_columns = [col for col in columns if col not in key_columns]
+        dialect_name = conn.dialect.name
+        
+        if strategy == 'auto':
+            native = dialect_name in NATIVE_UPSERT_DIALECTS
+            strategy = 'merge' if not native or len(data) >= self.MERGE_THRESHOLD else 'insert'
+        if strategy == 'merge' and self.dead_letter is not None:
+            # A single MERGE cannot be split per row, so bisect native upserts
+            logger.debug("Using insert upsert strategy so failed rows can be dead-lettered")
+            strategy = 'insert'
+            
+        logger.debug(f"Upserting {len(data)} records into {table.name} using {strategy} strategy")
+        if strategy == 'insert':
+            stmt = build_upsert_statement(table, key_columns, update_columns, dialect_name)
+            written = self._write_rows(
+                conn, table.name, data, chunksize,
+                lambda rows: conn.execute(stmt, normalize_rows(rows, columns))
+            )
+            return written, deduplicated
+        else:
+            staging = create_staging_table(
+                conn, table, columns, f"_stg_{table.name}_{uuid.uuid4().hex[:8]}"
+            )
+            try:
+                insert_stmt = staging.insert()
+                for i in range(0, len(data), chunksize):
+                    conn.execute(insert_stmt, normalize_rows(data[i:i + chunksize], columns))
+                conn.execute(text(build_merge_sql(conn, table, staging, key_columns, columns)))
+            finally:
+                staging.drop(conn)
+                
+        return len(data), deduplicated
+    
+    def _write_rows(
+        self,
+        conn,
+        table_name: str,
+        data: List[Dict[str, Any]],
+        chunksize: int,
+        write: Callable[[List[Dict[str, Any]]], Any]
+    ) -> int:
+        """
+        Write records in chunks, bisecting failed chunks when dead-lettering
+        
+        Without a dead letter sink every chunk is passed straight to write and
+        any error propagates. With one, each chunk is written inside a
+        savepoint; a failed chunk is rolled back to the savepoint and split in
+        half until the offending rows are isolated, so a chunk with k bad rows
+        costs O(k log n) extra statements.
+        
+        Returns:
+            Number of records written
+        """
+        if self.dead_letter is None:
+            for i in range(0, len(data), chunksize):
+                write(data[i:i + chunksize])
+            return len(data)
+            
+        failed: List[Tuple[Dict[str, Any], str]] = []
+        for i in range(0, len(data), chunksize):
+            self._bisect(conn, data[i:i + chunksize], write, failed)
+            
+        if failed:
+            logger.warning(f"Dead-lettered {len(failed)} of {len(data)} records for {table_name}")
+            self._pending_dead_letters().append((table_name, failed))
+        return len(data) - len(failed)
+    
+    def _bisect(
+        self,
+        conn,
+        rows: List[Dict[str, Any]],
+        write: Callable[[List[Dict[str, Any]]], Any],
+        failed: List[Tuple[Dict[str, Any], str]]
+    ):
+        """Write rows in a savepoint, recursing on halves when the write fails"""
+        savepoint = conn.begin_nested()
+        try:
+            write(rows)
+        except Exception as e:
+            savepoint.rollback()
+            if getattr(e, 'connection_invalidated', False):
+                raise
+            if len(rows) == 1:
+                failed.append((dict(rows[0]), describe_error(e)))
+                return
+            middle = len(rows) // 2
+            self._bisect(conn, rows[:middle], write, failed)
+            self._bisect(conn, rows[middle:], write, failed)
+        else:
+            savepoint.commit()
+    
+    def _pending_dead_letters(self) -> List[Tuple[str, List[Tuple[Dict[str, Any], str]]]]:
+        """Failed records buffered by this thread's open transaction"""
+        pending = getattr(self._dead_letters, 'pending', None)
+        if pending is None:
+            pending = self._dead_letters.pending = []
+        return pending
+    
+    def _discard_dead_letters(self):
+        """Forget buffered failed records when their transaction rolls back"""
+        pending = self._pending_dead_letters()
+        if pending:
+            logger.debug(f"Discarding dead letters for {len(pending)} chunks of a rolled back transaction")
+            pending.clear()
+    
+    def _flush_dead_letters(self):
+        """Hand this thread's buffered failed records to the sink after a commit"""
+        if self.dead_letter is None:
+            return
+        pending, self._dead_letters.pending = self._pending_dead_letters(), []
+        for table_name, failed in pending:
+            try:
+                self.dead_letter.write(table_name, failed)
+            except Exception as e:
+                logger.error(f"Error writing {len(failed)} dead letters for {table_name}: {str(e)}")
+                raise
@@ -0,0 +1,124 @@
+"""
+Dead Letter Sinks
+Destinations for records that could not be loaded
+"""
+
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from threading import Lock
+from typing import List, Dict, Any, Tuple, Union
+
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text, DateTime
+
+logger = logging.getLogger(__name__)
+
+# A failed record and the error raised when loading it
+FailedRecord = Tuple[Dict[str, Any], str]
+
+
+def describe_error(error: Exception) -> str:
+    """Short description of a load error, preferring the driver's message"""
+    original = getattr(error, 'orig', None)
+    return f"{type(original or error).__name__}: {str(original or error)}"
+
+
+class DeadLetterSink(ABC):
+    """Base class for dead letter sinks"""
+    
+    @abstractmethod
+    def write(self, table_name: str, failed: List[FailedRecord]):
+        """
+        Store failed records
+        
+        Args:
+            table_name: Table the records were meant for
+            failed: List of (record, error message) tuples
+        """
+        pass
+
+
+class JSONLDeadLetterSink(DeadLetterSink):
+    """Append failed records to a JSON Lines file"""
+    
+    def __init__(self, path: str):
+        """
+        Initialize JSONL sink
+        
+        Args:
+            path: File to append to
+        """
+        self.path = Path(path)
+        self._lock = Lock()
+    
+    def write(self, table_name: str, failed: List[FailedRecord]):
+        if not failed:
+            return
+        failed_at = datetime.now().isoformat()
+        lines = [
+            json.dumps({
+                'failed_at': failed_at,
+                'table': table_name,
+                'error': error,
+                'record': record
+            }, default=str) + '\n'
+            for record, error in failed
+        ]
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.writelines(lines)
+
+
+class TableDeadLetterSink(DeadLetterSink):
+    """Insert failed records into a side table"""
+    
+    def __init__(self, connection_string: str, table_name: str = '_dead_letters'):
+        """
+        Initialize table sink
+        
+        The sink uses its own connection, so dead letters are kept even if
+        the load that produced them is rolled back.
+        
+        Args:
+            connection_string: Database connection string
+            table_name: Dead letter table, created if missing
+        """
+        self.engine = create_engine(connection_string)
+        self.table = Table(
+            table_name,
+            MetaData(),
+            Column('id', Integer, primary_key=True, autoincrement=True),
+            Column('failed_at', DateTime, nullable=False),
+            Column('target_table', String(255), nullable=False),
+            Column('error', Text),
+            Column('record', Text)
+        )
+        self._created = False
+    
+    def write(self, table_name: str, failed: List[FailedRecord]):
+        if not failed:
+            return
+        failed_at = datetime.now()
+        with self.engine.begin() as conn:
+            if not self._created:
+                self.table.create(conn, checkfirst=True)
+                self._created = True
+            conn.execute(self.table.insert(), [
+                {
+                    'failed_at': failed_at,
+                    'target_table': table_name,
+                    'error': error,
+                    'record': json.dumps(record, default=str)
+                }
+                for record, error in failed
+            ])
+
+
+def make_dead_letter_sink(sink: Union[str, DeadLetterSink, None]) -> Union[DeadLetterSink, None]:
+    """Turn a file path into a JSONL sink; pass sinks and None through"""
+    if sink is None or isinstance(sink, DeadLetterSink):
+        return sink
+    return JSONLDeadLetterSink(str(sink))
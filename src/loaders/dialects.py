@@ -0,0 +1,341 @@
+"""
+SQL Dialects
+Dialect-specific statements for bulk database writes
+"""
+
+import json
+import logging
+from decimal import Decimal
+from typing import List, Sequence, Dict, Any, Iterator, Tuple
+
+from sqlalchemy import Table, MetaData, Column
+from sqlalchemy.dialects import postgresql, sqlite, mysql
+from sqlalchemy.engine import Connection
+
+from ..utils.records import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+# Dialects with a native INSERT ... ON CONFLICT / ON DUPLICATE KEY statement
+NATIVE_UPSERT_DIALECTS = ('postgresql', 'sqlite', 'mysql', 'mariadb')
+
+# Rows rendered per chunk of the COPY stream
+COPY_ROWS_PER_CHUNK = 5000
+
+
+def build_upsert_statement(
+    table: Table,
+    key_columns: Sequence[str],
+    update_columns: Sequence[str],
+    dialect_name: str
+):
+    """
+    Build an INSERT statement that updates rows on key conflicts
+    
+    The statement carries no values so it can be executed with a list of
+    parameter dictionaries (executemany).
+    
+    Args:
+        table: Target table
+        key_columns: Columns of the unique constraint
+        update_columns: Columns to overwrite on conflict
+        dialect_name: SQLAlchemy dialect name
+        
+    Returns:
+        Insert statement
+    """
+    if dialect_name in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        stmt = insert(table)
+        if not update_columns:
+            return stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+        return stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={col: stmt.excluded[col] for col in update_columns}
+        )
+        
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table)
+        # MySQL needs at least one assignment; a no-op one keeps existing rows
+        assignments = update_columns or key_columns[:1]
+        return stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in assignments})
+        
+    raise NotImplementedError(f"No native upsert statement for dialect: {dialect_name}")
+
+
+def create_staging_table(conn: Connection, table: Table, columns: Sequence[str], name: str) -> Table:
+    """
+    Create an empty staging table with the given columns of the target table
+    
+    Args:
+        conn: Open connection
+        table: Target table the columns are copied from
+        columns: Column names to include
+        name: Staging table name
+        
+    Returns:
+        Staging table
+    """
+    temporary = conn.dialect.name in NATIVE_UPSERT_DIALECTS
+    staging = Table(
+        name,
+        MetaData(),
+        *[Column(col, table.c[col].type) for col in columns],
+        prefixes=['TEMPORARY'] if temporary else []
+    )
+    staging.create(conn)
+    return staging
+
+
+def build_merge_sql(
+    conn: Connection,
+    table: Table,
+    staging: Table,
+    key_columns: Sequence[str],
+    columns: Sequence[str]
+) -> str:
+    """
+    Build the statement that merges a staging table into the target table
+    
+    Uses MERGE where the database supports it and the equivalent
+    INSERT ... SELECT ... ON CONFLICT / ON DUPLICATE KEY form otherwise.
+    
+    Args:
+        conn: Open connection
+        table: Target table
+        staging: Staging table holding the new rows
+        key_columns: Columns of the unique constraint
+        columns: Columns present in the staging table
+        
+    Returns:
+        SQL string
+    """
+    dialect = conn.dialect
+    quote = dialect.identifier_preparer.quote
+    target_name = dialect.identifier_preparer.format_table(table)
+    staging_name = dialect.identifier_preparer.format_table(staging)
+    update_columns = [col for col in columns if col not in key_columns]
+    column_list = ', '.join(quote(col) for col in columns)
+    
+    if dialect.name == 'sqlite' or (
+        dialect.name == 'postgresql' and (dialect.server_version_info or (0,)) < (15,)
+    ):
+        keys = ', '.join(quote(col) for col in key_columns)
+        if update_columns:
+            action = 'DO UPDATE SET ' + ', '.join(f"{quote(col)} = excluded.{quote(col)}" for col in update_columns)
+        else:
+            action = 'DO NOTHING'
+        # WHERE true disambiguates ON CONFLICT from a join clause in SQLite
+        return (
+            f"INSERT INTO {target_name} ({column_list}) "
+            f"SELECT {column_list} FROM {staging_name} WHERE true "
+            f"ON CONFLICT ({keys}) {action}"
+        )
+        
+    if dialect.name in ('mysql', 'mariadb'):
+        assignments = update_columns or list(key_columns[:1])
+        updates = ', '.join(f"{quote(col)} = s.{quote(col)}" for col in assignments)
+        return (
+            f"INSERT INTO {target_name} ({column_list}) "
+            f"SELECT {column_list} FROM {staging_name} AS s "
+            f"ON DUPLICATE KEY UPDATE {updates}"
+        )
+        
+    on_clause = ' AND '.join(f"t.{quote(col)} = s.{quote(col)}" for col in key_columns)
+    merge = (
+        f"MERGE INTO {target_name} t USING {staging_name} s ON ({on_clause}) "
+    )
+    if update_columns:
+        merge += 'WHEN MATCHED THEN UPDATE SET ' + ', '.join(
+            f"{quote(col)} = s.{quote(col)}" for col in update_columns
+        ) + ' '
+    merge += (
+        f"WHEN NOT MATCHED THEN INSERT ({column_list}) "
+        f"VALUES ({', '.join('s.' + quote(col) for col in columns)})"
+    )
+    if dialect.name == 'mssql':
+        merge += ';'
+    return merge
+
+
+def iter_row_values(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> Iterator[tuple]:
+    """Values of each row in column order; missing fields are None"""
+    if isinstance(rows, RecordBatch):
+        return rows.tuples(columns)
+    return (tuple(row.get(col) for col in columns) for row in rows)
+
+
+def dedupe_rows(rows: Sequence[Dict[str, Any]], key_columns: Sequence[str]) -> Sequence[Dict[str, Any]]:
+    """
+    Keep the last row of each key
+    
+    ON CONFLICT DO UPDATE and MERGE fail when one statement affects the same
+    row twice, which paginated APIs cause by returning a record on two
+    pages. Rows with a NULL key column never conflict and are all kept.
+    
+    Returns:
+        The rows themselves when no key repeats, otherwise the deduplicated
+        rows in order of each key's first appearance
+    """
+    if isinstance(rows, RecordBatch):
+        keys = rows.tuples(key_columns)
+        values = rows.rows
+    else:
+        keys = (tuple(row.get(col) for col in key_columns) for row in rows)
+        values = rows
+    latest: Dict[Any, Any] = {}
+    for position, (key, row) in enumerate(zip(keys, values)):
+        latest[position if None in key else key] = row
+    if len(latest) == len(rows):
+        return rows
+    if isinstance(rows, RecordBatch):
+        return RecordBatch(rows.schema, list(latest.values()))
+    return list(latest.values())
+
+
+def normalize_rows(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> List[dict]:
+    """Give every row the same keys so it can be sent with executemany"""
+    if isinstance(rows, RecordBatch):
+        return [dict(zip(columns, values)) for values in rows.tuples(columns)]
+    return [{col: row.get(col) for col in columns} for row in rows]
+
+
+def _csv_field(value: Any) -> str:
+    """Render a value as a PostgreSQL COPY CSV field (unquoted empty is NULL)"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, default=str)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def iter_copy_csv(rows: Sequence[Dict[str, Any]], columns: Sequence[str]) -> Iterator[str]:
+    """Render rows as CSV text in chunks for COPY FROM STDIN"""
+    for i in range(0, len(rows), COPY_ROWS_PER_CHUNK):
+        yield ''.join(
+            ','.join(map(_csv_field, values)) + '\n'
+            for values in iter_row_values(rows[i:i + COPY_ROWS_PER_CHUNK], columns)
+        )
+
+
+class _ChunkReader:
+    """File-like wrapper over text chunks for psycopg2's copy_expert"""
+    
+    def __init__(self, chunks: Iterator[str]):
+        self.chunks = chunks
+        self.buffer = ''
+    
+    def read(self, size: int = -1) -> str:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        if size < 0:
+            data, self.buffer = self.buffer, ''
+        else:
+            data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+        
+    readline = read
+
+
+def _adapt_sqlite(value: Any) -> Any:
+    """Serialize nested values that sqlite3 cannot bind"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=str)
+    return value
+
+
+def bulk_insert(
+    conn: Connection,
+    table: Table,
+    columns: Sequence[str],
+    rows: Sequence[Dict[str, Any]],
+    chunksize: int,
+    statement_cache: Dict[Tuple[str, Tuple[str, ...]], str]
+) -> str:
+    """
+    Append rows using the fastest path the dialect offers
+    
+    PostgreSQL streams CSV through COPY FROM STDIN, SQLite runs one prepared
+    INSERT through the driver's executemany, and other dialects fall back to
+    SQLAlchemy executemany. Everything runs in the caller's transaction.
+    
+    Args:
+        conn: Open connection
+        table: Target table
+        columns: Columns to write
+        rows: Records to write
+        chunksize: Number of records per executemany batch
+        statement_cache: Cache of rendered SQL keyed by (table, columns)
+        
+    Returns:
+        Name of the path used ('copy', 'executemany' or 'insert')
+    """
+    dialect = conn.dialect
+    preparer = dialect.identifier_preparer
+    cache_key = (table.name, tuple(columns))
+    cursor = None
+    
+    if dialect.name in ('postgresql', 'sqlite'):
+        # Driver cursors bypass autobegin, so make sure the caller's commit covers them
+        if not conn.in_transaction():
+            conn.begin()
+        cursor = conn.connection.dbapi_connection.cursor()
+        
+    if dialect.name == 'postgresql' and (hasattr(cursor, 'copy_expert') or hasattr(cursor, 'copy')):
+        sql = statement_cache.get(cache_key)
+        if sql is None:
+            sql = (
+                f"COPY {preparer.format_table(table)} "
+                f"({', '.join(preparer.quote(col) for col in columns)}) "
+                f"FROM STDIN WITH (FORMAT csv)"
+            )
+            statement_cache[cache_key] = sql
+            
+        chunks = iter_copy_csv(rows, columns)
+        try:
+            if hasattr(cursor, 'copy_expert'):
+                # psycopg2
+                cursor.copy_expert(sql, _ChunkReader(chunks))
+            else:
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    for chunk in chunks:
+                        copy.write(chunk)
+        finally:
+            cursor.close()
+        return 'copy'
+        
+    if dialect.name == 'sqlite':
+        sql = statement_cache.get(cache_key)
+        if sql is None:
+            sql = (
+                f"INSERT INTO {preparer.format_table(table)} "
+                f"({', '.join(preparer.quote(col) for col in columns)}) "
+                f"VALUES ({', '.join('?' for _ in columns)})"
+            )
+            statement_cache[cache_key] = sql
+            
+        try:
+            for i in range(0, len(rows), chunksize):
+                cursor.executemany(sql, [
+                    tuple(map(_adapt_sqlite, values))
+                    for values in iter_row_values(rows[i:i + chunksize], columns)
+                ])
+        finally:
+            cursor.close()
+        return 'executemany'
+        
+    if cursor is not None:
+        cursor.close()
+        
+    insert_stmt = table.insert()
+    for i in range(0, len(rows), chunksize):
+        conn.execute(insert_stmt, normalize_rows(rows[i:i + chunksize], columns))
+    return 'insert'
@@ -0,0 +1,318 @@
+"""
+File Loader
+Loads extracted data into partitioned Parquet or Arrow IPC files
+"""
+
+import logging
+import os
+import uuid
+from datetime import datetime, date
+from itertools import islice
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Iterable, Union
+
+from ..utils.records import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+
+def _import_pyarrow():
+    """Import pyarrow, which is only needed for file sinks"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+        return pyarrow
+    except ImportError:
+        raise ImportError("pyarrow is required for ParquetLoader/ArrowLoader: pip install pyarrow")
+
+
+class _PartitionWriter:
+    """Writes one partition directory, rolling files by row count"""
+    
+    def __init__(self, loader: 'ParquetLoader', directory: Path):
+        self.loader = loader
+        self.directory = directory
+        self.buffer: List[Dict[str, Any]] = []
+        self.writer = None
+        self.schema = None
+        self.temp_path: Optional[Path] = None
+        self.rows_in_file = 0
+        self.finished: List[Path] = []
+        self.files: List[str] = []
+    
+    def add(self, record: Dict[str, Any]):
+        self.buffer.append(record)
+        if len(self.buffer) >= self.loader.row_group_size:
+            self.flush()
+    
+    def flush(self):
+        """Write buffered records as one row group"""
+        if not self.buffer:
+            return
+        pa = _import_pyarrow()
+        rows, self.buffer = self.buffer, []
+        
+        batch = None
+        if self.writer is not None:
+            names = set(self.schema.names)
+            if not all(names.issuperset(row.keys()) for row in rows):
+                # The file's schema would drop the new fields; start a file that has them
+                logger.debug(f"New fields in {self.directory}, rolling file")
+                self.close()
+            else:
+                try:
+                    batch = pa.Table.from_pylist(rows, schema=self.schema)
+                except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                    # Types changed between batches; start a file with the new schema
+                    logger.debug(f"Schema changed in {self.directory}, rolling file")
+                    self.close()
+        if batch is None:
+            # from_pylist takes its columns from the first row only
+            names = list(dict.fromkeys(name for row in rows for name in row))
+            batch = pa.Table.from_pydict({name: [row.get(name) for row in rows] for name in names})
+            # All-null columns infer as the null type, which most readers
+            # cannot merge with later files; store them as strings instead
+            schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in batch.schema
+            ])
+            if schema != batch.schema:
+                batch = batch.cast(schema)
+            
+        if self.writer is None:
+            self._open(batch.schema)
+            
+        self.loader._write(self.writer, batch)
+        self.rows_in_file += batch.num_rows
+        if self.rows_in_file >= self.loader.max_rows_per_file:
+            self.close()
+    
+    def _open(self, schema):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"part-{uuid.uuid4().hex}.{self.loader.extension}"
+        self.temp_path = self.directory / f".{name}.tmp"
+        self.schema = schema
+        self.writer = self.loader._open_writer(self.temp_path, schema)
+        self.rows_in_file = 0
+    
+    def close(self):
+        """Finish the current file; it stays hidden until commit()"""
+        if self.writer is None:
+            return
+        self.writer.close()
+        self.finished.append(self.temp_path)
+        self.writer = None
+        self.temp_path = None
+    
+    def commit(self):
+        """Move finished files into place"""
+        for temp_path in self.finished:
+            final_path = temp_path.with_name(temp_path.name[1:-len('.tmp')])
+            os.replace(temp_path, final_path)
+            self.files.append(str(final_path))
+        self.finished = []
+    
+    def abort(self):
+        """Discard every file written by this load"""
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            finally:
+                self.writer = None
+        if self.temp_path is not None:
+            self.finished.append(self.temp_path)
+            self.temp_path = None
+        for temp_path in self.finished:
+            if temp_path.exists():
+                temp_path.unlink()
+        self.finished = []
+
+
+class ParquetLoader:
+    """Load data to partitioned Parquet files"""
+    
+    extension = 'parquet'
+    
+    def __init__(
+        self,
+        base_path: str,
+        compression: Optional[str] = None,
+        row_group_size: int = 100000,
+        max_rows_per_file: int = 1000000,
+        timestamp_field: Optional[str] = None,
+        partition_by: Optional[List[str]] = None,
+        partition_granularity: str = 'day'
+    ):
+        """
+        Initialize file loader
+        
+        Files are written to base_path/<table_name>/<partition>/ as hidden
+        temp files and renamed into place only when the whole load succeeds,
+        so readers never see partial files or partial loads.
+        
+        Args:
+            base_path: Root directory of the landing zone
+            compression: Codec name; defaults to zstd when available, else snappy
+            row_group_size: Records buffered per partition before a row group is written
+            max_rows_per_file: Records per file before rolling to a new one
+            timestamp_field: Field used to partition by date (e.g. 'updated_at')
+            partition_by: Fields used as hive-style partitions (field=value)
+            partition_granularity: 'day', 'month' or 'hour' for timestamp partitions
+        """
+        if partition_granularity not in ('day', 'month', 'hour'):
+            raise ValueError(f"Unknown partition_granularity: {partition_granularity}")
+            
+        self.base_path = Path(base_path)
+        self.compression = compression or self._default_compression()
+        self.row_group_size = row_group_size
+        self.max_rows_per_file = max_rows_per_file
+        self.timestamp_field = timestamp_field
+        self.partition_by = partition_by or []
+        self.partition_granularity = partition_granularity
+    
+    def _default_compression(self) -> str:
+        """Pick the best codec this pyarrow build supports"""
+        pa = _import_pyarrow()
+        return 'zstd' if pa.Codec.is_available('zstd') else 'snappy'
+    
+    def _open_writer(self, path: Path, schema):
+        pa = _import_pyarrow()
+        return pa.parquet.ParquetWriter(str(path), schema, compression=self.compression)
+    
+    def _write(self, writer, table):
+        writer.write_table(table, row_group_size=self.row_group_size)
+    
+    def _partition_path(self, record: Dict[str, Any]) -> str:
+        """Build the partition directory for a record"""
+        parts = []
+        
+        if self.timestamp_field:
+            value = record.get(self.timestamp_field)
+            if isinstance(value, str):
+                try:
+                    value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                except ValueError:
+                    value = None
+            if isinstance(value, (datetime, date)):
+                if self.partition_granularity == 'month':
+                    parts.append(f"month={value.strftime('%Y-%m')}")
+                else:
+                    parts.append(f"date={value.strftime('%Y-%m-%d')}")
+                    if self.partition_granularity == 'hour' and isinstance(value, datetime):
+                        parts.append(f"hour={value.strftime('%H')}")
+            else:
+                parts.append('date=unknown')
+                
+        for field in self.partition_by:
+            value = str(record.get(field)).replace('/', '_')
+            parts.append(f"{field}={value}")
+            
+        return os.path.join(*parts) if parts else ''
+    
+    def load(
+        self,
+        data: List[Dict[str, Any]],
+        table_name: str
+    ) -> Dict[str, Any]:
+        """
+        Load data to files
+        
+        Args:
+            data: List of records to load
+            table_name: Dataset name (subdirectory of base_path)
+            
+        Returns:
+            Dictionary with load results
+        """
+        if not data:
+            logger.warning("No data to load")
+            return {'records_loaded': 0, 'status': 'skipped'}
+        return self.load_stream(data, table_name)
+    
+    def load_stream(
+        self,
+        records: Iterable[Union[Dict[str, Any], List[Dict[str, Any]], RecordBatch]],
+        table_name: str,
+        batch_size: int = 10000
+    ) -> Dict[str, Any]:
+        """
+        Load records from an iterator of records or pages
+        
+        Memory is bounded by row_group_size records per open partition.
+        
+        Args:
+            records: Iterable of records, lists of records or RecordBatches
+            table_name: Dataset name (subdirectory of base_path)
+            batch_size: Records pulled from the iterator at a time
+            
+        Returns:
+            Dictionary with load results
+        """
+        writers: Dict[str, _PartitionWriter] = {}
+        table_path = self.base_path / table_name
+        records_loaded = 0
+        
+        def flatten():
+            for item in records:
+                if isinstance(item, RecordBatch):
+                    # pyarrow builds tables from plain dicts
+                    yield from item.to_dicts()
+                elif isinstance(item, (list, tuple)):
+                    yield from item
+                else:
+                    yield item
+                    
+        try:
+            flat = flatten()
+            while True:
+                batch = list(islice(flat, batch_size))
+                if not batch:
+                    break
+                for record in batch:
+                    partition = self._partition_path(record)
+                    writer = writers.get(partition)
+                    if writer is None:
+                        writer = writers[partition] = _PartitionWriter(self, table_path / partition)
+                    writer.add(record)
+                records_loaded += len(batch)
+                
+            for writer in writers.values():
+                writer.flush()
+                writer.close()
+            for writer in writers.values():
+                writer.commit()
+                
+        except Exception as e:
+            for writer in writers.values():
+                writer.abort()
+            logger.error(f"Error writing {table_name} files: {str(e)}")
+            raise
+            
+        files = [path for writer in writers.values() for path in writer.files]
+        logger.info(f"Wrote {records_loaded} records to {len(files)} {self.extension} files under {table_path}")
+        return {
+            'records_loaded': records_loaded,
+            'files': files,
+            'status': 'success' if records_loaded else 'skipped',
+            'table': table_name
+        }
+
+
+class ArrowLoader(ParquetLoader):
+    """Load data to partitioned Arrow IPC (Feather v2) files"""
+    
+    extension = 'arrow'
+    
+    def _default_compression(self) -> str:
+        """Pick the best codec this pyarrow build supports for IPC"""
+        pa = _import_pyarrow()
+        return 'zstd' if pa.Codec.is_available('zstd') else 'lz4'
+    
+    def _open_writer(self, path: Path, schema):
+        pa = _import_pyarrow()
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        return pa.ipc.new_file(str(path), schema, options=options)
+    
+    def _write(self, writer, table):
+        writer.write_table(table, max_chunksize=self.row_group_size)
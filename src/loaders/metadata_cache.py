@@ -0,0 +1,81 @@
+"""
+Metadata Cache
+Caches reflected table definitions for loaders
+"""
+
+import logging
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import MetaData, Table, inspect
+
+logger = logging.getLogger(__name__)
+
+
+class TableMetadataCache:
+    """Cache of reflected tables with a time-to-live"""
+    
+    def __init__(self, ttl: Optional[float] = 300.0):
+        """
+        Initialize metadata cache
+        
+        Args:
+            ttl: Seconds a reflected table stays valid; None keeps it until invalidated
+        """
+        self.ttl = ttl
+        self._tables: Dict[str, Tuple[Table, float]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def _fresh(self, entry: Tuple[Table, float]) -> bool:
+        return self.ttl is None or time.monotonic() - entry[1] < self.ttl
+    
+    def peek(self, table_name: str) -> Optional[Table]:
+        """Get a cached table without reflecting it"""
+        with self._lock:
+            entry = self._tables.get(table_name)
+            if entry and self._fresh(entry):
+                return entry[0]
+        return None
+    
+    def get(self, conn, table_name: str) -> Table:
+        """
+        Get a table definition, reflecting it when missing or expired
+        
+        Args:
+            conn: Open connection used for reflection
+            table_name: Table name
+            
+        Returns:
+            Reflected table
+        """
+        table = self.peek(table_name)
+        if table is not None:
+            self.hits += 1
+            return table
+            
+        self.misses += 1
+        table = Table(table_name, MetaData(), autoload_with=conn)
+        with self._lock:
+            self._tables[table_name] = (table, time.monotonic())
+        logger.debug(f"Reflected table {table_name}")
+        return table
+    
+    def has_table(self, conn, table_name: str) -> bool:
+        """Check whether a table exists, using the cache first"""
+        return self.peek(table_name) is not None or inspect(conn).has_table(table_name)
+    
+    def invalidate(self, table_name: Optional[str] = None):
+        """
+        Drop cached definitions
+        
+        Args:
+            table_name: Table to drop; all tables when not given
+        """
+        with self._lock:
+            if table_name is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table_name, None)
@@ -0,0 +1,166 @@
+"""
+Schema Evolution
+Adds new columns and widens column types to fit incoming records
+"""
+
+import logging
+from datetime import datetime, date
+from typing import List, Dict, Any, Tuple, NamedTuple
+
+from sqlalchemy import (
+    Table, Column, BigInteger, Boolean, Date, DateTime, Float, Integer,
+    JSON, SmallInteger, String, Text, text
+)
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+INT32_MAX = 2 ** 31 - 1
+INT16_MAX = 2 ** 15 - 1
+
+# Dialects that can change a column's type in place
+ALTER_TYPE_DIALECTS = ('postgresql', 'mysql', 'mariadb', 'mssql')
+
+
+class SchemaChanges(NamedTuple):
+    """Columns to add and columns to widen for a batch"""
+    new_columns: List[Column]
+    widened_columns: List[Tuple[Column, Any]]
+
+
+def infer_column_type(values: List[Any]):
+    """
+    Pick a SQLAlchemy type for a new column from its values
+    
+    Args:
+        values: Non-null values seen in the batch
+        
+    Returns:
+        SQLAlchemy type instance
+    """
+    if not values:
+        return Text()
+    if all(isinstance(v, bool) for v in values):
+        return Boolean()
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        return BigInteger()
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return Float()
+    if all(isinstance(v, datetime) for v in values):
+        return DateTime()
+    if all(isinstance(v, date) for v in values):
+        return Date()
+    if all(isinstance(v, (dict, list)) for v in values):
+        return JSON()
+    return Text()
+
+
+def _widen(column: Column, values: List[Any]):
+    """Return a wider type that fits the values, or None if not needed or unsafe"""
+    col_type = column.type
+    
+    if isinstance(col_type, (SmallInteger, Integer)) and not isinstance(col_type, BigInteger):
+        if any(isinstance(v, float) for v in values):
+            # 32-bit integers are exact in a double
+            return Float()
+        ints = [abs(v) for v in values if isinstance(v, int) and not isinstance(v, bool)]
+        if ints:
+            largest = max(ints)
+            if largest > INT32_MAX:
+                return BigInteger()
+            if isinstance(col_type, SmallInteger) and largest > INT16_MAX:
+                return Integer()
+        return None
+        
+    if isinstance(col_type, String) and not isinstance(col_type, Text) and col_type.length:
+        lengths = [len(v) for v in values if isinstance(v, str)]
+        if lengths and max(lengths) > col_type.length:
+            longest = max(lengths)
+            # Grow in powers of two to avoid altering again for every slightly longer value
+            new_length = 1 << (longest - 1).bit_length()
+            return String(new_length) if new_length <= 65535 else Text()
+            
+    return None
+
+
+def plan_schema_changes(table: Table, data: List[Dict[str, Any]]) -> SchemaChanges:
+    """
+    Compare a batch against a table definition
+    
+    Args:
+        table: Reflected target table
+        data: Records about to be loaded
+        
+    Returns:
+        SchemaChanges with the columns to add and widen
+    """
+    values: Dict[str, List[Any]] = {}
+    for record in data:
+        for key, value in record.items():
+            bucket = values.setdefault(key, [])
+            if value is not None:
+                bucket.append(value)
+                
+    new_columns = [
+        Column(name, infer_column_type(vals), nullable=True)
+        for name, vals in values.items()
+        if name not in table.c
+    ]
+    
+    widened_columns = []
+    for name, vals in values.items():
+        if name in table.c and vals:
+            wider = _widen(table.c[name], vals)
+            if wider is not None:
+                widened_columns.append((table.c[name], wider))
+                
+    return SchemaChanges(new_columns, widened_columns)
+
+
+def apply_schema_changes(conn: Connection, table: Table, changes: SchemaChanges) -> bool:
+    """
+    Issue ALTER TABLE statements for planned changes
+    
+    One ADD COLUMN is issued per new column. Types are only widened on
+    dialects that support altering a column type; elsewhere (e.g. SQLite,
+    which does not enforce declared types) the change is skipped.
+    
+    Args:
+        conn: Open connection
+        table: Target table
+        changes: Planned changes
+        
+    Returns:
+        True if any statement was issued
+    """
+    dialect = conn.dialect
+    preparer = dialect.identifier_preparer
+    table_sql = preparer.format_table(table)
+    altered = False
+    
+    for column in changes.new_columns:
+        type_sql = column.type.compile(dialect=dialect)
+        conn.execute(text(f"ALTER TABLE {table_sql} ADD COLUMN {preparer.quote(column.name)} {type_sql}"))
+        logger.info(f"Added column {table.name}.{column.name} ({type_sql})")
+        altered = True
+        
+    for column, new_type in changes.widened_columns:
+        if dialect.name not in ALTER_TYPE_DIALECTS:
+            logger.debug(f"Not widening {table.name}.{column.name}: unsupported on {dialect.name}")
+            continue
+            
+        name = preparer.quote(column.name)
+        type_sql = new_type.compile(dialect=dialect)
+        if dialect.name == 'postgresql':
+            sql = f"ALTER TABLE {table_sql} ALTER COLUMN {name} TYPE {type_sql}"
+        elif dialect.name == 'mssql':
+            null_sql = 'NULL' if column.nullable else 'NOT NULL'
+            sql = f"ALTER TABLE {table_sql} ALTER COLUMN {name} {type_sql} {null_sql}"
+        else:
+            null_sql = 'NULL' if column.nullable else 'NOT NULL'
+            sql = f"ALTER TABLE {table_sql} MODIFY COLUMN {name} {type_sql} {null_sql}"
+        conn.execute(text(sql))
+        logger.info(f"Widened column {table.name}.{column.name} from {column.type} to {type_sql}")
+        altered = True
+        
+    return altered
@@ -0,0 +1,74 @@
+"""
+Sync State
+Incremental sync watermarks stored in the target database
+"""
+
+import logging
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Watermark(NamedTuple):
+    """Position of an incremental sync, committed together with its data"""
+    key: str
+    value: datetime
+
+
+def state_table(table_name: str):
+    """Definition of the sync state table"""
+    # Imported here so extractors can use Watermark without loading sqlalchemy
+    from sqlalchemy import MetaData, Table, Column, String, DateTime
+    
+    return Table(
+        table_name,
+        MetaData(),
+        Column('sync_key', String(255), primary_key=True),
+        Column('watermark', String(64), nullable=False),
+        Column('updated_at', DateTime, nullable=False)
+    )
+
+
+def read_watermark(conn, table_name: str, key: str) -> Optional[datetime]:
+    """
+    Read a watermark
+    
+    Args:
+        conn: Open connection
+        table_name: Sync state table
+        key: Sync key
+        
+    Returns:
+        Stored watermark, or None if the key or table does not exist
+    """
+    table = state_table(table_name)
+    if not conn.dialect.has_table(conn, table_name):
+        return None
+    value = conn.execute(
+        table.select().with_only_columns(table.c.watermark).where(table.c.sync_key == key)
+    ).scalar()
+    return datetime.fromisoformat(value) if value else None
+
+
+def write_watermark(conn, table_name: str, watermark: Watermark):
+    """
+    Write a watermark in the caller's transaction
+    
+    The row is replaced with a delete and insert, which every dialect
+    supports and which commits or rolls back with the surrounding load.
+    
+    Args:
+        conn: Connection with an open transaction
+        table_name: Sync state table, created if missing
+        watermark: Key and value to store
+    """
+    table = state_table(table_name)
+    table.create(conn, checkfirst=True)
+    conn.execute(table.delete().where(table.c.sync_key == watermark.key))
+    conn.execute(table.insert().values(
+        sync_key=watermark.key,
+        watermark=watermark.value.isoformat(),
+        updated_at=datetime.now()
+    ))
+    logger.debug(f"Staged watermark {watermark.key}={watermark.value.isoformat()}")
@@ -0,0 +1,20 @@
+# Pipeline Package
+
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .runner import PipelineRunner
+    from .profiler import StageProfiler
+    from .memory import MemoryGovernor
+    from .sync import SyncRunner
+
+__all__ = ['PipelineRunner', 'StageProfiler', 'MemoryGovernor', 'SyncRunner']
+
+__getattr__, __dir__ = attach(__name__, {
+    'PipelineRunner': '.runner',
+    'StageProfiler': '.profiler',
+    'MemoryGovernor': '.memory',
+    'SyncRunner': '.sync'
+})
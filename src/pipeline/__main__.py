@@ -0,0 +1,9 @@
+"""
+Run the configured API syncs: python -m src.pipeline --config config/api_config.yaml
+"""
+
+import sys
+
+from .sync import main
+
+sys.exit(main())
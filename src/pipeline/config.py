@@ -0,0 +1,210 @@
+"""
+Sync Configuration
+Builds clients, rate limiters and sync jobs from api_config.yaml
+"""
+
+import logging
+import os
+import re
+from typing import List, Dict, Any, NamedTuple, Optional, Union
+
+import yaml
+
+from ..clients.base_client import BaseClient
+from ..clients.oauth_client import OAuthClient
+from ..clients.rest_client import RESTClient
+from ..utils.rate_limiter import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+_ENV_PATTERN = re.compile(r'\$\{([^}]+)\}')
+
+
+class SyncJob(NamedTuple):
+    """One endpoint to sync into one table"""
+    api: str
+    name: str
+    path: str
+    table: str
+    priority: int
+    load_mode: str
+    unique_key: Optional[Union[str, List[str]]]
+    incremental: bool
+    pagination: bool
+    page_size: int
+    params: Dict[str, Any]
+    field_mapping: Optional[Dict[str, str]]
+
+
+def expand_env(value: Any) -> Any:
+    """
+    Replace ${VAR} references with environment variables
+    
+    Args:
+        value: Config value; dicts and lists are expanded recursively
+    
+    Returns:
+        Expanded value
+    """
+    if isinstance(value, dict):
+        return {key: expand_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [expand_env(item) for item in value]
+    if not isinstance(value, str):
+        return value
+    
+    def lookup(match):
+        name = match.group(1)
+        if name not in os.environ:
+            raise ValueError(f"Environment variable {name} is not set")
+        return os.environ[name]
+    
+    return _ENV_PATTERN.sub(lookup, value)
+
+
+def load_config(path: str) -> Dict[str, Any]:
+    """
+    Read a sync configuration file
+    
+    ${VAR} references are left in place here and expanded when the section
+    using them is built, so unused APIs need no credentials.
+    
+    Args:
+        path: YAML file in the layout of config/api_config.yaml.example
+    
+    Returns:
+        Configuration dictionary
+    """
+    with open(path, 'r') as f:
+        config = yaml.safe_load(f) or {}
+    if not isinstance(config.get('apis'), dict) or not config['apis']:
+        raise ValueError(f"{path} defines no apis")
+    return config
+
+
+def build_client(api_config: Dict[str, Any]) -> BaseClient:
+    """
+    Build the client for one API
+    
+    Args:
+        api_config: Entry under apis; authentication type is 'api_key',
+            'oauth2', 'basic' or 'none'
+    
+    Returns:
+        Configured client
+    """
+    api_config = expand_env(api_config)
+    auth = api_config.get('authentication') or {'type': 'none'}
+    retry = api_config.get('retry') or {}
+    options = {
+        'timeout': api_config.get('timeout', 30),
+        'max_retries': retry.get('max_retries', 3),
+        'backoff_factor': retry.get('backoff_factor', 1.0),
+        'log_every': api_config.get('log_every', 1)
+    }
+    auth_type = auth.get('type', 'none')
+    
+    if auth_type == 'api_key':
+        return RESTClient(
+            api_config['base_url'],
+            api_key=auth.get('value'),
+            api_key_header=auth.get('header', 'X-API-Key'),
+            **options
+        )
+    if auth_type == 'oauth2':
+        return OAuthClient(
+            api_config['base_url'],
+            client_id=auth['client_id'],
+            client_secret=auth['client_secret'],
+            token_url=auth['token_url'],
+            scope=auth.get('scope'),
+            **options
+        )
+    if auth_type in ('basic', 'none'):
+        client = RESTClient(api_config['base_url'], **options)
+        if auth_type == 'basic':
+            client.session.auth = (auth['username'], auth['password'])
+        return client
+    raise ValueError(f"Unknown authentication type: {auth_type}")
+
+
+def build_rate_limiter(api_config: Dict[str, Any]) -> Optional[RateLimiter]:
+    """
+    Build the rate limiter shared by all endpoints of one API
+    
+    Returns:
+        Rate limiter, or None when the API has no rate_limit section
+    """
+    rate_limit = api_config.get('rate_limit')
+    if not rate_limit:
+        return None
+    return RateLimiter(
+        requests_per_second=rate_limit.get('requests_per_second', 10.0),
+        requests_per_minute=rate_limit.get('requests_per_minute')
+    )
+
+
+def _endpoint_mapping(field_mappings: Dict[str, Any], api_name: str, name: str) -> Optional[Dict[str, str]]:
+    """Field mapping configured for one endpoint under transformation.field_mappings"""
+    for key in (f"{api_name}.{name}", name):
+        mapping = field_mappings.get(key)
+        if isinstance(mapping, dict):
+            return mapping
+    return None
+
+
+def build_jobs(config: Dict[str, Any], apis: Optional[List[str]] = None) -> List[SyncJob]:
+    """
+    List the endpoints to sync, highest priority first
+    
+    An endpoint is either a path or a mapping with 'path' and optional
+    'table', 'priority', 'load_mode', 'unique_key', 'incremental',
+    'pagination', 'page_size', 'params' and 'field_mapping'. Unset options
+    fall back to the API's 'priority' and the loading.database and
+    extraction defaults. An endpoint without its own field_mapping uses
+    transformation.field_mappings['<api>.<endpoint>'] or ['<endpoint>'];
+    mappings are never shared across endpoints, since a mapping keeps only
+    the fields it names. Tables default to <api>_<endpoint>.
+    
+    Args:
+        config: Configuration from load_config
+        apis: Names of the APIs to include (all when None)
+    
+    Returns:
+        Jobs ordered by descending priority, then config order
+    """
+    extraction = config.get('extraction') or {}
+    database = (config.get('loading') or {}).get('database') or {}
+    field_mappings = (config.get('transformation') or {}).get('field_mappings') or {}
+    flat = [key for key, value in field_mappings.items() if not isinstance(value, dict)]
+    if flat:
+        logger.warning(
+            f"Ignoring transformation.field_mappings entries not keyed by endpoint: {flat}"
+        )
+    unknown = set(apis or []) - set(config['apis'])
+    if unknown:
+        raise ValueError(f"Unknown apis: {sorted(unknown)}")
+    
+    jobs = []
+    for api_name, api_config in config['apis'].items():
+        if apis is not None and api_name not in apis:
+            continue
+        for name, endpoint in (api_config.get('endpoints') or {}).items():
+            options = endpoint if isinstance(endpoint, dict) else {'path': endpoint}
+            jobs.append(SyncJob(
+                api=api_name,
+                name=name,
+                path=options['path'],
+                table=options.get('table', f"{api_name}_{name}"),
+                priority=options.get('priority', api_config.get('priority', 0)),
+                load_mode=options.get('load_mode', database.get('load_mode', 'append')),
+                unique_key=options.get('unique_key', database.get('unique_key')),
+                incremental=options.get('incremental', False),
+                pagination=options.get('pagination', extraction.get('default_pagination', True)),
+                page_size=options.get('page_size', extraction.get('page_size', 100)),
+                params=options.get('params') or {},
+                field_mapping=options.get('field_mapping', _endpoint_mapping(field_mappings, api_name, name))
+            ))
+    
+    # sorted is stable, so equal priorities keep their config order
+    return sorted(jobs, key=lambda job: -job.priority)
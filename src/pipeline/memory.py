@@ -0,0 +1,161 @@
+"""
+Memory Governor
+Approximate in-flight bytes per pipeline stage, held to a memory budget
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Any, Dict, Optional, Union
+
+from ..utils.metrics import default_registry
+from ..utils.record_buffer import estimate_size
+from ..utils.records import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+# Records of a page sized to estimate the whole page
+SIZE_SAMPLES = 16
+
+IN_FLIGHT_BYTES = default_registry.gauge(
+    'pipeline_memory_in_flight_bytes', 'Estimated bytes of pages held by each pipeline stage', ('stage',)
+)
+MEMORY_WAIT_SECONDS = default_registry.counter(
+    'pipeline_memory_wait_seconds_total', 'Seconds page fetching was paused by the memory budget'
+)
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'KB': 2 ** 10, 'MB': 2 ** 20, 'GB': 2 ** 30}
+
+
+def parse_size(value: Union[int, str, None]) -> Optional[int]:
+    """Bytes from an int or a string such as '512MB'; None stays None"""
+    if value is None or isinstance(value, int):
+        return value
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMG]?B?)\s*', str(value).upper())
+    if not match:
+        raise ValueError(f"Invalid memory size: {value}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def estimate_page_bytes(page: Any) -> int:
+    """
+    Approximate memory held by a page of records
+    
+    The size of up to SIZE_SAMPLES records spread over the page is scaled
+    to its length, which is cheap enough to run on every page.
+    """
+    if isinstance(page, RecordBatch):
+        rows = page.rows
+    elif isinstance(page, list):
+        rows = page
+    else:
+        return 0
+    if not rows:
+        return 0
+    step = max(1, len(rows) // SIZE_SAMPLES)
+    sample = rows[::step][:SIZE_SAMPLES]
+    per_record = sum(estimate_size(row) for row in sample) / len(sample)
+    return int(per_record * len(rows)) + len(rows) * 8
+
+
+class MemoryGovernor:
+    """
+    Hold pipeline runs to a budget of in-flight page bytes
+    
+    Stages account for the pages they hold with acquire, move and release.
+    Only the source of pages waits: acquire blocks page fetching while the
+    bytes in flight would pass the budget, and downstream stages, which
+    free memory, never block. Pages are admitted whole, so the budget is
+    held by pausing fetches rather than by splitting pages that are already
+    in memory. One governor can be shared by concurrent runs to give them a
+    common budget; with no budget it only measures.
+    """
+    
+    def __init__(self, budget: Union[int, str, None] = None):
+        """
+        Initialize memory governor
+        
+        Args:
+            budget: Bytes of pages in flight, as an int or e.g. '512MB'
+                (None to measure without limiting)
+        """
+        self.budget = parse_size(budget)
+        self.in_flight = 0
+        self.peak = 0
+        self.stage_bytes: Dict[str, int] = {}
+        self.stage_peaks: Dict[str, int] = {}
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self._condition = threading.Condition()
+    
+    @property
+    def pressure(self) -> float:
+        """Fraction of the budget in flight (0 without a budget)"""
+        return self.in_flight / self.budget if self.budget else 0.0
+    
+    def acquire(self, stage: str, nbytes: int, timeout: Optional[float] = None) -> bool:
+        """
+        Account for a page entering a stage, waiting for room in the budget
+        
+        A page is always admitted when nothing else is in flight, so a page
+        larger than the budget does not block forever.
+        
+        Args:
+            stage: Stage holding the page
+            nbytes: Estimated page bytes
+            timeout: Seconds to wait for room (None waits indefinitely)
+        
+        Returns:
+            True if the page was admitted, False on timeout
+        """
+        with self._condition:
+            if not self._fits(nbytes):
+                start = time.perf_counter()
+                admitted = self._condition.wait_for(lambda: self._fits(nbytes), timeout)
+                waited = time.perf_counter() - start
+                self.wait_seconds += waited
+                MEMORY_WAIT_SECONDS.inc(waited)
+                if not admitted:
+                    return False
+                self.waits += 1
+            self._add(stage, nbytes)
+            return True
+    
+    def move(self, source: str, target: str, old_bytes: int, new_bytes: int):
+        """Account for a page passing from one stage to the next, e.g. transformed"""
+        with self._condition:
+            self._add(source, -old_bytes)
+            self._add(target, new_bytes)
+            self._condition.notify_all()
+    
+    def release(self, stage: str, nbytes: int):
+        """Account for a page leaving the pipeline"""
+        with self._condition:
+            self._add(stage, -nbytes)
+            self._condition.notify_all()
+    
+    def summary(self) -> Dict[str, Any]:
+        """Budget, peak bytes in flight overall and per stage, and waits"""
+        with self._condition:
+            return {
+                'budget_bytes': self.budget,
+                'peak_bytes': self.peak,
+                'peak_by_stage': dict(self.stage_peaks),
+                'waits': self.waits,
+                'wait_seconds': self.wait_seconds
+            }
+    
+    def _fits(self, nbytes: int) -> bool:
+        return self.budget is None or self.in_flight == 0 or self.in_flight + nbytes <= self.budget
+    
+    def _add(self, stage: str, nbytes: int):
+        """Change a stage's bytes; the caller holds the condition"""
+        stage_bytes = self.stage_bytes.get(stage, 0) + nbytes
+        self.stage_bytes[stage] = stage_bytes
+        self.in_flight += nbytes
+        if stage_bytes > self.stage_peaks.get(stage, 0):
+            self.stage_peaks[stage] = stage_bytes
+        if self.in_flight > self.peak:
+            self.peak = self.in_flight
+        IN_FLIGHT_BYTES.labels(stage).inc(nbytes)
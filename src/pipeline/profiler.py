@@ -0,0 +1,252 @@
+"""
+Stage Profiler
+Wall and CPU time per pipeline stage, with optional cProfile and tracemalloc
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Set to 1 (or a comma list of 'cprofile', 'tracemalloc') to profile runs
+PROFILE_ENV = 'API_PROFILE'
+
+# Directory profile reports are written to
+PROFILE_DIR_ENV = 'API_PROFILE_DIR'
+
+# From 3.12 cProfile observes every thread and only one may be active
+_PROFILE_PER_THREAD = sys.version_info < (3, 12)
+
+# Stages whose time is also counted in another stage, e.g. network in extract
+SUBSTAGES = {'network': 'extract'}
+
+
+class StageProfiler:
+    """Collect per-stage timings of pipeline runs and write a summary report"""
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        cprofile: bool = False,
+        trace_memory: bool = False,
+        output_dir: Optional[str] = None,
+        top: int = 15
+    ):
+        """
+        Initialize stage profiler
+        
+        Args:
+            enabled: Record timings; a disabled profiler does nothing
+            cprofile: Profile every stage thread with cProfile
+            trace_memory: Take a tracemalloc snapshot of each run
+            output_dir: Directory for reports (defaults to the working directory)
+            top: Number of functions and allocation sites in the report
+        """
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.output_dir = Path(output_dir or '.')
+        self.top = top
+        # (stage, endpoint) -> [wall seconds, cpu seconds, calls]
+        self.timings: Dict[Tuple[str, str], List[float]] = {}
+        self._profiles: List[cProfile.Profile] = []
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._run_seconds = 0.0
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_env(cls) -> Optional['StageProfiler']:
+        """
+        Build a profiler from the API_PROFILE environment variable
+        
+        Returns:
+            Profiler, or None when profiling is not enabled
+        """
+        value = os.environ.get(PROFILE_ENV, '').strip().lower()
+        if value in ('', '0', 'false', 'no', 'off'):
+            return None
+        options = {option.strip() for option in value.split(',')}
+        return cls(
+            cprofile='cprofile' in options,
+            trace_memory='tracemalloc' in options,
+            output_dir=os.environ.get(PROFILE_DIR_ENV)
+        )
+    
+    def add(self, stage: str, endpoint: str, wall: float, cpu: float = 0.0):
+        """Add time spent in a stage for an endpoint"""
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.timings.setdefault((stage, endpoint), [0.0, 0.0, 0])
+            entry[0] += wall
+            entry[1] += cpu
+            entry[2] += 1
+    
+    @contextmanager
+    def stage(self, stage: str, endpoint: str) -> Iterator[None]:
+        """Time the with block as work of a stage on the current thread"""
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add(stage, endpoint, time.perf_counter() - wall, time.thread_time() - cpu)
+    
+    @contextmanager
+    def thread(self) -> Iterator[None]:
+        """Run the with block, the body of a stage thread, under cProfile if enabled"""
+        if self.enabled and self.cprofile and _PROFILE_PER_THREAD:
+            with self._profiling():
+                yield
+        else:
+            yield
+    
+    @contextmanager
+    def _profiling(self) -> Iterator[None]:
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            with self._lock:
+                self._profiles.append(profile)
+    
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        """Wrap a whole run, tracing allocations if enabled"""
+        if not self.enabled:
+            yield
+            return
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            if self.cprofile and not _PROFILE_PER_THREAD:
+                with self._profiling():
+                    yield
+            else:
+                yield
+        finally:
+            self._run_seconds += time.perf_counter() - start
+            if self.trace_memory and tracemalloc.is_tracing():
+                self._snapshot = tracemalloc.take_snapshot()
+            if started_tracing:
+                tracemalloc.stop()
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded timings
+        
+        Returns:
+            Dictionary with run wall time, per-stage totals and shares, and
+            per (stage, endpoint) rows
+        """
+        with self._lock:
+            timings = {key: list(value) for key, value in self.timings.items()}
+        
+        stages: Dict[str, Dict[str, float]] = {}
+        for (stage, _), (wall, cpu, calls) in timings.items():
+            totals = stages.setdefault(stage, {'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0})
+            totals['wall_seconds'] += wall
+            totals['cpu_seconds'] += cpu
+            totals['calls'] += calls
+        stage_wall = sum(
+            totals['wall_seconds'] for stage, totals in stages.items() if stage not in SUBSTAGES
+        )
+        for totals in stages.values():
+            totals['share'] = totals['wall_seconds'] / stage_wall if stage_wall else 0.0
+        
+        return {
+            'run_seconds': self._run_seconds,
+            'stages': stages,
+            'endpoints': [
+                {'stage': stage, 'endpoint': endpoint, 'wall_seconds': wall, 'cpu_seconds': cpu, 'calls': calls}
+                for (stage, endpoint), (wall, cpu, calls) in sorted(timings.items())
+            ]
+        }
+    
+    def top_functions(self) -> str:
+        """cProfile statistics of the top functions by cumulative time"""
+        out = io.StringIO()
+        stats = self._merged_stats(out)
+        if stats is None:
+            return ''
+        stats.sort_stats('cumulative').print_stats(self.top)
+        return out.getvalue()
+    
+    def _merged_stats(self, stream=None) -> Optional[pstats.Stats]:
+        """Statistics of every recorded cProfile profile combined"""
+        with self._lock:
+            profiles = list(self._profiles)
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=stream)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+    
+    def top_allocations(self) -> List[str]:
+        """Allocation sites holding the most memory at the end of the last run"""
+        if self._snapshot is None:
+            return []
+        return [str(stat) for stat in self._snapshot.statistics('lineno')[:self.top]]
+    
+    def write_report(self, name: str) -> Optional[Path]:
+        """
+        Write the summary report, plus a .prof file when cProfile is on
+        
+        Args:
+            name: Run name used in the file names
+        
+        Returns:
+            Path of the text report, or None when profiling is disabled
+        """
+        if not self.enabled:
+            return None
+        summary = self.summary()
+        safe_name = ''.join(c if c.isalnum() or c in '-_' else '_' for c in name).strip('_')
+        stem = f"profile-{safe_name}-{datetime.now().strftime('%Y%m%dT%H%M%S')}"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        
+        lines = [f"Profile: {name}", f"Run wall time: {summary['run_seconds']:.3f}s", ""]
+        lines.append(f"{'Stage':<12}{'Wall s':>10}{'CPU s':>10}{'Calls':>8}{'Share':>8}")
+        for stage, totals in sorted(summary['stages'].items(), key=lambda item: -item[1]['wall_seconds']):
+            lines.append(
+                f"{stage:<12}{totals['wall_seconds']:>10.3f}{totals['cpu_seconds']:>10.3f}"
+                f"{totals['calls']:>8}{totals['share']:>8.1%}"
+            )
+        lines += ["", f"{'Stage':<12}{'Endpoint':<32}{'Wall s':>10}{'CPU s':>10}{'Calls':>8}"]
+        for row in summary['endpoints']:
+            lines.append(
+                f"{row['stage']:<12}{row['endpoint']:<32}{row['wall_seconds']:>10.3f}"
+                f"{row['cpu_seconds']:>10.3f}{row['calls']:>8}"
+            )
+        
+        allocations = self.top_allocations()
+        if allocations:
+            lines += ["", "Top allocations:"] + [f"  {line}" for line in allocations]
+        
+        functions = self.top_functions()
+        if functions:
+            lines += ["", "Top functions:", functions]
+            self._merged_stats().dump_stats(str(self.output_dir / f"{stem}.prof"))
+        
+        path = self.output_dir / f"{stem}.txt"
+        path.write_text('\n'.join(lines) + '\n')
+        logger.info(f"Wrote profile report to {path}")
+        return path
@@ -0,0 +1,409 @@
+"""
+Pipeline Runner
+Runs extract, transform and load concurrently over bounded queues
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import List, Dict, Any, Optional, Callable, Union
+
+from ..extractors.api_extractor import APIExtractor
+from ..transformers.response_transformer import ResponseTransformer
+from ..loaders.database_loader import DatabaseLoader
+from ..validators.schema_validator import SchemaValidator
+from .memory import MemoryGovernor, estimate_page_bytes
+from .profiler import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a stage's input
+_DONE = object()
+
+# How often blocked queue operations re-check for shutdown
+_POLL_INTERVAL = 0.1
+
+
+class PipelineStopped(Exception):
+    """Raised inside a stage when another stage has failed"""
+
+
+class PipelineRunner:
+    """Run extract, transform and load stages concurrently"""
+    
+    def __init__(
+        self,
+        extractor: APIExtractor,
+        transformer: Optional[ResponseTransformer],
+        loader: DatabaseLoader,
+        queue_size: int = 4,
+        transform_workers: int = 1,
+        load_workers: int = 1,
+        profile: Union[bool, StageProfiler, None] = None,
+        memory_budget: Union[int, str, MemoryGovernor, None] = None,
+        validator: Optional[SchemaValidator] = None
+    ):
+        """
+        Initialize pipeline runner
+        
+        Pages flow from the extractor through the transformer to the loader
+        over queues holding at most queue_size pages each, so fetching page
+        N+1 overlaps with transforming page N and loading page N-1, and a slow
+        stage holds back the ones before it. Extraction is a single worker
+        because pages of one endpoint are fetched in order. Upserts are
+        loaded by a single worker in page order, so a key on two pages
+        always ends up with the record from the later page.
+        
+        Args:
+            extractor: Extractor providing pages of records
+            transformer: Transformer applied to each page (None to skip)
+            loader: Loader receiving each transformed page
+            queue_size: Maximum pages waiting between two stages
+            transform_workers: Number of transform threads
+            load_workers: Number of load threads; upserts always use one
+            profile: True or a StageProfiler to record wall and CPU time per
+                stage and write a report after each run; None defers to the
+                API_PROFILE environment variable
+            memory_budget: Bytes of pages in flight across the stages, as an
+                int or e.g. '512MB', or a MemoryGovernor shared with other
+                runs. Page fetching pauses while the budget is used up.
+                Without a budget, usage is still measured
+            validator: Validator run on each page before it is transformed;
+                invalid records go to its reject sink (a file, DeadLetterSink
+                or ErrorHandler) and are not loaded
+        """
+        if queue_size < 1 or transform_workers < 1 or load_workers < 1:
+            raise ValueError("queue_size and worker counts must be at least 1")
+            
+        self.extractor = extractor
+        self.transformer = transformer
+        self.loader = loader
+        self.queue_size = queue_size
+        self.transform_workers = transform_workers
+        self.load_workers = load_workers
+        self.profile = profile
+        self.memory_budget = memory_budget
+        self.validator = validator
+    
+    def run(
+        self,
+        endpoint: str,
+        table_name: str,
+        params: Optional[Dict[str, Any]] = None,
+        pagination: bool = True,
+        page_size: int = 100,
+        field_mapping: Optional[Dict[str, str]] = None,
+        custom_transforms: Optional[List[Union[Callable, str]]] = None,
+        load_mode: str = 'append',
+        unique_key: Optional[Union[str, List[str]]] = None,
+        chunksize: int = 1000,
+        compact: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Run the pipeline for one endpoint
+        
+        The first page is loaded on its own so that table creation (or the
+        replace in 'replace' mode) happens once; later pages are appended by
+        the load workers concurrently, or upserted one at a time in the order
+        they were fetched. If any stage fails, the
+        other stages stop and the first error is raised. The estimated bytes
+        of pages held by each stage are tracked against memory_budget, and
+        this run's peaks and waits are reported under 'memory', also when
+        the governor is shared with other runs.
+        
+        Args:
+            endpoint: API endpoint
+            table_name: Target table name
+            params: Query parameters
+            pagination: Enable pagination
+            page_size: Items per page
+            field_mapping: Field mapping passed to the transformer
+            custom_transforms: Custom transforms passed to the transformer
+            load_mode: 'append', 'replace', or 'upsert'
+            unique_key: Column name (or names) for upsert operations
+            chunksize: Number of records per load batch
+            compact: Pass pages through the stages as RecordBatches, which
+                hold each record as a tuple instead of a dict
+            
+        Returns:
+            Dictionary with run results
+        """
+        profiler = self._resolve_profiler()
+        governor = self._resolve_governor()
+        # Bytes this run holds per stage, released if it stops early
+        held: Dict[str, int] = {}
+        usage = {'peak_bytes': 0, 'peak_by_stage': {}, 'waits': 0, 'wait_seconds': 0.0}
+        stop = threading.Event()
+        errors: List[BaseException] = []
+        stats = {'pages': 0, 'records_extracted': 0, 'records_rejected': 0, 'records_loaded': 0}
+        stats_lock = threading.Lock()
+        first_load_lock = threading.Lock()
+        first_load_done = threading.Event()
+        transform_done = [0]
+        # Concurrent upserts could apply an older page after a newer one
+        ordered = load_mode == 'upsert'
+        load_workers = 1 if ordered else self.load_workers
+        if ordered and self.load_workers > 1:
+            logger.info("Loading upserts with one worker to keep page order")
+        
+        raw_pages: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        ready_pages: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        
+        def fail(error: BaseException):
+            if not isinstance(error, PipelineStopped):
+                errors.append(error)
+            stop.set()
+        
+        def put(q: queue.Queue, item: Any):
+            while True:
+                if stop.is_set():
+                    raise PipelineStopped()
+                try:
+                    q.put(item, timeout=_POLL_INTERVAL)
+                    return
+                except queue.Full:
+                    continue
+        
+        def get(q: queue.Queue) -> Any:
+            while True:
+                if stop.is_set():
+                    raise PipelineStopped()
+                try:
+                    return q.get(timeout=_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+        
+        def account(stage: str, nbytes: int):
+            # Called with stats_lock held; peaks are this run's own, not a shared governor's
+            held[stage] = held.get(stage, 0) + nbytes
+            if held[stage] > usage['peak_by_stage'].get(stage, 0):
+                usage['peak_by_stage'][stage] = held[stage]
+            usage['peak_bytes'] = max(usage['peak_bytes'], sum(held.values()))
+        
+        def hold(stage: str, nbytes: int):
+            # Waits for room in the budget, which pauses page fetching
+            if not governor.acquire(stage, nbytes, timeout=0):
+                start = time.perf_counter()
+                while not governor.acquire(stage, nbytes, timeout=_POLL_INTERVAL):
+                    if stop.is_set():
+                        raise PipelineStopped()
+                with stats_lock:
+                    usage['waits'] += 1
+                    usage['wait_seconds'] += time.perf_counter() - start
+            with stats_lock:
+                account(stage, nbytes)
+        
+        def move(source: str, target: str, old_bytes: int, new_bytes: int):
+            governor.move(source, target, old_bytes, new_bytes)
+            with stats_lock:
+                account(source, -old_bytes)
+                account(target, new_bytes)
+        
+        def release(stage: str, nbytes: int):
+            governor.release(stage, nbytes)
+            with stats_lock:
+                account(stage, -nbytes)
+        
+        def extract_stage():
+            pages = self.extractor.iter_pages(
+                endpoint,
+                params=params,
+                pagination=pagination,
+                page_size=page_size,
+                compact=compact
+            )
+            try:
+                sequence = 0
+                while True:
+                    with profiler.stage('extract', endpoint):
+                        page = next(pages, None)
+                    if page is None:
+                        break
+                    with stats_lock:
+                        stats['pages'] += 1
+                        stats['records_extracted'] += len(page)
+                    nbytes = estimate_page_bytes(page)
+                    hold('extract', nbytes)
+                    put(raw_pages, (sequence, page, nbytes))
+                    sequence += 1
+                for _ in range(self.transform_workers):
+                    put(raw_pages, _DONE)
+            except BaseException as e:
+                fail(e)
+            finally:
+                # Closing the generator releases any streamed response
+                close = getattr(pages, 'close', None)
+                if close:
+                    close()
+        
+        def transform_stage():
+            try:
+                while True:
+                    item = get(raw_pages)
+                    if item is _DONE:
+                        break
+                    sequence, page, nbytes = item
+                    new_bytes = nbytes
+                    if self.validator is not None:
+                        with profiler.stage('validate', endpoint):
+                            valid = self.validator.validate(page, source=endpoint)
+                        if len(valid) < len(page):
+                            with stats_lock:
+                                stats['records_rejected'] += len(page) - len(valid)
+                        page = valid
+                        if not page:
+                            # Nothing left to load, so replace mode waits for the next page
+                            release('extract', nbytes)
+                            put(ready_pages, (sequence, None, 0))
+                            continue
+                    if self.transformer is not None:
+                        with profiler.stage('transform', endpoint):
+                            page = self.transformer.transform(
+                                page,
+                                field_mapping=field_mapping,
+                                custom_transforms=custom_transforms
+                            )
+                        new_bytes = estimate_page_bytes(page)
+                    move('extract', 'transform', nbytes, new_bytes)
+                    put(ready_pages, (sequence, page, new_bytes))
+                    
+                with stats_lock:
+                    transform_done[0] += 1
+                    last = transform_done[0] == self.transform_workers
+                if last:
+                    for _ in range(load_workers):
+                        put(ready_pages, _DONE)
+            except BaseException as e:
+                fail(e)
+        
+        def load_page(page: List[Dict[str, Any]], nbytes: int, mode: str):
+            move('transform', 'load', nbytes, nbytes)
+            try:
+                with profiler.stage('load', endpoint):
+                    result = self.loader.load(
+                        page,
+                        table_name,
+                        load_mode=mode,
+                        unique_key=unique_key,
+                        chunksize=chunksize
+                    )
+            finally:
+                release('load', nbytes)
+            with stats_lock:
+                stats['records_loaded'] += result.get('records_loaded', 0)
+        
+        def load_next(page: Optional[List[Dict[str, Any]]], nbytes: int):
+            if page is None:
+                return
+            if not first_load_done.is_set():
+                with first_load_lock:
+                    if stop.is_set():
+                        raise PipelineStopped()
+                    if not first_load_done.is_set():
+                        load_page(page, nbytes, load_mode)
+                        first_load_done.set()
+                        return
+            load_page(page, nbytes, 'append' if load_mode == 'replace' else load_mode)
+            
+        def load_stage():
+            # Pages that transform workers finished ahead of an earlier one
+            pending: Dict[int, Any] = {}
+            next_sequence = 0
+            try:
+                while True:
+                    item = get(ready_pages)
+                    if item is _DONE:
+                        break
+                    sequence, page, nbytes = item
+                    if not ordered:
+                        load_next(page, nbytes)
+                        continue
+                    pending[sequence] = (page, nbytes)
+                    while next_sequence in pending:
+                        load_next(*pending.pop(next_sequence))
+                        next_sequence += 1
+            except BaseException as e:
+                fail(e)
+                
+        def profiled(target: Callable[[], None]) -> Callable[[], None]:
+            def run_stage():
+                with profiler.thread():
+                    target()
+            return run_stage
+            
+        def record_network(event):
+            if event.timing is not None:
+                profiler.add('network', endpoint, event.timing.total)
+                
+        threads = [threading.Thread(target=profiled(extract_stage), name='pipeline-extract')]
+        threads += [
+            threading.Thread(target=profiled(transform_stage), name=f'pipeline-transform-{i}')
+            for i in range(self.transform_workers)
+        ]
+        threads += [
+            threading.Thread(target=profiled(load_stage), name=f'pipeline-load-{i}')
+            for i in range(load_workers)
+        ]
+        
+        client = getattr(self.extractor, 'client', None)
+        hooked = profiler.enabled and hasattr(client, 'add_hook')
+        if hooked:
+            client.add_hook('after_response', record_network)
+        
+        start = time.time()
+        logger.info(f"Starting pipeline {endpoint} -> {table_name}")
+        try:
+            with profiler.run():
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            if hooked:
+                client.remove_hook('after_response', record_network)
+            # Pages dropped by a failed run leave the governor's budget
+            for stage, nbytes in held.items():
+                if nbytes:
+                    governor.release(stage, nbytes)
+        elapsed = time.time() - start
+        
+        result = {'memory': {'budget_bytes': governor.budget, **usage}}
+        if profiler.enabled:
+            report = profiler.write_report(f"{endpoint}-{table_name}")
+            result['profile'] = {**profiler.summary(), 'report': str(report)}
+        
+        if errors:
+            logger.error(f"Pipeline {endpoint} -> {table_name} failed: {str(errors[0])}")
+            raise errors[0]
+            
+        logger.info(
+            f"Pipeline loaded {stats['records_loaded']} records from "
+            f"{stats['pages']} pages in {elapsed:.2f}s "
+            f"(peak {result['memory']['peak_bytes'] / 2 ** 20:.1f}MB in flight)"
+        )
+        return {
+            **stats,
+            'elapsed_seconds': elapsed,
+            'status': 'success',
+            'table': table_name,
+            **result
+        }
+    
+    def _resolve_governor(self) -> MemoryGovernor:
+        """Governor for a run; a shared one is reused, otherwise each run gets its own"""
+        if isinstance(self.memory_budget, MemoryGovernor):
+            return self.memory_budget
+        return MemoryGovernor(self.memory_budget)
+    
+    def _resolve_profiler(self) -> StageProfiler:
+        """Profiler for a run; a disabled one when profiling is off"""
+        if isinstance(self.profile, StageProfiler):
+            return self.profile
+        if self.profile:
+            return StageProfiler()
+        if self.profile is None:
+            profiler = StageProfiler.from_env()
+            if profiler is not None:
+                return profiler
+        return StageProfiler(enabled=False)
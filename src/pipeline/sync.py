@@ -0,0 +1,238 @@
+"""
+Sync Runner
+Runs every API endpoint configured in api_config.yaml
+
+Usage:
+    python -m src.pipeline --config config/api_config.yaml [--api NAME] [--workers N]
+"""
+
+import argparse
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Union
+
+from ..clients.base_client import BaseClient
+from ..extractors.api_extractor import APIExtractor
+from ..extractors.incremental_extractor import IncrementalExtractor
+from ..loaders.database_loader import DatabaseLoader
+from ..transformers.response_transformer import ResponseTransformer
+from ..validators.schema_validator import SchemaValidator
+from .config import SyncJob, build_client, build_jobs, build_rate_limiter, expand_env, load_config
+from .memory import MemoryGovernor
+from .runner import PipelineRunner
+
+logger = logging.getLogger(__name__)
+
+
+class SyncRunner:
+    """Sync all configured endpoints concurrently"""
+    
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        max_workers: Optional[int] = None,
+        apis: Optional[List[str]] = None,
+        loader: Optional[DatabaseLoader] = None,
+        validator: Union[SchemaValidator, Dict[str, SchemaValidator], None] = None
+    ):
+        """
+        Initialize sync runner
+        
+        Endpoints run on a pool of max_workers threads, started in priority
+        order. Each API has one client and one rate limiter shared by its
+        endpoints, so every API keeps to its own rate budget however many
+        of its endpoints run at once. With sync.memory_budget set, all
+        endpoints share one MemoryGovernor, so their pipelines together keep
+        to the budget.
+        
+        Args:
+            config: Configuration from load_config
+            max_workers: Endpoints synced at once (defaults to sync.max_workers
+                in the config, or 4)
+            apis: Names of the APIs to sync (all when None)
+            loader: Loader to use instead of loading.database.connection_string
+            validator: Validator run on every endpoint's records before they
+                are transformed, or validators keyed by '<api>.<endpoint>' or
+                '<endpoint>'; endpoints without one are not validated
+        """
+        self.config = config
+        self.jobs = build_jobs(config, apis)
+        self.max_workers = max_workers or (config.get('sync') or {}).get('max_workers', 4)
+        self.loader = loader
+        self.validator = validator
+        self.transformer = ResponseTransformer()
+        self.timestamp_field = (config.get('extraction') or {}).get('timestamp_field', 'updated_at')
+        memory_budget = (config.get('sync') or {}).get('memory_budget')
+        self.governor = MemoryGovernor(memory_budget) if memory_budget is not None else None
+        self._clients: Dict[str, BaseClient] = {}
+        self._clients_lock = threading.Lock()
+    
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> 'SyncRunner':
+        """Create a sync runner from a YAML config file"""
+        return cls(load_config(path), **kwargs)
+    
+    def run(self) -> Dict[str, Any]:
+        """
+        Sync every endpoint
+        
+        A failing endpoint is logged and reported without stopping the others.
+        
+        Returns:
+            Dictionary with per-endpoint results and success/failure counts
+        """
+        loader = self._get_loader()
+        start = time.time()
+        logger.info(f"Syncing {len(self.jobs)} endpoints with {self.max_workers} workers")
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._run_job, job, loader) for job in self.jobs]
+            results = [future.result() for future in futures]
+        
+        failed = sum(1 for result in results if result['status'] == 'failed')
+        elapsed = time.time() - start
+        logger.info(f"Synced {len(results) - failed} of {len(results)} endpoints in {elapsed:.2f}s")
+        return {
+            'jobs': results,
+            'succeeded': len(results) - failed,
+            'failed': failed,
+            'elapsed_seconds': elapsed,
+            'status': 'success' if not failed else 'failed',
+            'memory': self.governor.summary() if self.governor is not None else None
+        }
+    
+    def _get_loader(self) -> DatabaseLoader:
+        """Get the configured loader"""
+        if self.loader is None:
+            database = (self.config.get('loading') or {}).get('database') or {}
+            if 'connection_string' not in database:
+                raise ValueError("loading.database.connection_string is not configured")
+            self.loader = DatabaseLoader(expand_env(database['connection_string']))
+        return self.loader
+    
+    def _get_client(self, api: str) -> BaseClient:
+        """Get the client of an API, created on first use with its rate limiter"""
+        with self._clients_lock:
+            if api not in self._clients:
+                api_config = self.config['apis'][api]
+                client = build_client(api_config)
+                limiter = build_rate_limiter(api_config)
+                if limiter is not None:
+                    client.add_hook('before_request', lambda event: limiter.wait_if_needed())
+                self._clients[api] = client
+            return self._clients[api]
+    
+    def _get_validator(self, job: SyncJob) -> Optional[SchemaValidator]:
+        """Get the validator of an endpoint, if any"""
+        if not isinstance(self.validator, dict):
+            return self.validator
+        return self.validator.get(f"{job.api}.{job.name}", self.validator.get(job.name))
+    
+    def _run_job(self, job: SyncJob, loader: DatabaseLoader) -> Dict[str, Any]:
+        """Sync one endpoint and report its result"""
+        start = time.time()
+        logger.info(f"Syncing {job.api}.{job.name} ({job.path}) -> {job.table}")
+        try:
+            client = self._get_client(job.api)
+            if job.incremental:
+                result = self._run_incremental(job, client, loader)
+            else:
+                runner = PipelineRunner(
+                    APIExtractor(client), self.transformer, loader,
+                    memory_budget=self.governor, validator=self._get_validator(job)
+                )
+                result = runner.run(
+                    job.path,
+                    job.table,
+                    params=dict(job.params),
+                    pagination=job.pagination,
+                    page_size=job.page_size,
+                    field_mapping=job.field_mapping,
+                    load_mode=job.load_mode,
+                    unique_key=job.unique_key
+                )
+            status = result.get('status', 'success')
+            records_loaded = result.get('records_loaded', 0)
+            error = None
+        except Exception as e:
+            logger.error(f"Sync of {job.api}.{job.name} failed: {str(e)}")
+            status, records_loaded, error = 'failed', 0, str(e)
+        
+        return {
+            'api': job.api,
+            'endpoint': job.name,
+            'table': job.table,
+            'status': status,
+            'records_loaded': records_loaded,
+            'error': error,
+            'elapsed_seconds': time.time() - start
+        }
+    
+    def _run_incremental(self, job: SyncJob, client: BaseClient, loader: DatabaseLoader) -> Dict[str, Any]:
+        """Sync records changed since the watermark committed with the last load"""
+        extractor = IncrementalExtractor(
+            client,
+            timestamp_field=self.timestamp_field,
+            state_store=loader,
+            state_key=f"{job.api}:{job.path}"
+        )
+        records = extractor.extract_incremental(job.path, params=dict(job.params))
+        validator = self._get_validator(job)
+        if validator is not None:
+            records = validator.validate(records, source=job.path)
+        records = self.transformer.transform(records, field_mapping=job.field_mapping)
+        return loader.load(
+            records,
+            job.table,
+            load_mode=job.load_mode,
+            unique_key=job.unique_key,
+            watermark=extractor.pending_watermark
+        )
+
+
+def _configure_logging(config: Dict[str, Any], level: Optional[str]):
+    """Set up logging from the config's logging section"""
+    settings = config.get('logging') or {}
+    handlers: List[logging.Handler] = [logging.StreamHandler()]
+    if settings.get('file'):
+        Path(settings['file']).parent.mkdir(parents=True, exist_ok=True)
+        handlers.append(logging.FileHandler(settings['file']))
+    logging.basicConfig(
+        level=(level or settings.get('level', 'INFO')).upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point; returns the process exit code"""
+    parser = argparse.ArgumentParser(description="Sync the APIs configured in api_config.yaml")
+    parser.add_argument('--config', default='config/api_config.yaml', help="Config file")
+    parser.add_argument('--api', action='append', dest='apis', help="API to sync (repeatable)")
+    parser.add_argument('--workers', type=int, help="Endpoints synced at once")
+    parser.add_argument('--log-level', help="Override logging.level")
+    parser.add_argument('--list', action='store_true', help="List the endpoints and exit")
+    args = parser.parse_args(argv)
+    
+    config = load_config(args.config)
+    _configure_logging(config, args.log_level)
+    runner = SyncRunner(config, max_workers=args.workers, apis=args.apis)
+    
+    if args.list:
+        for job in runner.jobs:
+            print(f"{job.priority:>4}  {job.api}.{job.name}  {job.path} -> {job.table} ({job.load_mode})")
+        return 0
+    
+    result = runner.run()
+    for job in result['jobs']:
+        line = f"{job['status']:<8} {job['api']}.{job['endpoint']}: {job['records_loaded']} records"
+        print(line + (f" ({job['error']})" if job['error'] else ''))
+    return 0 if result['status'] == 'success' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,14 @@
 # Transformers Package
 
-from .response_transformer import ResponseTransformer
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .response_transformer import ResponseTransformer
 
 __all__ = ['ResponseTransformer']
 
+__getattr__, __dir__ = attach(__name__, {
+    'ResponseTransformer': '.response_transformer'
+})
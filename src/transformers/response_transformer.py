@@ -4,11 +4,100 @@ Transforms API responses into standardized format
 """
 
 import logging
-from typing import List, Dict, Any, Optional, Callable
-import pandas as pd
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import List, Dict, Any, Optional, Callable, Union
+from ..utils.metrics import record_stage
+from ..utils.records import RecordBatch, RecordView
 
 logger = logging.getLogger(__name__)
 
+# A transformation is either a callable or the name of a registered one
+TransformRef = Union[Callable, str]
+
+# Records are a list of dicts or a RecordBatch, which is transformed as a batch
+Records = Union[List[Dict[str, Any]], RecordBatch]
+
+# Transformations registered by name, resolvable inside worker processes
+_registered_transforms: Dict[str, Callable] = {}
+
+
+def _resolve_transform(ref: TransformRef) -> Callable:
+    """Look up a transformation by name if needed"""
+    if isinstance(ref, str):
+        try:
+            return _registered_transforms[ref]
+        except KeyError:
+            raise ValueError(f"Unknown transformation: {ref}")
+    return ref
+
+
+def _apply_chain(
+    data: Records,
+    field_mapping: Optional[Dict[str, str]],
+    chain: List[TransformRef]
+) -> Records:
+    """Apply field mapping and the transform chain to a list of records"""
+    funcs = [_resolve_transform(ref) for ref in chain]
+    if isinstance(data, RecordBatch):
+        return _apply_chain_batch(data, field_mapping, funcs)
+    transformed_data = []
+    
+    for record in data:
+        # Apply field mapping
+        if field_mapping:
+            transformed_record = {}
+            for api_field, target_field in field_mapping.items():
+                if api_field in record:
+                    transformed_record[target_field] = record[api_field]
+                else:
+                    transformed_record[target_field] = None
+            record = transformed_record
+            
+        # Apply built-in then custom transformations
+        for transform_func in funcs:
+            record = transform_func(record)
+            
+        transformed_data.append(record)
+        
+    return transformed_data
+
+
+def _apply_chain_batch(
+    batch: RecordBatch,
+    field_mapping: Optional[Dict[str, str]],
+    funcs: List[Callable]
+) -> RecordBatch:
+    """
+    Apply field mapping and transforms to a RecordBatch
+    
+    The mapping is applied to the rows directly. Transforms receive a
+    RecordView of each row; the records they return are packed into a new
+    batch whose fields are the keys those records have, so a field every
+    transform deletes is left out as it is for dict records.
+    """
+    if field_mapping:
+        batch = batch.project(field_mapping)
+    if not funcs:
+        return batch
+        
+    transformed = RecordBatch()
+    append = transformed.append
+    for record in batch:
+        for transform_func in funcs:
+            record = transform_func(record)
+        if (
+            not transformed.rows and type(record) is RecordView
+            and record.missing is None and record.extra is None
+        ):
+            # Unchanged fields: share the input schema so rows are copied as is
+            transformed.schema = record.schema
+        append(record)
+    return transformed
+
 
 class ResponseTransformer:
     """Transform API responses"""
@@ -17,57 +106,79 @@ class ResponseTransformer:
         """Initialize transformer"""
         self.transformations = []
     
-    def add_transformation(self, transformation: Callable):
+    def add_transformation(self, transformation: TransformRef):
         """
         Add a transformation function
         
         Args:
-            transformation: Function that takes a record and returns transformed record
+            transformation: Function that takes a record and returns transformed
+                record, or the name of a registered transformation
         """
         self.transformations.append(transformation)
     
+    @staticmethod
+    def register_transform(name: str, transformation: Optional[Callable] = None):
+        """
+        Register a transformation under a name
+        
+        Named transformations can be used with parallel=... even when the
+        function itself cannot be pickled. Register at module import time so
+        worker processes see the same registry. Can be used as a decorator.
+        
+        Args:
+            name: Name to refer to the transformation by
+            transformation: Function that takes a record and returns transformed record
+        """
+        def decorator(func: Callable) -> Callable:
+            _registered_transforms[name] = func
+            return func
+            
+        if transformation is None:
+            return decorator
+        return decorator(transformation)
+    
     def transform(
         self,
-        data: List[Dict[str, Any]],
+        data: Records,
         field_mapping: Optional[Dict[str, str]] = None,
-        custom_transforms: Optional[List[Callable]] = None
-    ) -> List[Dict[str, Any]]:
+        custom_transforms: Optional[List[TransformRef]] = None,
+        parallel: Union[bool, int] = False,
+        batch_size: int = 5000,
+        min_parallel_records: int = 20000
+    ) -> Records:
         """
         Transform API response data
         
+        A RecordBatch is transformed without building a dict per record:
+        field mappings are applied to its rows and custom transformations
+        receive a dict-like RecordView of each row.
+        
         Args:
-            data: List of records from API
+            data: List of records from API, or a RecordBatch
             field_mapping: Dictionary mapping API fields to target fields
-            custom_transforms: List of custom transformation functions
+            custom_transforms: List of custom transformation functions or
+                names registered with register_transform
+            parallel: Number of worker processes (True for one per CPU);
+                the chain must be picklable or registered by name
+            batch_size: Records sent to a worker per task
+            min_parallel_records: Inputs smaller than this run in-process
             
         Returns:
-            Transformed list of records
+            Transformed list of records (a RecordBatch for RecordBatch input)
         """
         try:
-            transformed_data = []
+            start = time.perf_counter()
+            chain = self._build_chain(custom_transforms)
+            workers = self._resolve_workers(parallel)
             
-            for record in data:
-                # Apply field mapping
-                if field_mapping:
-                    transformed_record = {}
-                    for api_field, target_field in field_mapping.items():
-                        if api_field in record:
-                            transformed_record[target_field] = record[api_field]
-                        else:
-                            transformed_record[target_field] = None
-                    record = transformed_record
-                
-                # Apply built-in transformations
-                for transform_func in self.transformations:
-                    record = transform_func(record)
-                
-                # Apply custom transformations
-                if custom_transforms:
-                    for transform_func in custom_transforms:
-                        record = transform_func(record)
-                
-                transformed_data.append(record)
+            if workers > 1 and len(data) >= max(min_parallel_records, batch_size * 2):
+                transformed_data = self._transform_parallel(
+                    data, field_mapping, chain, workers, batch_size
+                )
+            else:
+                transformed_data = _apply_chain(data, field_mapping, chain)
             
+            record_stage('transform', len(transformed_data), time.perf_counter() - start)
             logger.info(f"Transformed {len(transformed_data)} records")
             return transformed_data
             
@@ -75,22 +186,78 @@ class ResponseTransformer:
             logger.error(f"Error transforming data: {str(e)}")
             raise
     
+    def _build_chain(self, custom_transforms: Optional[List[TransformRef]]) -> List[TransformRef]:
+        """Combine built-in and custom transformations into one ordered chain"""
+        return list(self.transformations) + list(custom_transforms or [])
+    
+    @staticmethod
+    def _resolve_workers(parallel: Union[bool, int]) -> int:
+        """Translate the parallel option into a worker count"""
+        if parallel is True:
+            return os.cpu_count() or 1
+        if not parallel:
+            return 1
+        return int(parallel)
+    
+    def _transform_parallel(
+        self,
+        data: Records,
+        field_mapping: Optional[Dict[str, str]],
+        chain: List[TransformRef],
+        workers: int,
+        batch_size: int
+    ) -> Records:
+        """Run the transform chain over chunks of data in a process pool"""
+        for ref in chain:
+            if isinstance(ref, str):
+                _resolve_transform(ref)
+                continue
+            try:
+                pickle.dumps(ref)
+            except Exception as e:
+                raise ValueError(
+                    f"Transformation {ref!r} cannot be sent to worker processes; "
+                    f"define it at module level or register it with "
+                    f"ResponseTransformer.register_transform ({str(e)})"
+                )
+                
+        chunks = [data[i:i + batch_size] for i in range(0, len(data), batch_size)]
+        workers = min(workers, len(chunks))
+        logger.debug(f"Transforming {len(data)} records in {len(chunks)} chunks on {workers} processes")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields results in submission order, so record order is kept
+            results = list(executor.map(
+                _apply_chain,
+                chunks,
+                repeat(field_mapping),
+                repeat(chain)
+            ))
+            
+        if isinstance(data, RecordBatch):
+            return RecordBatch.concat(results)
+        transformed_data = []
+        for result in results:
+            transformed_data.extend(result)
+        return transformed_data
+    
     def normalize_dates(
         self,
-        data: List[Dict[str, Any]],
+        data: Records,
         date_fields: List[str]
-    ) -> List[Dict[str, Any]]:
+    ) -> Records:
         """
         Normalize date fields to ISO format
         
         Args:
-            data: List of records
+            data: List of records, or a RecordBatch
             date_fields: List of field names containing dates
             
         Returns:
-            Data with normalized dates
+            Data with normalized dates (a new batch for RecordBatch input)
         """
-        for record in data:
+        records = list(data) if isinstance(data, RecordBatch) else data
+        for record in records:
             for field in date_fields:
                 if field in record and record[field]:
                     try:
@@ -103,26 +270,27 @@ class ResponseTransformer:
                     except Exception:
                         pass  # Keep original if parsing fails
         
+        if isinstance(data, RecordBatch):
+            # Writes to a RecordView go to its own copy of the row
+            return RecordBatch.from_records(records, data.schema)
         return data
     
     def flatten_nested(
         self,
-        data: List[Dict[str, Any]],
+        data: Records,
         prefix: str = ""
-    ) -> List[Dict[str, Any]]:
+    ) -> Records:
         """
         Flatten nested dictionaries
         
         Args:
-            data: List of records with nested structures
+            data: List of records with nested structures, or a RecordBatch
             prefix: Prefix for flattened field names
             
         Returns:
-            Flattened records
+            Flattened records (a RecordBatch for RecordBatch input)
         """
-        flattened = []
-        
-        for record in data:
+        def flatten(record):
             flat_record = {}
             for key, value in record.items():
                 if isinstance(value, dict):
@@ -132,7 +300,9 @@ class ResponseTransformer:
                         flat_record[flat_key] = nested_value
                 else:
                     flat_record[key] = value
-            flattened.append(flat_record)
+            return flat_record
         
-        return flattened
+        if isinstance(data, RecordBatch):
+            return RecordBatch.from_records(map(flatten, data))
+        return [flatten(record) for record in data]
 
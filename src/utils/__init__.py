@@ -1,7 +1,28 @@
 # Utils Package
 
-from .rate_limiter import RateLimiter
-from .error_handler import ErrorHandler
+from typing import TYPE_CHECKING
 
-__all__ = ['RateLimiter', 'ErrorHandler']
+from .._lazy import attach
 
+if TYPE_CHECKING:
+    from .rate_limiter import RateLimiter
+    from .error_handler import ErrorHandler
+    from .metrics import MetricsRegistry, default_registry
+    from .records import RecordSchema, RecordBatch, RecordView
+    from .record_buffer import RecordBuffer
+
+__all__ = [
+    'RateLimiter', 'ErrorHandler', 'MetricsRegistry', 'default_registry',
+    'RecordSchema', 'RecordBatch', 'RecordView', 'RecordBuffer'
+]
+
+__getattr__, __dir__ = attach(__name__, {
+    'RateLimiter': '.rate_limiter',
+    'ErrorHandler': '.error_handler',
+    'MetricsRegistry': '.metrics',
+    'default_registry': '.metrics',
+    'RecordSchema': '.records',
+    'RecordBatch': '.records',
+    'RecordView': '.records',
+    'RecordBuffer': '.record_buffer'
+})
@@ -3,26 +3,64 @@ Error Handler
 Handles and logs API errors
 """
 
+import atexit
+import json
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+import queue
+import random
+import threading
 import traceback
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Tells the writer thread to exit
+_STOP = object()
+
 
 class ErrorHandler:
     """Handle API errors"""
     
-    def __init__(self, log_file: Optional[str] = None):
+    def __init__(
+        self,
+        log_file: Optional[str] = None,
+        history_size: int = 1000,
+        traceback_sample_rate: float = 0.1,
+        queue_size: int = 10000,
+        batch_size: int = 500
+    ):
         """
         Initialize error handler
         
+        Only the last history_size errors are kept, while counters by type and
+        endpoint cover every error. Log records are written as JSON Lines by a
+        background thread; if its queue is full, records are dropped and
+        counted rather than blocking the caller. Call close (or use the
+        handler as a context manager) when done; queued records are also
+        written when the interpreter exits.
+        
         Args:
-            log_file: Optional file path for error logs
+            log_file: Optional JSONL file path for error logs
+            history_size: Number of recent errors kept in error_history
+            traceback_sample_rate: Fraction of repeated errors of a type whose
+                traceback is captured (the first of each type always is)
+            queue_size: Maximum log records waiting to be written
+            batch_size: Maximum log records written per file open
         """
         self.log_file = log_file
-        self.error_history = []
+        self.error_history: deque = deque(maxlen=history_size)
+        self.traceback_sample_rate = traceback_sample_rate
+        self.batch_size = batch_size
+        self.total_errors = 0
+        self.error_types: Dict[str, int] = {}
+        self.errors_by_endpoint: Dict[str, int] = {}
+        self.dropped_log_records = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
     
     def handle_error(
         self,
@@ -37,16 +75,33 @@ class ErrorHandler:
             error: Exception that occurred
             context: Additional context information
             retry: Whether to retry the operation
-            
+        
         Returns:
             Dictionary with error information
         """
+        context = context or {}
+        error_type = type(error).__name__
+        endpoint = context.get('endpoint')
+        
+        with self._lock:
+            self.total_errors += 1
+            first_of_type = error_type not in self.error_types
+            self.error_types[error_type] = self.error_types.get(error_type, 0) + 1
+            if endpoint is not None:
+                key = str(endpoint)
+                self.errors_by_endpoint[key] = self.errors_by_endpoint.get(key, 0) + 1
+        
+        if first_of_type or random.random() < self.traceback_sample_rate:
+            tb = ''.join(traceback.format_exception(type(error), error, error.__traceback__))
+        else:
+            tb = None
+        
         error_info = {
             'timestamp': datetime.now().isoformat(),
-            'error_type': type(error).__name__,
+            'error_type': error_type,
             'error_message': str(error),
-            'context': context or {},
-            'traceback': traceback.format_exc(),
+            'context': context,
+            'traceback': tb,
             'retry': retry
         }
         
@@ -58,43 +113,86 @@ class ErrorHandler:
         # Add to history
         self.error_history.append(error_info)
         
-        # Write to log file if specified
+        # Queue for the log file writer if specified
         if self.log_file:
-            self._write_to_log(error_info)
+            self._enqueue(error_info)
         
         return error_info
     
-    def _write_to_log(self, error_info: Dict[str, Any]):
-        """Write error to log file"""
+    def flush(self):
+        """Block until every queued log record has been written"""
+        if self._writer is not None:
+            self._queue.join()
+    
+    def close(self):
+        """Write queued log records and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            atexit.unregister(self.close)
+            self._queue.put(_STOP)
+            writer.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def _enqueue(self, error_info: Dict[str, Any]):
+        """Hand a log record to the writer thread without blocking"""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_loop, name='error-log-writer', daemon=True
+                )
+                self._writer.start()
+                # The writer is a daemon thread, so drain its queue before exit
+                atexit.register(self.close)
+        try:
+            self._queue.put_nowait(error_info)
+        except queue.Full:
+            with self._lock:
+                self.dropped_log_records += 1
+    
+    def _write_loop(self):
+        """Writer thread: batch queued records into one append per file open"""
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            records = [item for item in batch if item is not _STOP]
+            if records:
+                self._write_to_log(records)
+            for _ in batch:
+                self._queue.task_done()
+            if len(records) < len(batch):
+                return
+    
+    def _write_to_log(self, records: List[Dict[str, Any]]):
+        """Append error records to the log file as JSON Lines"""
         try:
-            from pathlib import Path
             log_path = Path(self.log_file)
             log_path.parent.mkdir(parents=True, exist_ok=True)
             
             with open(log_path, 'a') as f:
-                f.write(f"\n{'='*60}\n")
-                f.write(f"Timestamp: {error_info['timestamp']}\n")
-                f.write(f"Error Type: {error_info['error_type']}\n")
-                f.write(f"Error Message: {error_info['error_message']}\n")
-                if error_info['context']:
-                    f.write(f"Context: {error_info['context']}\n")
-                f.write(f"Traceback:\n{error_info['traceback']}\n")
+                f.writelines(json.dumps(record, default=str) + '\n' for record in records)
         except Exception as e:
             logger.error(f"Error writing to log file: {str(e)}")
     
     def get_error_summary(self) -> Dict[str, Any]:
         """Get summary of errors"""
-        if not self.error_history:
+        if not self.total_errors:
             return {'total_errors': 0}
         
-        error_types = {}
-        for error in self.error_history:
-            error_type = error['error_type']
-            error_types[error_type] = error_types.get(error_type, 0) + 1
-        
-        return {
-            'total_errors': len(self.error_history),
-            'error_types': error_types,
-            'latest_error': self.error_history[-1] if self.error_history else None
-        }
-
+        with self._lock:
+            return {
+                'total_errors': self.total_errors,
+                'error_types': dict(self.error_types),
+                'errors_by_endpoint': dict(self.errors_by_endpoint),
+                'dropped_log_records': self.dropped_log_records,
+                'latest_error': self.error_history[-1] if self.error_history else None
+            }
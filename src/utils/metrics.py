@@ -0,0 +1,380 @@
+"""
+Metrics
+Counters, gauges and histograms with Prometheus text exposition
+"""
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, for latency histograms
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# (name suffix, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+class _CounterValue:
+    """One labelled series of a counter"""
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def inc(self, amount: float = 1.0):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeValue:
+    """One labelled series of a gauge"""
+    
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+    
+    def set(self, value: float):
+        self.value = float(value)
+    
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class _HistogramValue:
+    """One labelled series of a histogram"""
+    
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the with block in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Metric:
+    """Base class for metrics; labelled series are created on first use"""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        """
+        Initialize metric
+        
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels identifying each series
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+    
+    def labels(self, *values):
+        """
+        Get the series for label values, given in labelnames order
+        
+        Returns:
+            Series object with the metric's update methods
+        """
+        key = tuple(str(value) for value in values)
+        series = self._series.get(key)
+        if series is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                series = self._series.setdefault(key, self._new_series())
+        return series
+    
+    def _new_series(self):
+        raise NotImplementedError
+    
+    def _unlabelled(self):
+        if self.labelnames:
+            raise ValueError(f"{self.name} has labels {self.labelnames}; use labels()")
+        return self.labels()
+    
+    def samples(self) -> List[Sample]:
+        """Current samples of every series"""
+        with self._lock:
+            series = list(self._series.items())
+        samples = []
+        for key, value in series:
+            samples.extend(self._series_samples(dict(zip(self.labelnames, key)), value))
+        return samples
+    
+    def _series_samples(self, labels: Dict[str, str], series) -> List[Sample]:
+        return [('', labels, series.value)]
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+    
+    kind = 'counter'
+    
+    def _new_series(self):
+        return _CounterValue()
+    
+    def inc(self, amount: float = 1.0):
+        self._unlabelled().inc(amount)
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+    
+    kind = 'gauge'
+    
+    def _new_series(self):
+        return _GaugeValue()
+    
+    def set(self, value: float):
+        self._unlabelled().set(value)
+    
+    def inc(self, amount: float = 1.0):
+        self._unlabelled().inc(amount)
+    
+    def dec(self, amount: float = 1.0):
+        self._unlabelled().dec(amount)
+
+
+class Histogram(Metric):
+    """Distribution of observations over fixed buckets"""
+    
+    kind = 'histogram'
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        """
+        Initialize histogram
+        
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels identifying each series
+            buckets: Bucket upper bounds; +Inf is implied
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(b) for b in buckets if b != float('inf')))
+    
+    def _new_series(self):
+        return _HistogramValue(self.buckets)
+    
+    def observe(self, value: float):
+        self._unlabelled().observe(value)
+    
+    def time(self):
+        return self._unlabelled().time()
+    
+    def _series_samples(self, labels: Dict[str, str], series) -> List[Sample]:
+        with series._lock:
+            counts = list(series.counts)
+            total, count = series.sum, series.count
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += bucket_count
+            samples.append(('_bucket', {**labels, 'le': _format_value(bound)}, cumulative))
+        samples.append(('_sum', labels, total))
+        samples.append(('_count', labels, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, documentation, labelnames)
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, documentation, labelnames)
+    
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+    
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered as a different {metric.kind}")
+        return metric
+    
+    def get_sample_value(self, name: str, labels: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """
+        Look up one sample, e.g. 'api_requests_total' or 'load_batch_duration_seconds_count'
+        
+        Returns:
+            Sample value, or None if there is no such sample
+        """
+        labels = {key: str(value) for key, value in (labels or {}).items()}
+        for metric in list(self._metrics.values()):
+            if not name.startswith(metric.name):
+                continue
+            for suffix, sample_labels, value in metric.samples():
+                if metric.name + suffix == name and sample_labels == labels:
+                    return value
+        return None
+    
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+    
+    def write_textfile(self, path: str):
+        """
+        Write metrics for the node_exporter textfile collector
+        
+        The file is written next to its destination and renamed into place,
+        so the collector never reads a partial file.
+        
+        Args:
+            path: Destination .prom file
+        """
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, prefix=f".{target.name}.")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, target)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+    
+    def serve(self, port: int = 9100, host: str = '127.0.0.1'):
+        """
+        Serve metrics over HTTP from a background thread
+        
+        Args:
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind
+        
+        Returns:
+            The running server; call shutdown() to stop it
+        """
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        
+        registry = self
+        
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = registry.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+        
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+
+# Registry the built-in components report to
+default_registry = MetricsRegistry()
+
+STAGE_RECORDS = default_registry.counter(
+    'pipeline_records_total', 'Records processed by each pipeline stage', ('stage',)
+)
+STAGE_SECONDS = default_registry.counter(
+    'pipeline_stage_seconds_total', 'Time spent in each pipeline stage', ('stage',)
+)
+STAGE_THROUGHPUT = default_registry.gauge(
+    'pipeline_records_per_second', 'Throughput of the latest batch of each pipeline stage', ('stage',)
+)
+
+
+def record_stage(stage: str, records: int, seconds: float):
+    """
+    Record a batch processed by a pipeline stage
+    
+    Args:
+        stage: 'extract', 'transform' or 'load'
+        records: Records in the batch
+        seconds: Time the batch took
+    """
+    STAGE_RECORDS.labels(stage).inc(records)
+    STAGE_SECONDS.labels(stage).inc(seconds)
+    if seconds > 0:
+        STAGE_THROUGHPUT.labels(stage).set(records / seconds)
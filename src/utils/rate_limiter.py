@@ -7,9 +7,15 @@ import logging
 import time
 from typing import Optional
 from threading import Lock
+from .metrics import default_registry
 
 logger = logging.getLogger(__name__)
 
+WAIT_SECONDS = default_registry.histogram(
+    'rate_limiter_wait_seconds', 'Time callers spent waiting for the rate limiter',
+    buckets=(0.0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 15.0, 60.0)
+)
+
 
 class RateLimiter:
     """Rate limiter for API requests"""
@@ -35,6 +41,7 @@ class RateLimiter:
     
     def wait_if_needed(self):
         """Wait if necessary to respect rate limits"""
+        start = time.perf_counter()
         with self.lock:
             current_time = time.time()
             
@@ -71,4 +78,6 @@ class RateLimiter:
             self.last_request_time = time.time()
             if self.requests_per_minute:
                 self.request_times.append(self.last_request_time)
+                
+        WAIT_SECONDS.observe(time.perf_counter() - start)
 
@@ -0,0 +1,304 @@
+"""
+Record Buffer
+List-like record store that spills to compressed chunk files beyond a memory budget
+"""
+
+import heapq
+import logging
+import pickle
+import struct
+import sys
+import tempfile
+import zlib
+from bisect import bisect_right
+from itertools import groupby
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .metrics import default_registry
+from .records import RecordView
+
+logger = logging.getLogger(__name__)
+
+# Bytes of records a buffer keeps in memory unless told otherwise
+DEFAULT_MEMORY_LIMIT = 256 * 2 ** 20
+
+# Every chunk starts with its compressed length and record count
+CHUNK_HEADER = struct.Struct('<II')
+
+# Record sizes are estimated from one record in this many
+SIZE_SAMPLE_INTERVAL = 64
+
+SPILLED_BYTES = default_registry.counter(
+    'record_buffer_spilled_bytes_total', 'Compressed bytes of records spilled to disk'
+)
+
+
+def estimate_size(record: Any) -> int:
+    """Approximate memory held by a record: the dict (or row tuple) and its direct values"""
+    size = sys.getsizeof(record)
+    if isinstance(record, dict):
+        size += sum(sys.getsizeof(value) for value in record.values())
+    elif isinstance(record, (tuple, list)):
+        size += sum(sys.getsizeof(value) for value in record)
+    return size
+
+
+class _ChunkFile:
+    """Temporary file of zlib-compressed, length-prefixed pickled record chunks"""
+    
+    def __init__(self, directory: Optional[str], compression_level: int):
+        self.file = tempfile.TemporaryFile(prefix='records-', suffix='.spill', dir=directory)
+        self.compression_level = compression_level
+        # (offset of the data, compressed length, records)
+        self.chunks: List[Tuple[int, int, int]] = []
+        self.size = 0
+    
+    def write(self, records: List[Any]) -> int:
+        """Append a chunk and return its index"""
+        data = zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL), self.compression_level)
+        self.file.seek(self.size)
+        self.file.write(CHUNK_HEADER.pack(len(data), len(records)))
+        self.file.write(data)
+        self.chunks.append((self.size + CHUNK_HEADER.size, len(data), len(records)))
+        self.size += CHUNK_HEADER.size + len(data)
+        SPILLED_BYTES.inc(len(data))
+        return len(self.chunks) - 1
+    
+    def read(self, index: int) -> List[Any]:
+        """Records of one chunk"""
+        offset, length, _ = self.chunks[index]
+        self.file.seek(offset)
+        return pickle.loads(zlib.decompress(self.file.read(length)))
+    
+    def close(self):
+        self.file.close()
+
+
+class RecordBuffer:
+    """
+    Append-only record list that spills to disk beyond a memory budget
+    
+    Records are kept in memory until their estimated size passes
+    memory_limit; they are then pickled into zlib-compressed chunks of
+    chunk_records and appended to a temporary file, which is removed when
+    the buffer is closed or garbage collected. Iteration streams the chunks
+    back one at a time and indexing reads the chunk holding the record, so
+    memory stays near memory_limit plus one chunk however many records the
+    API returns. Records read back from disk are copies.
+    """
+    
+    def __init__(
+        self,
+        memory_limit: int = DEFAULT_MEMORY_LIMIT,
+        chunk_records: int = 5000,
+        spill_dir: Optional[str] = None,
+        compression_level: int = 1
+    ):
+        """
+        Initialize record buffer
+        
+        Args:
+            memory_limit: Bytes of records held in memory before spilling
+            chunk_records: Records per compressed chunk on disk
+            spill_dir: Directory for the spill file (defaults to the system
+                temporary directory)
+            compression_level: zlib level, 1 (fastest) to 9 (smallest)
+        """
+        if chunk_records < 1:
+            raise ValueError("chunk_records must be at least 1")
+        self.memory_limit = memory_limit
+        self.chunk_records = chunk_records
+        self.spill_dir = spill_dir
+        self.compression_level = compression_level
+        self._tail: List[Any] = []
+        self._tail_bytes = 0
+        self._record_size = 0
+        self._file: Optional[_ChunkFile] = None
+        # Index of the first record of each spilled chunk
+        self._starts: List[int] = []
+        self._spilled = 0
+        self._cached: Tuple[int, List[Any]] = (-1, [])
+    
+    @classmethod
+    def from_records(cls, records: Iterable[Any], **kwargs) -> 'RecordBuffer':
+        """Create a buffer holding records; kwargs are passed to the constructor"""
+        buffer = cls(**kwargs)
+        buffer.extend(records)
+        return buffer
+    
+    def __len__(self) -> int:
+        return self._spilled + len(self._tail)
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
+    
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self._starts)):
+            yield from self._file.read(index)
+        yield from self._tail
+    
+    def __getitem__(self, index: int) -> Any:
+        if isinstance(index, slice):
+            raise TypeError("RecordBuffer does not support slicing; iterate it instead")
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("RecordBuffer index out of range")
+        if index >= self._spilled:
+            return self._tail[index - self._spilled]
+        chunk = bisect_right(self._starts, index) - 1
+        if self._cached[0] != chunk:
+            self._cached = (chunk, self._file.read(chunk))
+        return self._cached[1][index - self._starts[chunk]]
+    
+    def __enter__(self) -> 'RecordBuffer':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    @property
+    def spilled_records(self) -> int:
+        """Records stored on disk"""
+        return self._spilled
+    
+    @property
+    def bytes_on_disk(self) -> int:
+        """Size of the spill file"""
+        return self._file.size if self._file is not None else 0
+    
+    def append(self, record: Any):
+        """Add a record, spilling to disk when over the memory limit"""
+        if isinstance(record, RecordView):
+            record = record.to_dict()
+        if len(self) % SIZE_SAMPLE_INTERVAL == 0:
+            size = estimate_size(record)
+            self._record_size = size if not self._record_size else (3 * self._record_size + size) // 4
+        self._tail.append(record)
+        self._tail_bytes += self._record_size
+        if self._tail_bytes > self.memory_limit:
+            self.spill()
+    
+    def extend(self, records: Iterable[Any]):
+        """Add records, spilling to disk when over the memory limit"""
+        append = self.append
+        for record in records:
+            append(record)
+    
+    def spill(self):
+        """Write the records held in memory to disk"""
+        if not self._tail:
+            return
+        if self._file is None:
+            self._file = _ChunkFile(self.spill_dir, self.compression_level)
+        records, self._tail, self._tail_bytes = self._tail, [], 0
+        for i in range(0, len(records), self.chunk_records):
+            chunk = records[i:i + self.chunk_records]
+            self._file.write(chunk)
+            self._starts.append(self._spilled)
+            self._spilled += len(chunk)
+        logger.debug(f"Spilled {len(records)} records ({self._file.size} bytes on disk)")
+    
+    def close(self):
+        """Drop every record and delete the spill file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._tail, self._tail_bytes = [], 0
+        self._starts, self._spilled = [], 0
+        self._cached = (-1, [])
+    
+    def sort(self, key: Optional[Callable[[Any], Any]] = None, reverse: bool = False) -> 'RecordBuffer':
+        """
+        Sort records into a new buffer with an external merge sort
+        
+        Runs that fit in memory_limit are sorted and spilled, then merged
+        reading one chunk of each run at a time. The sort is stable.
+        
+        Args:
+            key: Function extracting the sort key from a record
+            reverse: Sort in descending order
+        
+        Returns:
+            New buffer with the same settings holding the sorted records
+        """
+        result = self._empty_like()
+        result.extend(self._sorted(iter(self), key, reverse))
+        return result
+    
+    def dedupe(self, key: Callable[[Any], Any], keep: str = 'last') -> 'RecordBuffer':
+        """
+        Keep one record per key, using an external sort
+        
+        Args:
+            key: Function extracting the identifying key, e.g. itemgetter('id')
+            keep: 'last' to keep the latest record of each key (as an upsert
+                would), or 'first'
+        
+        Returns:
+            New buffer holding one record per key, ordered by key
+        """
+        if keep not in ('first', 'last'):
+            raise ValueError(f"Unknown keep: {keep}")
+        items = ((key(record), position, record) for position, record in enumerate(self))
+        merged = self._sorted(items, itemgetter(0, 1), False)
+        
+        result = self._empty_like()
+        for _, group in groupby(merged, key=itemgetter(0)):
+            item = next(group)
+            if keep == 'last':
+                for item in group:
+                    pass
+            result.append(item[2])
+        return result
+    
+    def _empty_like(self) -> 'RecordBuffer':
+        return RecordBuffer(self.memory_limit, self.chunk_records, self.spill_dir, self.compression_level)
+    
+    def _sorted(
+        self,
+        items: Iterator[Any],
+        key: Optional[Callable[[Any], Any]],
+        reverse: bool
+    ) -> Iterator[Any]:
+        """Sort items in memory-sized runs spilled to disk and merge the runs"""
+        run_length = max(self.chunk_records, self.memory_limit // max(self._record_size, 1))
+        runs_file: Optional[_ChunkFile] = None
+        runs: List[List[int]] = []
+        try:
+            while True:
+                run = [item for _, item in zip(range(run_length), items)]
+                if not run:
+                    break
+                run.sort(key=key, reverse=reverse)
+                if not runs and len(run) < run_length:
+                    # Everything fit in one run, so there is nothing to merge
+                    yield from run
+                    return
+                if runs_file is None:
+                    runs_file = _ChunkFile(self.spill_dir, self.compression_level)
+                runs.append([
+                    runs_file.write(run[i:i + self.chunk_records])
+                    for i in range(0, len(run), self.chunk_records)
+                ])
+            
+            def read_run(chunks: List[int]) -> Iterator[Any]:
+                for chunk in chunks:
+                    yield from runs_file.read(chunk)
+            
+            logger.debug(f"Merging {len(runs)} sorted runs")
+            yield from heapq.merge(*[read_run(chunks) for chunks in runs], key=key, reverse=reverse)
+        finally:
+            if runs_file is not None:
+                runs_file.close()
+    
+    def stats(self) -> Dict[str, int]:
+        """Record counts and sizes, for logging"""
+        return {
+            'records': len(self),
+            'in_memory': len(self._tail),
+            'spilled': self._spilled,
+            'chunks': len(self._starts),
+            'bytes_on_disk': self.bytes_on_disk
+        }
@@ -0,0 +1,305 @@
+"""
+Compact Records
+Rows stored as tuples against one shared schema instead of one dict per record
+"""
+
+from collections.abc import Mapping, MutableMapping
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+
+class RecordSchema:
+    """Field names shared by every row of a RecordBatch"""
+    
+    __slots__ = ('fields', 'index')
+    
+    def __init__(self, fields: Sequence[str] = ()):
+        """
+        Initialize record schema
+        
+        Args:
+            fields: Field names in row order
+        """
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.fields)}
+        if len(self.index) != len(self.fields):
+            raise ValueError(f"Duplicate field names in {self.fields}")
+    
+    def __len__(self) -> int:
+        return len(self.fields)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.index
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RecordSchema) and self.fields == other.fields
+    
+    def __hash__(self) -> int:
+        return hash(self.fields)
+    
+    def __repr__(self) -> str:
+        return f"RecordSchema({list(self.fields)!r})"
+    
+    def extend(self, fields: Iterable[str]) -> 'RecordSchema':
+        """Schema with the given fields appended; existing fields are skipped"""
+        new_fields = [name for name in dict.fromkeys(fields) if name not in self.index]
+        return RecordSchema(self.fields + tuple(new_fields)) if new_fields else self
+    
+    def getter(self, columns: Sequence[str]) -> Callable[[tuple], tuple]:
+        """
+        Function picking columns out of a row of this schema
+        
+        Args:
+            columns: Field names to pick; fields not in the schema read as None
+        
+        Returns:
+            Function mapping a row to a tuple of the columns' values
+        """
+        positions = [self.index.get(name) for name in columns]
+        if None in positions:
+            return lambda row: tuple(None if p is None else row[p] for p in positions)
+        if positions == list(range(len(self.fields))):
+            return tuple
+        if len(positions) == 1:
+            position = positions[0]
+            return lambda row: (row[position],)
+        return itemgetter(*positions)
+
+
+class RecordView(MutableMapping):
+    """
+    Dict interface to one row of a RecordBatch
+    
+    Views are cheap to create and let code written for dict records, such as
+    custom transforms, read rows directly. Writes go to a private copy of
+    the row, never to the batch; the changed view can be appended to a batch
+    or turned into a dict with to_dict.
+    """
+    
+    __slots__ = ('schema', 'values', 'extra', 'missing')
+    
+    def __init__(self, schema: RecordSchema, values: Union[tuple, list]):
+        self.schema = schema
+        self.values = values
+        # Fields set that are not in the schema
+        self.extra: Optional[Dict[str, Any]] = None
+        # Positions of schema fields that were deleted
+        self.missing: Optional[set] = None
+    
+    def __getitem__(self, key: str) -> Any:
+        position = self.schema.index.get(key)
+        if position is not None and (self.missing is None or position not in self.missing):
+            return self.values[position]
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        position = self.schema.index.get(key)
+        if position is not None and self.missing is None:
+            return self.values[position]
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __setitem__(self, key: str, value: Any):
+        position = self.schema.index.get(key)
+        if position is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+            return
+        if isinstance(self.values, tuple):
+            self.values = list(self.values)
+        self.values[position] = value
+        if self.missing is not None:
+            self.missing.discard(position)
+    
+    def __delitem__(self, key: str):
+        position = self.schema.index.get(key)
+        if self.extra is not None and key in self.extra:
+            del self.extra[key]
+        elif position is not None and (self.missing is None or position not in self.missing):
+            if self.missing is None:
+                self.missing = set()
+            self.missing.add(position)
+        else:
+            raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.missing is None:
+            yield from self.schema.fields
+        else:
+            for position, name in enumerate(self.schema.fields):
+                if position not in self.missing:
+                    yield name
+        if self.extra is not None:
+            yield from self.extra
+    
+    def __len__(self) -> int:
+        return (
+            len(self.schema.fields)
+            - (len(self.missing) if self.missing else 0)
+            + (len(self.extra) if self.extra else 0)
+        )
+    
+    def __repr__(self) -> str:
+        return f"RecordView({self.to_dict()!r})"
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Copy of the record as a plain dict"""
+        if self.missing is None and self.extra is None:
+            return dict(zip(self.schema.fields, self.values))
+        return {key: self[key] for key in self}
+
+
+class RecordBatch:
+    """
+    Records stored as tuples sharing one RecordSchema
+    
+    Field names are held once per batch instead of once per record, which
+    takes a fraction of the memory of a list of dicts. Iterating a batch
+    yields RecordView objects, so it can stand in for a list of records;
+    extractors, the transformer and the loaders also work on the rows
+    directly. Fields a record does not have are stored as None.
+    """
+    
+    __slots__ = ('schema', 'rows')
+    
+    def __init__(self, schema: Optional[RecordSchema] = None, rows: Optional[List[tuple]] = None):
+        """
+        Initialize record batch
+        
+        Args:
+            schema: Schema of the rows (empty when not given)
+            rows: Tuples with one value per schema field
+        """
+        self.schema = schema if schema is not None else RecordSchema()
+        self.rows: List[tuple] = rows if rows is not None else []
+    
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Mapping],
+        schema: Optional[RecordSchema] = None
+    ) -> 'RecordBatch':
+        """
+        Build a batch from dict records
+        
+        Args:
+            records: Records, consumed one at a time
+            schema: Schema to start from, e.g. the previous page's, so pages of
+                one stream share it; fields are added as new keys appear
+        
+        Returns:
+            Record batch
+        """
+        batch = cls(schema)
+        batch.extend(records)
+        return batch
+    
+    @staticmethod
+    def concat(batches: Iterable['RecordBatch']) -> 'RecordBatch':
+        """Join batches into one, taking the union of their schemas"""
+        batches = list(batches)
+        if not batches:
+            return RecordBatch()
+        schema = batches[0].schema
+        for batch in batches[1:]:
+            if batch.schema is not schema:
+                schema = schema.extend(batch.schema.fields)
+        rows: List[tuple] = []
+        for batch in batches:
+            if batch.schema is schema or batch.schema.fields == schema.fields:
+                rows.extend(batch.rows)
+            else:
+                rows.extend(map(batch.schema.getter(schema.fields), batch.rows))
+        return RecordBatch(schema, rows)
+    
+    def __len__(self) -> int:
+        return len(self.rows)
+    
+    def __iter__(self) -> Iterator[RecordView]:
+        schema = self.schema
+        for row in self.rows:
+            yield RecordView(schema, row)
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[RecordView, 'RecordBatch']:
+        if isinstance(index, slice):
+            return RecordBatch(self.schema, self.rows[index])
+        return RecordView(self.schema, self.rows[index])
+    
+    def __repr__(self) -> str:
+        return f"RecordBatch({len(self.rows)} rows, fields={list(self.schema.fields)!r})"
+    
+    def append(self, record: Mapping):
+        """Add a record, extending the schema with any new fields"""
+        if (
+            type(record) is RecordView and record.schema is self.schema
+            and record.extra is None and record.missing is None
+        ):
+            self.rows.append(tuple(record.values))
+            return
+        index = self.schema.index
+        if not record.keys() <= index.keys():
+            self._add_fields(record)
+        self.rows.append(tuple(map(record.get, self.schema.fields)))
+    
+    def extend(self, records: Iterable[Mapping]):
+        """Add records, extending the schema with any new fields"""
+        if isinstance(records, RecordBatch):
+            merged = RecordBatch.concat([self, records])
+            self.schema, self.rows = merged.schema, merged.rows
+            return
+        append = self.append
+        for record in records:
+            append(record)
+    
+    def _add_fields(self, record: Mapping):
+        """Extend the schema with a record's new keys and pad existing rows"""
+        old_width = len(self.schema)
+        self.schema = self.schema.extend(record.keys())
+        padding = (None,) * (len(self.schema) - old_width)
+        if self.rows:
+            self.rows = [row + padding for row in self.rows]
+    
+    def tuples(self, columns: Optional[Sequence[str]] = None) -> Iterator[tuple]:
+        """Row values in the order of columns (all fields when not given)"""
+        if columns is None:
+            return iter(self.rows)
+        return map(self.schema.getter(columns), self.rows)
+    
+    def column(self, name: str) -> List[Any]:
+        """Values of one field"""
+        position = self.schema.index.get(name)
+        if position is None:
+            return [None] * len(self.rows)
+        return [row[position] for row in self.rows]
+    
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Records as plain dicts"""
+        fields = self.schema.fields
+        return [dict(zip(fields, row)) for row in self.rows]
+    
+    def project(self, field_mapping: Dict[str, str]) -> 'RecordBatch':
+        """
+        Rename and select fields as ResponseTransformer field mappings do
+        
+        Args:
+            field_mapping: Source field -> target field; missing sources read
+                as None
+        
+        Returns:
+            Batch with the target fields
+        """
+        sources: Dict[str, str] = {}
+        for source, target in field_mapping.items():
+            sources[target] = source
+        schema = RecordSchema(list(sources))
+        return RecordBatch(schema, list(map(self.schema.getter(list(sources.values())), self.rows)))
+    
+    def filter(self, predicate: Callable[[RecordView], bool]) -> 'RecordBatch':
+        """Batch of the rows whose view satisfies predicate"""
+        schema = self.schema
+        return RecordBatch(schema, [row for row in self.rows if predicate(RecordView(schema, row))])
@@ -0,0 +1,15 @@
+# Validators Package
+
+from typing import TYPE_CHECKING
+
+from .._lazy import attach
+
+if TYPE_CHECKING:
+    from .schema_validator import SchemaValidator, ValidationError
+
+__all__ = ['SchemaValidator', 'ValidationError']
+
+__getattr__, __dir__ = attach(__name__, {
+    'SchemaValidator': '.schema_validator',
+    'ValidationError': '.schema_validator'
+})
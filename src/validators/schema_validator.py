@@ -0,0 +1,354 @@
+"""
+Schema Validator
+Validates API records against a declarative schema
+"""
+
+import json
+import logging
+import re
+import threading
+from collections.abc import Mapping
+from datetime import datetime, date
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Callable, Union
+from ..utils.records import RecordBatch
+
+logger = logging.getLogger(__name__)
+
+# A field check returns an error message, or None if the value passes
+FieldCheck = Callable[[Any], Optional[str]]
+
+
+def _is_int(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _is_datetime(value: Any) -> bool:
+    if isinstance(value, (datetime, date)):
+        return True
+    if isinstance(value, str):
+        try:
+            datetime.fromisoformat(value.replace('Z', '+00:00'))
+            return True
+        except ValueError:
+            return False
+    return False
+
+
+TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    'str': lambda v: isinstance(v, str),
+    'int': _is_int,
+    'float': _is_number,
+    'number': _is_number,
+    'bool': lambda v: isinstance(v, bool),
+    'dict': lambda v: isinstance(v, dict),
+    'list': lambda v: isinstance(v, list),
+    'datetime': _is_datetime,
+    'any': lambda v: True,
+}
+
+
+class ValidationError(ValueError):
+    """Raised when a record fails validation in fail_fast mode"""
+    
+    def __init__(self, record: Dict[str, Any], errors: List[str]):
+        self.record = record
+        self.errors = errors
+        super().__init__(f"Record failed validation: {'; '.join(errors)}")
+
+
+class SchemaValidator:
+    """Validate records against a declarative schema"""
+    
+    def __init__(
+        self,
+        schema: Dict[str, Dict[str, Any]],
+        mode: str = 'collect',
+        reject_sink: Optional[Union[str, Callable[[Dict[str, Any], List[str]], None], Any]] = None
+    ):
+        """
+        Initialize schema validator
+        
+        The schema maps field names to rules, for example
+        {'id': {'type': 'int', 'required': True}, 'status': {'enum': ['a', 'b']},
+        'amount': {'type': 'number', 'min': 0}}. Supported rules are type,
+        required, nullable, enum, min, max, min_length, max_length and pattern.
+        
+        Args:
+            schema: Field rules keyed by field name
+            mode: 'collect' to route invalid records to the reject sink, or
+                'fail_fast' to raise ValidationError on the first invalid record
+            reject_sink: Destination of invalid records: a JSONL file path, a
+                DeadLetterSink, an ErrorHandler (each record is handled as a
+                ValidationError) or a function(record, errors); kept in
+                self.rejected when not set
+        """
+        if mode not in ('collect', 'fail_fast'):
+            raise ValueError(f"Unknown validation mode: {mode}")
+            
+        self.schema = schema
+        self.mode = mode
+        self.reject_sink = reject_sink
+        self.rejected = []
+        self.stats = {'validated': 0, 'valid': 0, 'invalid': 0}
+        self._checks = self._compile(schema)
+        # validate may run on several pipeline threads at once
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _compile_field(field: str, rules: Dict[str, Any]) -> Callable[[Dict[str, Any]], List[str]]:
+        """Compile the rules of one field into a single check function"""
+        required = rules.get('required', False)
+        nullable = rules.get('nullable', not required)
+        checks: List[FieldCheck] = []
+        
+        type_name = rules.get('type')
+        if type_name:
+            if type_name not in TYPE_CHECKS:
+                raise ValueError(f"Unknown type '{type_name}' for field '{field}'")
+            is_type = TYPE_CHECKS[type_name]
+            checks.append(lambda v: None if is_type(v) else f"{field}: expected {type_name}, got {type(v).__name__}")
+            
+        if 'enum' in rules:
+            allowed = frozenset(rules['enum'])
+            checks.append(lambda v: None if v in allowed else f"{field}: {v!r} not in {sorted(allowed, key=str)}")
+            
+        if 'min' in rules:
+            low = rules['min']
+            checks.append(lambda v: None if v >= low else f"{field}: {v!r} is below minimum {low}")
+            
+        if 'max' in rules:
+            high = rules['max']
+            checks.append(lambda v: None if v <= high else f"{field}: {v!r} is above maximum {high}")
+            
+        if 'min_length' in rules:
+            min_len = rules['min_length']
+            checks.append(lambda v: None if len(v) >= min_len else f"{field}: length {len(v)} is below {min_len}")
+            
+        if 'max_length' in rules:
+            max_len = rules['max_length']
+            checks.append(lambda v: None if len(v) <= max_len else f"{field}: length {len(v)} is above {max_len}")
+            
+        if 'pattern' in rules:
+            pattern = re.compile(rules['pattern'])
+            checks.append(
+                lambda v: None if isinstance(v, str) and pattern.search(v) else f"{field}: {v!r} does not match pattern"
+            )
+        
+        def check(record: Dict[str, Any]) -> List[str]:
+            if field not in record:
+                return [f"{field}: required field missing"] if required else []
+            value = record[field]
+            if value is None:
+                return [] if nullable else [f"{field}: must not be null"]
+            errors = []
+            for field_check in checks:
+                try:
+                    error = field_check(value)
+                except TypeError:
+                    error = f"{field}: {value!r} cannot be checked against {rules}"
+                if error:
+                    errors.append(error)
+                    # Later rules usually assume the type rule passed
+                    break
+            return errors
+            
+        return check
+    
+    def _compile(self, schema: Dict[str, Dict[str, Any]]) -> List[Callable[[Dict[str, Any]], List[str]]]:
+        """Compile the schema into per-field check functions"""
+        return [self._compile_field(field, rules or {}) for field, rules in schema.items()]
+    
+    def check(self, record: Dict[str, Any]) -> List[str]:
+        """
+        Check a single record
+        
+        Args:
+            record: Record to check
+            
+        Returns:
+            List of error messages, empty if the record is valid
+        """
+        if not isinstance(record, Mapping):
+            return [f"record: expected mapping, got {type(record).__name__}"]
+            
+        errors = []
+        for field_check in self._checks:
+            errors.extend(field_check(record))
+        return errors
+    
+    def validate(
+        self,
+        data: Union[List[Dict[str, Any]], RecordBatch],
+        source: Optional[str] = None
+    ) -> Union[List[Dict[str, Any]], RecordBatch]:
+        """
+        Validate records and return the valid ones
+        
+        Args:
+            data: List of records from API, or a RecordBatch
+            source: Endpoint or table the records belong to, passed to a
+                DeadLetterSink or ErrorHandler reject sink
+            
+        Returns:
+            Records that passed validation (a RecordBatch for RecordBatch input)
+        """
+        valid_data = []
+        rejects = []
+        compact = isinstance(data, RecordBatch)
+        
+        for record in data:
+            errors = self.check(record)
+            if not errors:
+                valid_data.append(record)
+                continue
+            if compact:
+                record = record.to_dict()
+            if self.mode == 'fail_fast':
+                self._count(len(valid_data), 1)
+                raise ValidationError(record, errors)
+            rejects.append((record, errors))
+            
+        self._count(len(valid_data), len(rejects))
+        
+        if rejects:
+            logger.warning(f"Rejected {len(rejects)} of {len(valid_data) + len(rejects)} records")
+            self._send_rejects(rejects, source)
+            
+        logger.info(f"Validated {len(valid_data)} records")
+        if compact:
+            return RecordBatch(data.schema, [record.values for record in valid_data])
+        return valid_data
+    
+    def _count(self, valid: int, invalid: int):
+        """Update validation counters"""
+        with self._lock:
+            self.stats['validated'] += valid + invalid
+            self.stats['valid'] += valid
+            self.stats['invalid'] += invalid
+    
+    def _send_rejects(self, rejects: List[tuple], source: Optional[str] = None):
+        """Route invalid records to the reject sink"""
+        sink = self.reject_sink
+        if sink is None:
+            with self._lock:
+                self.rejected.extend({'record': r, 'errors': e} for r, e in rejects)
+        elif hasattr(sink, 'handle_error'):
+            for record, errors in rejects:
+                sink.handle_error(
+                    ValidationError(record, errors),
+                    context={'endpoint': source, 'stage': 'validate'}
+                )
+        elif hasattr(sink, 'write') and not isinstance(sink, (str, Path)):
+            sink.write(source or 'validation', [(record, '; '.join(errors)) for record, errors in rejects])
+        elif callable(sink):
+            for record, errors in rejects:
+                sink(record, errors)
+        else:
+            try:
+                sink_path = Path(self.reject_sink)
+                sink_path.parent.mkdir(parents=True, exist_ok=True)
+                rejected_at = datetime.now().isoformat()
+                with self._lock, open(sink_path, 'a') as f:
+                    for record, errors in rejects:
+                        f.write(json.dumps({
+                            'rejected_at': rejected_at,
+                            'errors': errors,
+                            'record': record
+                        }, default=str) + '\n')
+            except Exception as e:
+                logger.error(f"Error writing rejected records: {str(e)}")
+    
+    @staticmethod
+    def infer_schema(
+        sample: List[Dict[str, Any]],
+        sample_size: int = 1000
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Infer a schema from sample records
+        
+        Fields present and non-null in every sampled record become required;
+        int and float values widen to number, other type mixes become any.
+        
+        Args:
+            sample: Records to inspect
+            sample_size: Maximum number of records to inspect
+            
+        Returns:
+            Schema dictionary usable with SchemaValidator
+        """
+        sample = sample[:sample_size]
+        types: Dict[str, set] = {}
+        present: Dict[str, int] = {}
+        nulls: Dict[str, int] = {}
+        
+        for record in sample:
+            for field, value in record.items():
+                present[field] = present.get(field, 0) + 1
+                if value is None:
+                    nulls[field] = nulls.get(field, 0) + 1
+                    continue
+                types.setdefault(field, set()).add(SchemaValidator._type_name(value))
+                
+        schema = {}
+        for field, count in present.items():
+            seen = types.get(field, set())
+            if len(seen) == 1:
+                type_name = next(iter(seen))
+            elif seen and seen <= {'int', 'float', 'number'}:
+                type_name = 'number'
+            else:
+                type_name = 'any'
+            schema[field] = {
+                'type': type_name,
+                'required': count == len(sample) and not nulls.get(field),
+                'nullable': bool(nulls.get(field)) or count < len(sample)
+            }
+            
+        return schema
+    
+    @staticmethod
+    def _type_name(value: Any) -> str:
+        """Name the schema type of a sample value"""
+        if isinstance(value, bool):
+            return 'bool'
+        if isinstance(value, int):
+            return 'int'
+        if isinstance(value, float):
+            return 'float'
+        if isinstance(value, dict):
+            return 'dict'
+        if isinstance(value, list):
+            return 'list'
+        if isinstance(value, (datetime, date)):
+            return 'datetime'
+        if isinstance(value, str):
+            # Only ISO-looking strings are treated as datetimes
+            if value[4:5] == '-' and _is_datetime(value):
+                return 'datetime'
+            return 'str'
+        return 'any'
+    
+    @classmethod
+    def from_sample(
+        cls,
+        sample: List[Dict[str, Any]],
+        sample_size: int = 1000,
+        **kwargs
+    ) -> 'SchemaValidator':
+        """
+        Build a validator from a schema inferred over sample records
+        
+        Args:
+            sample: Records to inspect
+            sample_size: Maximum number of records to inspect
+            **kwargs: Passed to SchemaValidator
+            
+        Returns:
+            SchemaValidator instance
+        """
+        return cls(cls.infer_schema(sample, sample_size), **kwargs)
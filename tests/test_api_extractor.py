@@ -2,12 +2,24 @@
 Unit tests for APIExtractor
 """
 
+import io
 import pytest
+import requests
 from unittest.mock import Mock, patch
+from urllib3.response import HTTPResponse
 from src.clients.rest_client import RESTClient
 from src.extractors.api_extractor import APIExtractor
 
 
+def make_streamed_response(body, content_type):
+    """Build a requests Response whose body is read from a stream"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = content_type
+    response.raw = HTTPResponse(body=io.BytesIO(body), preload_content=False)
+    return response
+
+
 class TestAPIExtractor:
     """Test cases for APIExtractor"""
     
@@ -36,6 +48,68 @@ class TestAPIExtractor:
         result = self.extractor.extract("/test")
         
         assert len(result) == 2
+    
+    def test_extract_csv_response(self):
+        """Test extraction streams CSV rows as records"""
+        self.client.get.return_value = make_streamed_response(
+            b'id,name\n1,"Smith, Jane"\n2,Bob\n',
+            'text/csv'
+        )
+        
+        result = self.extractor.extract("/export")
+        
+        assert result == [{'id': '1', 'name': 'Smith, Jane'}, {'id': '2', 'name': 'Bob'}]
+        assert self.client.get.call_args.kwargs['stream'] is True
+    
+    def test_extract_csv_multiline_field(self):
+        """Test quoted fields keep their embedded line breaks"""
+        self.client.get.return_value = make_streamed_response(
+            b'id,note\r\n1,"line1\nline2"\r\n2,plain\r\n',
+            'text/csv; charset=utf-8'
+        )
+        
+        result = self.extractor.extract("/export")
+        
+        assert result == [{'id': '1', 'note': 'line1\nline2'}, {'id': '2', 'note': 'plain'}]
+    
+    def test_extract_xml_envelope(self):
+        """Test extraction finds records inside an XML envelope"""
+        self.client.get.return_value = make_streamed_response(
+            b'<response><data>'
+            b'<item id="1"><name>A</name><tag>x</tag><tag>y</tag></item>'
+            b'<item id="2"><name>B</name></item>'
+            b'</data></response>',
+            'application/xml; charset=utf-8'
+        )
+        
+        result = self.extractor.extract("/feed")
+        
+        assert result == [
+            {'id': '1', 'name': 'A', 'tag': ['x', 'y']},
+            {'id': '2', 'name': 'B'}
+        ]
+    
+    def test_extract_xml_single_record(self):
+        """Test an XML document without record elements is one record"""
+        self.client.get.return_value = make_streamed_response(
+            b'<customer><id>7</id><name>C</name></customer>',
+            'text/xml'
+        )
+        
+        result = self.extractor.extract("/customer/7")
+        
+        assert result == [{'id': '7', 'name': 'C'}]
+    
+    def test_extract_xml_empty_envelope(self):
+        """Test an empty XML envelope yields no records, like an empty JSON list"""
+        self.client.get.return_value = make_streamed_response(
+            b'<response><data/></response>',
+            'application/xml'
+        )
+        
+        result = self.extractor.extract("/feed")
+        
+        assert result == []
 
 
 if __name__ == '__main__':
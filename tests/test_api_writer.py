@@ -0,0 +1,135 @@
+"""
+Unit tests for APIWriter
+"""
+
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.clients.rest_client import RESTClient
+from src.loaders.api_writer import APIWriter, default_rejections
+
+
+class BatchHandler(BaseHTTPRequestHandler):
+    """Accepts batches, rejecting records marked bad and, once, records marked flaky"""
+    
+    batches = []
+    status = 200
+    lock = threading.Lock()
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        records = body['records'] if isinstance(body, dict) else body
+        with BatchHandler.lock:
+            BatchHandler.batches.append([record['id'] for record in records])
+            first_attempt = sum(ids.count(records[0]['id']) for ids in BatchHandler.batches) == 1
+        if BatchHandler.status != 200:
+            self.send_response(BatchHandler.status)
+            self.end_headers()
+            return
+        errors = [
+            {'index': i, 'message': f"invalid record {record['id']}"}
+            for i, record in enumerate(records)
+            if record.get('bad') or (record.get('flaky') and first_attempt)
+        ]
+        payload = json.dumps({'accepted': len(records) - len(errors), 'errors': errors}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestAPIWriter:
+    """Test cases for APIWriter"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures"""
+        BatchHandler.batches = []
+        BatchHandler.status = 200
+        server = ThreadingHTTPServer(('127.0.0.1', 0), BatchHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.client = RESTClient(f"http://127.0.0.1:{server.server_address[1]}", max_retries=0, log_every=0)
+        yield
+        server.shutdown()
+        server.server_close()
+    
+    def test_batches_are_capped_by_count(self):
+        """Test records are split into batches of max_batch_records"""
+        writer = APIWriter(self.client, max_batch_records=10, workers=3)
+        
+        result = writer.write(({'id': i} for i in range(25)), '/contacts/batch')
+        
+        assert result['records_loaded'] == 25
+        assert result['status'] == 'success'
+        assert result['requests'] == 3
+        assert sorted(len(ids) for ids in BatchHandler.batches) == [5, 10, 10]
+        assert sorted(i for ids in BatchHandler.batches for i in ids) == list(range(25))
+    
+    def test_batches_are_capped_by_bytes(self):
+        """Test no request body exceeds max_batch_bytes"""
+        records = [{'id': i, 'note': 'x' * 80} for i in range(20)]
+        writer = APIWriter(self.client, max_batch_records=100, max_batch_bytes=500, records_key=None)
+        
+        result = writer.write(records, '/contacts/batch')
+        
+        assert result['records_loaded'] == 20
+        assert result['bytes_sent'] <= 500 * result['requests']
+        assert all(len(ids) <= 5 for ids in BatchHandler.batches)
+    
+    def test_only_rejected_records_are_retried(self, tmp_path):
+        """Test partial failures resend just the rejected items"""
+        records = [{'id': i, 'flaky': i == 3, 'bad': i == 7} for i in range(10)]
+        writer = APIWriter(self.client, max_batch_records=10, retry_backoff=0,
+                           dead_letter=str(tmp_path / 'rejected.jsonl'))
+        
+        result = writer.write(records, '/contacts/batch')
+        
+        assert BatchHandler.batches == [list(range(10)), [3, 7], [7]]
+        assert result['records_loaded'] == 9
+        assert result['records_failed'] == 1
+        assert result['retried_records'] == 3
+        assert result['status'] == 'partial'
+        dead = [json.loads(line) for line in (tmp_path / 'rejected.jsonl').read_text().splitlines()]
+        assert [entry['record']['id'] for entry in dead] == [7]
+        assert 'invalid record 7' in dead[0]['error']
+    
+    def test_client_errors_are_not_retried(self):
+        """Test a 4xx batch fails at once and a 5xx batch is retried"""
+        BatchHandler.status = 400
+        writer = APIWriter(self.client, max_attempts=3, retry_backoff=0)
+        result = writer.write([{'id': 1}, {'id': 2}], '/contacts/batch')
+        
+        assert result['records_failed'] == 2
+        assert result['status'] == 'failed'
+        assert len(BatchHandler.batches) == 1
+        
+        BatchHandler.batches = []
+        BatchHandler.status = 503
+        result = writer.write([{'id': 1}], '/contacts/batch')
+        assert len(BatchHandler.batches) == 3
+    
+    def test_load_stream_writes_pages(self):
+        """Test the loader interface writes every record of every page"""
+        writer = APIWriter(self.client, max_batch_records=4)
+        
+        result = writer.load_stream(iter([[{'id': 1}, {'id': 2}], [{'id': 3}]]), '/contacts/batch')
+        
+        assert result['records_loaded'] == 3
+        assert BatchHandler.batches == [[1, 2, 3]]
+    
+    def test_default_rejections(self):
+        """Test the common partial-success response formats"""
+        assert default_rejections({'failed': [{'index': 1, 'error': 'dup'}]}, 3) == {1: 'dup'}
+        assert default_rejections({'results': [{'success': True}, {'status': 422, 'error': 'bad'}]}, 2) == {1: 'bad'}
+        assert default_rejections({'items': [{'status': 'ok'}, {'status': 'rejected'}]}, 2) == {1: 'rejected'}
+        assert default_rejections({'accepted': 2}, 2) == {}
+        assert default_rejections(None, 2) == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
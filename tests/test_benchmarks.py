@@ -0,0 +1,95 @@
+"""
+Unit tests for the mock API and end-to-end benchmark
+"""
+
+import json
+import pytest
+from benchmarks import bench_end_to_end
+from benchmarks.mock_api import MockAPIServer, timestamp_of
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+
+
+@pytest.fixture
+def server():
+    with MockAPIServer(records=250, max_page_size=100) as api:
+        yield api
+
+
+class TestMockAPIServer:
+    """Test cases for MockAPIServer"""
+    
+    def test_page_pagination(self, server):
+        """Test the extractor reads every page"""
+        client = RESTClient(server.base_url, log_every=0)
+        records = APIExtractor(client).extract('records', pagination=True, page_size=100)
+        
+        assert [record['id'] for record in records] == list(range(250))
+        assert server.requests_served == 3
+    
+    def test_cursor_pagination(self, server):
+        """Test following next_cursor returns every record once"""
+        client = RESTClient(server.base_url, log_every=0)
+        ids, params = [], {'limit': 80}
+        while True:
+            page = client.get('records', params=params).json()
+            ids.extend(record['id'] for record in page['data'])
+            if not page['next_cursor']:
+                break
+            params = {'limit': 80, 'cursor': page['next_cursor']}
+        
+        assert ids == list(range(250))
+    
+    def test_updated_at_filter(self, server):
+        """Test updated_at_gte skips older records"""
+        client = RESTClient(server.base_url, log_every=0)
+        page = client.get('records', params={
+            'updated_at_gte': timestamp_of(200).isoformat(), 'per_page': 100
+        }).json()
+        
+        assert [record['id'] for record in page['data']] == list(range(200, 250))
+        assert page['has_more'] is False
+    
+    def test_rate_limits_are_retried(self):
+        """Test injected 429s are retried by the client"""
+        with MockAPIServer(records=50, rate_limit_ratio=0.5, seed=1) as api:
+            client = RESTClient(api.base_url, max_retries=20, backoff_factor=0, log_every=0)
+            records = APIExtractor(client).extract('records', pagination=True, page_size=10)
+        
+        assert len(records) == 50
+        assert api.rate_limited > 0
+    
+    def test_compression_and_payload(self):
+        """Test padded records arrive intact through gzip"""
+        with MockAPIServer(records=20, payload_bytes=300, compress=True) as api:
+            client = RESTClient(api.base_url, log_every=0)
+            response = client.get('records', params={'per_page': 20})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert len(response.json()['data'][0]['notes']) == 300
+        assert api.bytes_sent < len(response.content)
+
+
+class TestEndToEndBenchmark:
+    """Test cases for bench_end_to_end"""
+    
+    def test_results_are_saved(self, tmp_path):
+        """Test every stage is measured and written as JSON"""
+        output = tmp_path / 'results.json'
+        bench_end_to_end.main(['--records', '300', '--page-size', '100', '--output', str(output)])
+        
+        result = json.loads(output.read_text())
+        assert set(result['stages']) == set(bench_end_to_end.STAGES)
+        assert result['stages']['extract']['records'] == 300
+        assert result['stages']['incremental']['records'] == 149
+        assert result['stages']['load']['records'] == 300
+        assert result['stages']['extract']['latency_p99_ms'] >= result['stages']['extract']['latency_p50_ms']
+        assert result['stages']['transform']['peak_rss_mb'] > 0
+        
+        bench_end_to_end.main([
+            '--records', '300', '--output', str(tmp_path / 'next.json'), '--compare', str(output)
+        ])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
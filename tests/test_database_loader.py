@@ -0,0 +1,367 @@
+"""
+Unit tests for DatabaseLoader
+"""
+
+import json
+import threading
+import pytest
+from sqlalchemy import text, Table, MetaData, Column, Integer, BigInteger, String
+from src.loaders.database_loader import DatabaseLoader, _partition
+from src.loaders.dead_letter import JSONLDeadLetterSink, TableDeadLetterSink
+from src.loaders.dialects import dedupe_rows, iter_copy_csv
+from src.loaders.schema_evolution import plan_schema_changes
+from src.utils.records import RecordBatch
+
+
+class TestDatabaseLoader:
+    """Test cases for DatabaseLoader"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.loader = DatabaseLoader("sqlite://")
+        with self.loader._get_engine().begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE customers (id INTEGER PRIMARY KEY, name TEXT, email TEXT)"
+            ))
+            conn.execute(text(
+                "INSERT INTO customers VALUES (1, 'Ann', 'ann@old.com'), (2, 'Bob', 'bob@x.com')"
+            ))
+    
+    def fetch(self, table_name='customers'):
+        with self.loader._get_engine().connect() as conn:
+            return [tuple(row) for row in conn.execute(text(f"SELECT * FROM {table_name} ORDER BY 1"))]
+    
+    @pytest.mark.parametrize('strategy', ['insert', 'merge'])
+    def test_upsert_updates_and_inserts(self, strategy):
+        """Test upsert overwrites existing keys and inserts new ones"""
+        result = self.loader.load(
+            [
+                {'id': 1, 'name': 'Ann', 'email': 'ann@new.com'},
+                {'id': 3, 'name': 'Cat', 'email': 'cat@x.com'}
+            ],
+            'customers',
+            load_mode='upsert',
+            unique_key='id',
+            chunksize=1,
+            upsert_strategy=strategy
+        )
+        
+        assert result['records_loaded'] == 2
+        assert self.fetch() == [
+            (1, 'Ann', 'ann@new.com'),
+            (2, 'Bob', 'bob@x.com'),
+            (3, 'Cat', 'cat@x.com')
+        ]
+    
+    @pytest.mark.parametrize('strategy', ['insert', 'merge'])
+    def test_upsert_repeated_key_in_one_chunk(self, strategy):
+        """Test a key repeated within a chunk is written once, with its last record"""
+        result = self.loader.load(
+            [
+                {'id': 1, 'name': 'Ann', 'email': 'ann@page1.com'},
+                {'id': 3, 'name': 'Cat', 'email': 'cat@x.com'},
+                {'id': 1, 'name': 'Ann', 'email': 'ann@page2.com'}
+            ],
+            'customers',
+            load_mode='upsert',
+            unique_key='id',
+            upsert_strategy=strategy
+        )
+        
+        assert result['records_loaded'] == 2
+        assert result['records_deduplicated'] == 1
+        assert result['records_failed'] == 0
+        assert result['status'] == 'success'
+        assert self.fetch() == [
+            (1, 'Ann', 'ann@page2.com'),
+            (2, 'Bob', 'bob@x.com'),
+            (3, 'Cat', 'cat@x.com')
+        ]
+    
+    def test_dedupe_rows(self):
+        """Test the last row of each key is kept and NULL keys are never merged"""
+        rows = [{'id': 1, 'v': 'a'}, {'id': None, 'v': 'b'}, {'id': 1, 'v': 'c'}, {'id': None, 'v': 'd'}]
+        unique = [{'id': 2}]
+        
+        assert dedupe_rows(rows, ['id']) == [{'id': 1, 'v': 'c'}, {'id': None, 'v': 'b'}, {'id': None, 'v': 'd'}]
+        assert dedupe_rows(unique, ['id']) is unique
+        assert dedupe_rows(RecordBatch.from_records(rows), ['id']).column('v') == ['c', 'b', 'd']
+    
+    def test_upsert_rolls_back_on_error(self):
+        """Test a failing upsert leaves the table untouched"""
+        with pytest.raises(Exception):
+            self.loader.load(
+                [{'id': 1, 'name': 'Changed'}, {'id': None, 'name': None, 'email': object()}],
+                'customers',
+                load_mode='upsert',
+                unique_key='id',
+                upsert_strategy='insert'
+            )
+            
+        assert self.fetch()[0] == (1, 'Ann', 'ann@old.com')
+    
+    def test_upsert_requires_unique_key(self):
+        """Test upsert without unique_key is rejected"""
+        with pytest.raises(ValueError):
+            self.loader.load([{'id': 1}], 'customers', load_mode='upsert')
+    
+    @pytest.mark.parametrize('append_method', ['bulk', 'to_sql'])
+    def test_append_creates_and_replaces_table(self, append_method):
+        """Test append creates a missing table and replace recreates it"""
+        self.loader.load([{'id': 1, 'v': 'a'}], 'events', append_method=append_method)
+        self.loader.load([{'id': 2, 'v': 'b'}], 'events', append_method=append_method)
+        assert self.fetch('events') == [(1, 'a'), (2, 'b')]
+        
+        self.loader.load([{'id': 3, 'v': 'c'}], 'events', load_mode='replace', append_method=append_method)
+        assert self.fetch('events') == [(3, 'c')]
+    
+    def test_append_creates_columns_for_late_fields(self):
+        """Test a field first seen past the DDL sample still gets a column"""
+        data = [{'id': i, 'v': 'a'} for i in range(1500)]
+        data[1200]['extra'] = 'late'
+        
+        result = self.loader.load(data, 'events')
+        
+        assert result['status'] == 'success'
+        with self.loader._get_engine().connect() as conn:
+            rows = conn.execute(text("SELECT id, extra FROM events WHERE extra IS NOT NULL")).fetchall()
+        assert [tuple(row) for row in rows] == [(1200, 'late')]
+    
+    @pytest.mark.parametrize('load_mode', ['append', 'upsert'])
+    def test_unknown_fields_raise(self, load_mode):
+        """Test fields without a column fail the load instead of being dropped"""
+        with pytest.raises(ValueError, match='extra'):
+            self.loader.load(
+                [{'id': 3, 'name': 'Cat', 'extra': 'x'}], 'customers', load_mode=load_mode, unique_key='id'
+            )
+        assert [row[0] for row in self.fetch()] == [1, 2]
+    
+    def test_copy_csv_rendering(self):
+        """Test COPY CSV distinguishes NULL from empty strings"""
+        chunks = iter_copy_csv(
+            [{'a': None, 'b': '', 'c': 'say "hi"', 'd': True, 'e': {'k': 1}}],
+            ['a', 'b', 'c', 'd', 'e']
+        )
+        
+        assert ''.join(chunks) == ',"","say ""hi""",t,"{""k"": 1}"\n'
+    
+    def test_metadata_is_cached(self):
+        """Test repeated loads reflect the table once until invalidated"""
+        for i in range(3):
+            self.loader.load([{'id': 10 + i, 'name': 'x'}], 'customers')
+        assert self.loader.metadata_cache.misses == 1
+        
+        self.loader.invalidate_metadata('customers')
+        self.loader.load([{'id': 20, 'name': 'y'}], 'customers')
+        assert self.loader.metadata_cache.misses == 2
+    
+    def test_schema_evolution_adds_columns(self):
+        """Test new fields become columns when schema evolution is enabled"""
+        loader = DatabaseLoader("sqlite://", schema_evolution=True)
+        loader.engine = self.loader._get_engine()
+        
+        loader.load([{'id': 3, 'name': 'Cat', 'score': 1.5, 'vip': True}], 'customers')
+        loader.load(
+            [{'id': 1, 'name': 'Ann', 'tier': 'gold'}],
+            'customers',
+            load_mode='upsert',
+            unique_key='id'
+        )
+        
+        with loader._get_engine().connect() as conn:
+            columns = [row[1] for row in conn.execute(text("PRAGMA table_info(customers)"))]
+        assert columns == ['id', 'name', 'email', 'score', 'vip', 'tier']
+        assert self.fetch()[0] == (1, 'Ann', 'ann@old.com', None, None, 'gold')
+    
+    def test_plan_schema_changes_widens_types(self):
+        """Test integer and varchar columns are widened to fit values"""
+        table = Table(
+            't', MetaData(),
+            Column('n', Integer), Column('s', String(8)), Column('b', BigInteger)
+        )
+        
+        changes = plan_schema_changes(table, [{'n': 2 ** 40, 's': 'x' * 20, 'b': 1.5}])
+        
+        widened = {column.name: new_type for column, new_type in changes.widened_columns}
+        assert isinstance(widened['n'], BigInteger)
+        assert widened['s'].length == 32
+        assert 'b' not in widened
+    
+    def test_hash_partition_keeps_keys_together(self):
+        """Test hash partitions cover all records and never split a key"""
+        data = [{'id': i % 25, 'n': i} for i in range(100)]
+        
+        parts = _partition(data, 4, 'hash', ['id'])
+        
+        assert sum(len(part) for part in parts) == 100
+        for index, part in enumerate(parts):
+            other_ids = {r['id'] for other in parts[:index] + parts[index + 1:] for r in other}
+            assert not other_ids & {r['id'] for r in part}
+    
+    def test_range_partition_is_sorted(self):
+        """Test range partitions are contiguous key ranges"""
+        data = [{'id': (i * 7) % 100} for i in range(100)]
+        
+        parts = _partition(data, 4, 'range', ['id'])
+        
+        assert [len(part) for part in parts] == [25, 25, 25, 25]
+        assert [r['id'] for part in parts for r in part] == list(range(100))
+    
+    @pytest.mark.parametrize('ordered_commit', [False, True])
+    def test_load_parallel_upsert(self, tmp_path, ordered_commit):
+        """Test parallel upsert writes every partition"""
+        loader = DatabaseLoader(f"sqlite:///{tmp_path / 'parallel.db'}", pool_size=4)
+        with loader._get_engine().begin() as conn:
+            conn.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, n INTEGER)"))
+            
+        result = loader.load_parallel(
+            [{'id': i, 'n': i * 2} for i in range(50)],
+            'items',
+            load_mode='upsert',
+            unique_key='id',
+            workers=4,
+            ordered_commit=ordered_commit
+        )
+        
+        assert result['records_loaded'] == 50
+        with loader._get_engine().connect() as conn:
+            assert conn.execute(text("SELECT COUNT(*), SUM(n) FROM items")).one() == (50, 2450)
+    
+    def test_load_stream_pages_and_records(self):
+        """Test load_stream regroups pages and records into batches"""
+        def source():
+            yield [{'id': 1, 'value': 'a'}, {'id': 2, 'value': 'b'}]
+            yield {'id': 3, 'value': 'c'}
+            yield [{'id': 4, 'value': 'd'}]
+            
+        result = self.loader.load_stream(source(), 'events', batch_size=3)
+        
+        assert result['records_loaded'] == 4
+        assert result['batches'] == 2
+        assert self.fetch('events') == [(1, 'a'), (2, 'b'), (3, 'c'), (4, 'd')]
+    
+    def test_load_stream_upsert(self):
+        """Test load_stream upserts each batch"""
+        records = ({'id': i, 'name': f'n{i}'} for i in range(1, 5))
+        
+        self.loader.load_stream(records, 'customers', load_mode='upsert', unique_key='id', batch_size=2)
+        
+        assert self.fetch() == [
+            (1, 'n1', 'ann@old.com'),
+            (2, 'n2', 'bob@x.com'),
+            (3, 'n3', None),
+            (4, 'n4', None)
+        ]
+    
+    def test_load_stream_single_transaction_rolls_back(self):
+        """Test a failure in single transaction mode discards earlier batches"""
+        def source():
+            yield {'id': 10, 'name': 'x'}
+            yield {'id': 11, 'name': 'y'}
+            raise RuntimeError('extract failed')
+            
+        with pytest.raises(RuntimeError):
+            self.loader.load_stream(
+                source(), 'customers', load_mode='upsert', unique_key='id',
+                batch_size=1, transaction='single'
+            )
+            
+        assert [row[0] for row in self.fetch()] == [1, 2]
+
+
+    def test_dead_letter_bisects_failed_chunk(self, tmp_path):
+        """Test only the offending rows of a failed chunk are dead-lettered"""
+        path = tmp_path / 'dead.jsonl'
+        self.loader.dead_letter = JSONLDeadLetterSink(str(path))
+        data = [{'id': i, 'name': f'n{i}', 'email': None} for i in range(3, 11)]
+        data[2]['id'] = 1
+        data[6]['id'] = 2
+        
+        result = self.loader.load(data, 'customers', chunksize=8)
+        
+        assert result['records_loaded'] == 6
+        assert result['records_failed'] == 2
+        assert result['status'] == 'partial'
+        assert [row[0] for row in self.fetch()] == [1, 2, 3, 4, 6, 7, 8, 10]
+        letters = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [letter['record']['name'] for letter in letters] == ['n5', 'n9']
+        assert all('IntegrityError' in letter['error'] for letter in letters)
+        assert letters[0]['table'] == 'customers'
+    
+    def test_dead_letter_table_sink_for_upsert(self, tmp_path):
+        """Test failed upsert rows go to a dead letter table and good rows commit"""
+        with self.loader._get_engine().begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE scores (id INTEGER PRIMARY KEY, score INTEGER CHECK (score >= 0))"
+            ))
+        sink_url = f"sqlite:///{tmp_path / 'dead.db'}"
+        self.loader.dead_letter = TableDeadLetterSink(sink_url)
+        
+        result = self.loader.load(
+            [{'id': 1, 'score': 5}, {'id': 2, 'score': -1}, {'id': 3, 'score': 7}],
+            'scores',
+            load_mode='upsert',
+            unique_key='id',
+            upsert_strategy='merge'
+        )
+        
+        assert result['records_loaded'] == 2
+        assert self.fetch('scores') == [(1, 5), (3, 7)]
+        with self.loader.dead_letter.engine.connect() as conn:
+            rows = conn.execute(text("SELECT target_table, record FROM _dead_letters")).fetchall()
+        assert [(row[0], json.loads(row[1])) for row in rows] == [('scores', {'id': 2, 'score': -1})]
+    
+    def test_dead_letters_of_rolled_back_load_are_discarded(self, tmp_path):
+        """Test dead letters are only written once their transaction commits"""
+        path = tmp_path / 'dead.jsonl'
+        self.loader.dead_letter = JSONLDeadLetterSink(str(path))
+        
+        def source():
+            yield [{'id': 3, 'name': 'Cat'}, {'id': 1, 'name': 'Dup'}]
+            raise RuntimeError('extract failed')
+            
+        with pytest.raises(RuntimeError):
+            self.loader.load_stream(source(), 'customers', batch_size=2, transaction='single')
+            
+        assert [row[0] for row in self.fetch()] == [1, 2]
+        assert not path.exists() or not path.read_text()
+        
+        self.loader.load([{'id': 4, 'name': 'Dee'}, {'id': 2, 'name': 'Dup'}], 'customers')
+        letters = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [letter['record']['name'] for letter in letters] == ['Dup']
+        assert letters[0]['record']['id'] == 2
+    
+    def test_concurrent_sqlite_writers(self, tmp_path):
+        """Test loads from several threads into one SQLite file wait for the write lock"""
+        loader = DatabaseLoader(f"sqlite:///{tmp_path / 'shared.db'}")
+        with loader._get_engine().begin() as conn:
+            conn.execute(text("CREATE TABLE counters (id INTEGER PRIMARY KEY, n INTEGER)"))
+        errors = []
+        
+        def write(worker):
+            try:
+                for n in range(20):
+                    loader.load([{'id': worker, 'n': n}], 'counters', load_mode='upsert', unique_key='id')
+            except Exception as e:
+                errors.append(e)
+                
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+            
+        assert errors == []
+        with loader._get_engine().connect() as conn:
+            rows = conn.execute(text("SELECT id, n FROM counters ORDER BY id")).fetchall()
+        assert [tuple(row) for row in rows] == [(worker, 19) for worker in range(4)]
+    
+    def test_failed_chunk_raises_without_dead_letter(self):
+        """Test a failing chunk still aborts the load when no sink is configured"""
+        with pytest.raises(Exception):
+            self.loader.load([{'id': 3}, {'id': 1}], 'customers')
+        assert [row[0] for row in self.fetch()] == [1, 2]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
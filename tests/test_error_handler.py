@@ -0,0 +1,81 @@
+"""
+Unit tests for ErrorHandler
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+import pytest
+from src.utils.error_handler import ErrorHandler
+
+
+def raise_and_handle(handler, error, endpoint='/users'):
+    try:
+        raise error
+    except Exception as e:
+        return handler.handle_error(e, context={'endpoint': endpoint})
+
+
+class TestErrorHandler:
+    """Test cases for ErrorHandler"""
+    
+    def test_history_is_bounded_and_counters_are_not(self):
+        """Test history keeps only recent errors while counters cover all"""
+        handler = ErrorHandler(history_size=3)
+        for i in range(5):
+            raise_and_handle(handler, ValueError(f"bad {i}"))
+        raise_and_handle(handler, KeyError('id'), endpoint='/orders')
+        
+        summary = handler.get_error_summary()
+        
+        assert len(handler.error_history) == 3
+        assert summary['total_errors'] == 6
+        assert summary['error_types'] == {'ValueError': 5, 'KeyError': 1}
+        assert summary['errors_by_endpoint'] == {'/users': 5, '/orders': 1}
+        assert summary['latest_error']['error_type'] == 'KeyError'
+    
+    def test_traceback_sampling(self):
+        """Test the first error of a type always has a traceback"""
+        handler = ErrorHandler(traceback_sample_rate=0)
+        first = raise_and_handle(handler, ValueError("first"))
+        second = raise_and_handle(handler, ValueError("second"))
+        
+        assert 'ValueError: first' in first['traceback']
+        assert second['traceback'] is None
+    
+    def test_log_file_is_jsonl(self, tmp_path):
+        """Test the background writer appends one JSON record per error"""
+        log_file = tmp_path / 'logs' / 'errors.jsonl'
+        with ErrorHandler(log_file=str(log_file), batch_size=2) as handler:
+            for i in range(5):
+                raise_and_handle(handler, ValueError(f"bad {i}"))
+            handler.flush()
+            
+            records = [json.loads(line) for line in log_file.read_text().splitlines()]
+            assert [r['error_message'] for r in records] == [f"bad {i}" for i in range(5)]
+            assert records[0]['context'] == {'endpoint': '/users'}
+
+    
+    def test_queued_records_are_written_at_exit(self, tmp_path):
+        """Test a script that never calls close still writes its log"""
+        log_file = tmp_path / 'errors.jsonl'
+        script = textwrap.dedent(f"""
+            from src.utils.error_handler import ErrorHandler
+            handler = ErrorHandler(log_file={str(log_file)!r})
+            for i in range(50):
+                try:
+                    raise ValueError(i)
+                except ValueError as e:
+                    handler.handle_error(e)
+        """)
+        subprocess.run(
+            [sys.executable, '-c', script], check=True, capture_output=True,
+            cwd=Path(__file__).resolve().parents[1]
+        )
+        
+        assert len(log_file.read_text().splitlines()) == 50
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,79 @@
+"""
+Unit tests for ParquetLoader and ArrowLoader
+"""
+
+import pytest
+from src.loaders.file_loader import ParquetLoader, ArrowLoader
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.dataset as ds
+import pyarrow.parquet
+
+
+class TestFileLoader:
+    """Test cases for file loaders"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.data = [
+            {'id': i, 'updated_at': f'2024-01-0{1 + i % 2}T10:00:00Z', 'note': None if i < 3 else 'x'}
+            for i in range(10)
+        ]
+    
+    def test_parquet_partitions_by_date_and_rolls_files(self, tmp_path):
+        """Test records are split into date partitions and files roll by size"""
+        loader = ParquetLoader(
+            str(tmp_path),
+            timestamp_field='updated_at',
+            row_group_size=2,
+            max_rows_per_file=4
+        )
+        
+        result = loader.load(self.data, 'orders')
+        
+        assert result['records_loaded'] == 10
+        assert sorted(p.name for p in (tmp_path / 'orders').iterdir()) == ['date=2024-01-01', 'date=2024-01-02']
+        assert len(result['files']) == 4
+        assert not list(tmp_path.rglob('*.tmp'))
+        
+        table = ds.dataset(str(tmp_path / 'orders'), format='parquet', partitioning='hive').to_table()
+        assert sorted(table.column('id').to_pylist()) == list(range(10))
+    
+    def test_new_field_rolls_file(self, tmp_path):
+        """Test a field first seen after the first row group is kept in a new file"""
+        self.data[5]['extra'] = 'late'
+        loader = ParquetLoader(str(tmp_path), row_group_size=2)
+        
+        result = loader.load(self.data, 'orders')
+        
+        rows = [row for path in result['files'] for row in pa.parquet.read_table(path).to_pylist()]
+        assert len(result['files']) == 2
+        assert sorted(row['id'] for row in rows) == list(range(10))
+        assert [row['id'] for row in rows if row.get('extra') == 'late'] == [5]
+    
+    def test_arrow_stream_of_pages(self, tmp_path):
+        """Test ArrowLoader writes a page stream to IPC files"""
+        loader = ArrowLoader(str(tmp_path), partition_by=['note'])
+        
+        result = loader.load_stream(iter([self.data[:5], self.data[5:]]), 'orders')
+        
+        assert result['records_loaded'] == 10
+        with pa.ipc.open_file(result['files'][0]) as reader:
+            assert reader.read_all().num_rows in (3, 7)
+    
+    def test_failed_load_leaves_no_files(self, tmp_path):
+        """Test a failed load removes temporary files"""
+        def source():
+            yield self.data
+            raise RuntimeError('extract failed')
+            
+        loader = ParquetLoader(str(tmp_path), row_group_size=3)
+        
+        with pytest.raises(RuntimeError):
+            loader.load_stream(source(), 'orders', batch_size=5)
+            
+        assert not [p for p in tmp_path.rglob('*') if p.is_file()]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
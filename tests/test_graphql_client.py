@@ -0,0 +1,184 @@
+"""
+Unit tests for GraphQLClient and GraphQLExtractor
+"""
+
+import hashlib
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.clients.graphql_client import GraphQLClient, GraphQLError
+from src.extractors.graphql_extractor import GraphQLExtractor
+
+CUSTOMERS = [{'id': str(i), 'name': f'customer-{i}'} for i in range(25)]
+
+CUSTOMERS_QUERY = """
+query Customers($first: Int!, $after: String) {
+  shop {
+    customers(first: $first, after: $after) {
+      edges { node { id name } }
+      pageInfo { hasNextPage endCursor }
+    }
+  }
+}
+"""
+
+CUSTOMER_QUERY = "query Customer($id: ID!) { customer(id: $id) { id name } }"
+
+
+class GraphQLHandler(BaseHTTPRequestHandler):
+    """Answers a few known operations without parsing GraphQL"""
+    
+    posts = []
+    known_hashes = {}
+    
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        GraphQLHandler.posts.append(body)
+        if isinstance(body, list):
+            result = [self.resolve(operation) for operation in body]
+        else:
+            result = self.resolve(body)
+        payload = json.dumps(result).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def resolve(self, operation):
+        query = operation.get('query')
+        persisted = (operation.get('extensions') or {}).get('persistedQuery')
+        if persisted:
+            if query is None:
+                if persisted['sha256Hash'] not in GraphQLHandler.known_hashes:
+                    return {'errors': [{
+                        'message': 'PersistedQueryNotFound',
+                        'extensions': {'code': 'PERSISTED_QUERY_NOT_FOUND'}
+                    }]}
+                query = GraphQLHandler.known_hashes[persisted['sha256Hash']]
+            else:
+                GraphQLHandler.known_hashes[persisted['sha256Hash']] = query
+        variables = operation.get('variables') or {}
+        
+        if 'customers(' in query:
+            start = int(variables.get('after') or 0)
+            nodes = CUSTOMERS[start:start + variables['first']]
+            end = start + len(nodes)
+            return {'data': {'shop': {'customers': {
+                'edges': [{'node': node} for node in nodes],
+                'pageInfo': {'hasNextPage': end < len(CUSTOMERS), 'endCursor': str(end)}
+            }}}}
+        if 'Aliased' in query:
+            return {'data': {
+                f"r{name.split('_')[1]}": CUSTOMERS[int(value)] for name, value in variables.items()
+            }}
+        if 'customer(' in query:
+            if variables['id'] == 'missing':
+                return {'data': {'customer': None}, 'errors': [{'message': 'Customer not found'}]}
+            return {'data': {'customer': CUSTOMERS[int(variables['id'])]}}
+        return {'errors': [{'message': 'Unknown query'}]}
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestGraphQLClient:
+    """Test cases for GraphQLClient"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Set up test fixtures"""
+        GraphQLHandler.posts = []
+        GraphQLHandler.known_hashes = {}
+        server = ThreadingHTTPServer(('127.0.0.1', 0), GraphQLHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        self.client = GraphQLClient(self.base_url, api_key='Bearer token', log_every=0)
+        yield
+        server.shutdown()
+        server.server_close()
+    
+    def test_execute(self):
+        """Test one operation returns its data"""
+        data = self.client.execute(CUSTOMER_QUERY, {'id': '3'})
+        
+        assert data == {'customer': {'id': '3', 'name': 'customer-3'}}
+    
+    def test_errors_are_raised(self):
+        """Test a response with errors raises GraphQLError with the partial data"""
+        with pytest.raises(GraphQLError, match='Customer not found') as error:
+            self.client.execute(CUSTOMER_QUERY, {'id': 'missing'})
+        
+        assert error.value.data == {'customer': None}
+    
+    def test_array_batching(self):
+        """Test operations are sent as arrays of up to max_batch_size"""
+        client = GraphQLClient(self.base_url, max_batch_size=4, log_every=0)
+        
+        results = client.execute_batch([(CUSTOMER_QUERY, {'id': str(i)}) for i in range(10)])
+        
+        assert [result['customer']['id'] for result in results] == [str(i) for i in range(10)]
+        assert [len(body) for body in GraphQLHandler.posts] == [4, 4, 2]
+    
+    def test_aliased_batching(self):
+        """Test one selection is repeated under aliases with renamed variables"""
+        results = self.client.execute_aliased(
+            'customer(id: $id) { id name }', [{'id': str(i)} for i in (2, 7, 11)], {'id': 'ID!'}
+        )
+        
+        assert results == [CUSTOMERS[2], CUSTOMERS[7], CUSTOMERS[11]]
+        query = GraphQLHandler.posts[0]['query']
+        assert query.startswith('query Aliased($id_0: ID!, $id_1: ID!, $id_2: ID!)')
+        assert 'r1: customer(id: $id_1) { id name }' in query
+    
+    def test_persisted_queries(self):
+        """Test the query text is only sent until the server knows its hash"""
+        client = GraphQLClient(self.base_url, persisted_queries=True, log_every=0)
+        
+        client.execute(CUSTOMER_QUERY, {'id': '1'})
+        client.execute(CUSTOMER_QUERY, {'id': '2'})
+        
+        digest = hashlib.sha256(CUSTOMER_QUERY.encode()).hexdigest()
+        assert ['query' in body for body in GraphQLHandler.posts] == [False, True, False]
+        assert all(body['extensions']['persistedQuery']['sha256Hash'] == digest for body in GraphQLHandler.posts)
+    
+    def test_persisted_queries_in_a_batch(self):
+        """Test only the unknown operations of a batch are resent with their text"""
+        client = GraphQLClient(self.base_url, persisted_queries=True, log_every=0)
+        client.execute(CUSTOMER_QUERY, {'id': '0'})
+        GraphQLHandler.posts = []
+        
+        results = client.execute_batch([(CUSTOMER_QUERY, {'id': '1'}), (CUSTOMERS_QUERY, {'first': 2})])
+        
+        assert results[0]['customer']['id'] == '1'
+        assert len(results[1]['shop']['customers']['edges']) == 2
+        assert [len(body) for body in GraphQLHandler.posts] == [2, 1]
+        assert 'customers(' in GraphQLHandler.posts[1][0]['query']
+    
+    def test_paginate(self):
+        """Test endCursor is followed until hasNextPage is false"""
+        pages = list(self.client.paginate(CUSTOMERS_QUERY, 'shop.customers', page_size=10))
+        
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert [node['id'] for page in pages for node in page] == [customer['id'] for customer in CUSTOMERS]
+        assert [body['variables'].get('after') for body in GraphQLHandler.posts] == [None, '10', '20']
+    
+    def test_extractor(self):
+        """Test registered queries extract like REST endpoints"""
+        extractor = GraphQLExtractor(
+            self.client,
+            queries={'customers': CUSTOMERS_QUERY, 'customer': CUSTOMER_QUERY},
+            connections={'customers': 'shop.customers'}
+        )
+        
+        pages = list(extractor.iter_pages('customers', pagination=True, page_size=10))
+        
+        assert [len(page) for page in pages] == [10, 10, 5]
+        assert extractor.extract('customer', params={'id': '4'}) == [CUSTOMERS[4]]
+        with pytest.raises(KeyError):
+            extractor.extract('orders')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
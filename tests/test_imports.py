@@ -0,0 +1,54 @@
+"""
+Unit tests for lazy package imports
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'sqlalchemy', 'requests_oauthlib', 'dateutil', 'yaml')
+
+
+def loaded_after(statement):
+    """Heavy modules loaded by running statement in a fresh interpreter"""
+    probe = f"import sys\n{statement}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run(
+        [sys.executable, '-c', probe], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return set(filter(None, output.strip().split(',')))
+
+
+class TestImports:
+    """Test cases for lazy imports"""
+    
+    @pytest.mark.parametrize('statement', [
+        'import src',
+        'from src import RESTClient',
+        'from src import APIExtractor, IncrementalExtractor, ResponseTransformer',
+        'from src.utils import RateLimiter, ErrorHandler'
+    ])
+    def test_light_imports_skip_heavy_dependencies(self, statement):
+        """Test clients, extractors and transformers load no heavy dependencies"""
+        assert loaded_after(statement) == set()
+    
+    def test_public_names_resolve(self):
+        """Test every name in __all__ is still importable"""
+        import src
+        import src.clients, src.extractors, src.loaders, src.pipeline
+        import src.transformers, src.utils, src.validators
+        
+        for package in (src, src.clients, src.extractors, src.loaders, src.pipeline,
+                        src.transformers, src.utils, src.validators):
+            for name in package.__all__:
+                assert getattr(package, name) is not None
+            assert set(package.__all__) <= set(dir(package))
+            
+        with pytest.raises(AttributeError):
+            src.NotAThing
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
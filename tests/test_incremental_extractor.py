@@ -0,0 +1,82 @@
+"""
+Unit tests for IncrementalExtractor
+"""
+
+import pytest
+from datetime import datetime
+from unittest.mock import Mock
+from src.clients.rest_client import RESTClient
+from src.extractors.incremental_extractor import IncrementalExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.loaders.sync_state import Watermark
+
+
+class TestIncrementalExtractor:
+    """Test cases for IncrementalExtractor"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.client = Mock(spec=RESTClient)
+        self.loader = DatabaseLoader("sqlite://")
+        self.extractor = IncrementalExtractor(self.client, state_store=self.loader)
+    
+    def respond(self, records):
+        mock_response = Mock()
+        mock_response.json.return_value = {'data': records, 'has_more': False}
+        self.client.get.return_value = mock_response
+    
+    def test_watermark_commits_with_data(self):
+        """Test the watermark only advances when the load commits"""
+        self.respond([
+            {'id': 1, 'updated_at': '2024-01-01T00:00:00'},
+            {'id': 2, 'updated_at': '2024-01-03T00:00:00'}
+        ])
+        records = self.extractor.extract_incremental('/orders')
+        
+        assert self.extractor.pending_watermark == ('/orders', datetime(2024, 1, 3))
+        assert self.loader.get_watermark('/orders') is None
+        
+        self.loader.load(records, 'orders', watermark=self.extractor.pending_watermark)
+        
+        assert self.loader.get_watermark('/orders') == datetime(2024, 1, 3)
+    
+    def test_failed_load_keeps_previous_watermark(self):
+        """Test a failed load leaves the watermark and the next run re-extracts"""
+        self.respond([{'id': 1, 'updated_at': '2024-01-01T00:00:00'}])
+        records = self.extractor.extract_incremental('/orders')
+        self.loader.load(records, 'orders', watermark=self.extractor.pending_watermark)
+        
+        self.respond([{'id': 2, 'updated_at': '2024-02-01T00:00:00', 'missing': 1}])
+        records = self.extractor.extract_incremental('/orders')
+        with pytest.raises(Exception):
+            self.loader.load(records, 'orders', load_mode='upsert', unique_key='missing',
+                             watermark=self.extractor.pending_watermark)
+            
+        assert self.loader.get_watermark('/orders') == datetime(2024, 1, 1)
+        self.extractor.extract_incremental('/orders')
+        params = self.client.get.call_args.kwargs['params']
+        assert params['updated_at_gte'] == '2024-01-01T00:00:00'
+    
+    def test_load_stream_commits_watermark_with_last_batch(self):
+        """Test a stream that fails after its last batch keeps the old watermark"""
+        watermark = Watermark('/orders', datetime(2024, 3, 1))
+        
+        def pages():
+            yield [{'id': 1}, {'id': 2}]
+            yield [{'id': 3}, {'id': 4}]
+            raise RuntimeError("connection reset")
+            
+        with pytest.raises(RuntimeError):
+            self.loader.load_stream(pages(), 'orders', batch_size=2, watermark=watermark)
+            
+        with self.loader._get_engine().connect() as conn:
+            ids = [row[0] for row in conn.exec_driver_sql("SELECT id FROM orders ORDER BY id")]
+        assert ids == [1, 2]
+        assert self.loader.get_watermark('/orders') is None
+        
+        self.loader.load_stream([[{'id': 3}, {'id': 4}]], 'orders', batch_size=2, watermark=watermark)
+        assert self.loader.get_watermark('/orders') == datetime(2024, 3, 1)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,158 @@
+"""
+Unit tests for MemoryGovernor
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.extractors.api_extractor import APIExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.pipeline.memory import MemoryGovernor, estimate_page_bytes, parse_size
+from src.pipeline.runner import PipelineRunner
+from src.transformers.response_transformer import ResponseTransformer
+from src.utils.records import RecordBatch
+
+
+def make_page(start, size=100):
+    return [{'id': i, 'name': f'customer-{i}', 'email': f'c{i}@example.com'} for i in range(start, start + size)]
+
+
+class TestMemoryGovernor:
+    """Test cases for MemoryGovernor"""
+    
+    def test_parse_size(self):
+        """Test sizes are read from ints and unit strings"""
+        assert parse_size(1000) == 1000
+        assert parse_size('512MB') == 512 * 2 ** 20
+        assert parse_size('1.5 kb') == 1536
+        assert parse_size(None) is None
+        with pytest.raises(ValueError):
+            parse_size('lots')
+    
+    def test_estimate_page_bytes(self):
+        """Test estimates grow with the page and compact pages are smaller"""
+        page = make_page(0, 1000)
+        
+        assert estimate_page_bytes([]) == 0
+        assert estimate_page_bytes(page) > 10 * estimate_page_bytes(page[:50])
+        assert estimate_page_bytes(RecordBatch.from_records(page)) < estimate_page_bytes(page)
+    
+    def test_acquire_waits_for_release(self):
+        """Test acquire blocks past the budget until another page is released"""
+        governor = MemoryGovernor(budget=1000)
+        governor.acquire('extract', 600)
+        
+        assert governor.acquire('extract', 600, timeout=0.05) is False
+        
+        threading.Timer(0.05, governor.release, ('extract', 600)).start()
+        assert governor.acquire('extract', 600, timeout=5) is True
+        assert governor.summary()['waits'] == 1
+        assert governor.summary()['wait_seconds'] > 0
+    
+    def test_oversized_page_is_admitted_alone(self):
+        """Test a page over the whole budget passes when nothing is in flight"""
+        governor = MemoryGovernor(budget=100)
+        
+        assert governor.acquire('extract', 500, timeout=0) is True
+    
+    def test_peaks_per_stage(self):
+        """Test peaks are tracked overall and per stage as pages move"""
+        governor = MemoryGovernor()
+        governor.acquire('extract', 300)
+        governor.acquire('extract', 200)
+        governor.move('extract', 'transform', 300, 100)
+        governor.move('transform', 'load', 100, 100)
+        governor.release('load', 100)
+        
+        summary = governor.summary()
+        assert governor.in_flight == 200
+        assert summary['peak_bytes'] == 500
+        assert summary['peak_by_stage'] == {'extract': 500, 'transform': 100, 'load': 100}
+
+
+class TestPipelineMemoryBudget:
+    """Test cases for memory budgets in PipelineRunner"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures"""
+        self.extractor = Mock(spec=APIExtractor)
+        self.pages = [make_page(start) for start in range(0, 2000, 100)]
+        self.loader = DatabaseLoader(f"sqlite:///{tmp_path / 'memory.db'}")
+    
+    def test_run_reports_peak_usage(self):
+        """Test every run reports its peak bytes in flight per stage"""
+        self.extractor.iter_pages.return_value = iter(self.pages)
+        
+        result = PipelineRunner(self.extractor, ResponseTransformer(), self.loader).run('/customers', 'customers')
+        
+        memory = result['memory']
+        assert result['records_loaded'] == 2000
+        assert memory['budget_bytes'] is None
+        assert memory['peak_bytes'] >= estimate_page_bytes(self.pages[0])
+        assert set(memory['peak_by_stage']) == {'extract', 'transform', 'load'}
+    
+    def test_budget_pauses_fetching(self):
+        """Test no more pages are in flight than the budget allows"""
+        page_bytes = estimate_page_bytes(self.pages[0])
+        fetched, in_flight = [0], []
+        
+        def pages():
+            for page in self.pages:
+                fetched[0] += 1
+                yield page
+        
+        def slow_load(data, table_name, **kwargs):
+            in_flight.append(fetched[0])
+            time.sleep(0.01)
+            return {'records_loaded': len(data)}
+        
+        self.extractor.iter_pages.return_value = pages()
+        loader = Mock(spec=DatabaseLoader)
+        loader.load.side_effect = slow_load
+        governor = MemoryGovernor(budget=int(page_bytes * 2.5))
+        
+        result = PipelineRunner(self.extractor, None, loader, queue_size=8, memory_budget=governor).run(
+            '/customers', 'customers'
+        )
+        
+        assert result['records_loaded'] == 2000
+        assert result['memory']['peak_bytes'] <= governor.budget
+        assert result['memory']['waits'] > 0
+        assert governor.in_flight == 0
+        # Without the budget the extractor would run up to 8 pages ahead
+        assert max(count - loaded for loaded, count in enumerate(in_flight)) <= 4
+    
+    def test_shared_governor_reports_each_runs_peak(self):
+        """Test a run reports its own peak, not the shared governor's lifetime peak"""
+        governor = MemoryGovernor(budget='64MB')
+        runner = PipelineRunner(self.extractor, None, self.loader, memory_budget=governor)
+        
+        self.extractor.iter_pages.return_value = iter(self.pages)
+        large = runner.run('/customers', 'customers')
+        self.extractor.iter_pages.return_value = iter([make_page(0, 5)])
+        small = runner.run('/customers', 'customers', load_mode='replace')
+        
+        assert small['memory']['peak_bytes'] == estimate_page_bytes(make_page(0, 5))
+        assert small['memory']['peak_bytes'] < large['memory']['peak_bytes']
+        assert governor.summary()['peak_bytes'] == large['memory']['peak_bytes']
+        assert small['memory']['budget_bytes'] == 64 * 2 ** 20
+    
+    def test_failed_run_releases_its_pages(self):
+        """Test a shared governor gets back the bytes of a failed run"""
+        def explode(record):
+            raise RuntimeError('bad record')
+        
+        self.extractor.iter_pages.return_value = iter(self.pages)
+        governor = MemoryGovernor(budget='10MB')
+        runner = PipelineRunner(self.extractor, ResponseTransformer(), self.loader, memory_budget=governor)
+        
+        with pytest.raises(RuntimeError):
+            runner.run('/customers', 'customers', custom_transforms=[explode])
+        
+        assert governor.in_flight == 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,131 @@
+"""
+Unit tests for the metrics registry and instrumentation
+"""
+
+import time
+import urllib.request
+import pytest
+from unittest.mock import Mock
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.utils.metrics import MetricsRegistry, default_registry
+
+
+def sample(name, **labels):
+    return default_registry.get_sample_value(name, labels) or 0
+
+
+class TestMetricsRegistry:
+    """Test cases for MetricsRegistry"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.registry = MetricsRegistry()
+    
+    def test_render_counter_and_gauge(self):
+        """Test counters and gauges in the text exposition format"""
+        requests_total = self.registry.counter('requests_total', 'Requests', ('method',))
+        requests_total.labels('GET').inc()
+        requests_total.labels('GET').inc(2)
+        self.registry.gauge('queue_depth', 'Queued items').set(4)
+        
+        text = self.registry.render()
+        
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{method="GET"} 3' in text
+        assert 'queue_depth 4' in text
+        assert self.registry.counter('requests_total', 'Requests', ('method',)) is requests_total
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        latency = self.registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+            
+        text = self.registry.render()
+        
+        assert 'latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'latency_seconds_bucket{le="1"} 3' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'latency_seconds_count 4' in text
+        assert self.registry.get_sample_value('latency_seconds_sum') == pytest.approx(3.65)
+    
+    def test_conflicting_registration(self):
+        """Test a name cannot be reused for another metric type"""
+        self.registry.counter('events_total', 'Events')
+        with pytest.raises(ValueError):
+            self.registry.gauge('events_total', 'Events')
+    
+    def test_textfile_and_http_exposition(self, tmp_path):
+        """Test metrics are exported to a textfile and over HTTP"""
+        self.registry.counter('events_total', 'Events').inc()
+        path = tmp_path / 'etl.prom'
+        self.registry.write_textfile(str(path))
+        assert 'events_total 1' in path.read_text()
+        
+        server = self.registry.serve(port=0)
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url) as response:
+                assert 'events_total 1' in response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+class TestInstrumentation:
+    """Test cases for component metrics"""
+    
+    def test_client_records_status_and_bytes(self, monkeypatch):
+        """Test BaseClient records requests, latency and response size"""
+        client = RESTClient("https://api.example.com")
+        response = Mock(status_code=200, _content=b'{"data": []}')
+        monkeypatch.setattr(client.session, 'get', Mock(return_value=response))
+        before_requests = sample('api_requests_total', method='GET', status='200')
+        before_bytes = sample('api_response_bytes_total', method='GET')
+        before_count = sample('api_request_duration_seconds_count', method='GET')
+        
+        client.get('/users')
+        
+        assert sample('api_requests_total', method='GET', status='200') == before_requests + 1
+        assert sample('api_response_bytes_total', method='GET') == before_bytes + 12
+        assert sample('api_request_duration_seconds_count', method='GET') == before_count + 1
+    
+    def test_stage_records(self):
+        """Test extract and load report records per stage"""
+        client = Mock(spec=RESTClient)
+        response = Mock()
+        response.json.return_value = [{'id': 1}, {'id': 2}]
+        client.get.return_value = response
+        before_extract = sample('pipeline_records_total', stage='extract')
+        before_load = sample('pipeline_records_total', stage='load')
+        before_batches = sample('load_batch_duration_seconds_count', table='items', mode='append')
+        
+        data = APIExtractor(client).extract('/items')
+        DatabaseLoader("sqlite://").load(data, 'items')
+        
+        assert sample('pipeline_records_total', stage='extract') == before_extract + 2
+        assert sample('pipeline_records_total', stage='load') == before_load + 2
+        assert sample('load_batch_duration_seconds_count', table='items', mode='append') == before_batches + 1
+    
+    def test_extract_time_covers_streamed_parsing(self):
+        """Test extract time includes parsing streamed records but not the consumer"""
+        def slow_records():
+            for i in range(2):
+                time.sleep(0.05)
+                yield {'id': i}
+        
+        extractor = APIExtractor(Mock(spec=RESTClient))
+        extractor._fetch = Mock(return_value=(slow_records(), None))
+        before = sample('pipeline_stage_seconds_total', stage='extract')
+        
+        for record in extractor.iter_records('/items'):
+            time.sleep(0.2)
+        
+        elapsed = sample('pipeline_stage_seconds_total', stage='extract') - before
+        assert 0.1 <= elapsed < 0.3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,135 @@
+"""
+Unit tests for PipelineRunner
+"""
+
+import time
+import pytest
+from unittest.mock import Mock
+from sqlalchemy import text
+from src.extractors.api_extractor import APIExtractor
+from src.transformers.response_transformer import ResponseTransformer
+from src.loaders.database_loader import DatabaseLoader
+from src.pipeline.profiler import StageProfiler
+from src.pipeline.runner import PipelineRunner
+from src.validators.schema_validator import SchemaValidator
+
+
+class TestPipelineRunner:
+    """Test cases for PipelineRunner"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures"""
+        self.extractor = Mock(spec=APIExtractor)
+        self.extractor.iter_pages.return_value = iter([
+            [{'customer_id': i, 'customer_name': f'c{i}'} for i in range(start, start + 10)]
+            for start in range(0, 50, 10)
+        ])
+        # A file database, since each thread gets its own in-memory one
+        self.loader = DatabaseLoader(f"sqlite:///{tmp_path / 'pipeline.db'}")
+    
+    def test_run_loads_all_pages(self):
+        """Test every extracted page is transformed and loaded"""
+        runner = PipelineRunner(
+            self.extractor,
+            ResponseTransformer(),
+            self.loader,
+            queue_size=2,
+            transform_workers=2,
+            load_workers=2
+        )
+        
+        result = runner.run(
+            '/customers',
+            'customers',
+            field_mapping={'customer_id': 'id', 'customer_name': 'name'},
+            load_mode='replace'
+        )
+        
+        assert result['pages'] == 5
+        assert result['records_loaded'] == 50
+        with self.loader._get_engine().connect() as conn:
+            ids = [row[0] for row in conn.execute(text("SELECT id FROM customers ORDER BY id"))]
+        assert ids == list(range(50))
+    
+    def test_run_stops_on_stage_error(self):
+        """Test a failing stage stops the pipeline and re-raises its error"""
+        def explode(record):
+            raise RuntimeError('bad record')
+            
+        runner = PipelineRunner(self.extractor, ResponseTransformer(), self.loader, queue_size=1)
+        
+        with pytest.raises(RuntimeError, match='bad record'):
+            runner.run('/customers', 'customers', custom_transforms=[explode])
+
+    
+    def test_upserts_load_in_page_order(self):
+        """Test upserted pages are loaded one at a time in fetch order"""
+        def slow_first_page(record):
+            if record['page'] == 0:
+                time.sleep(0.05)
+            return record
+            
+        loaded, active = [], [0]
+        
+        def load(page, table_name, **kwargs):
+            active[0] += 1
+            loaded.append((page[0]['page'], active[0]))
+            time.sleep(0.01)
+            active[0] -= 1
+            return {'records_loaded': len(page)}
+            
+        self.extractor.iter_pages.return_value = iter([[{'id': 1, 'page': i}] for i in range(6)])
+        loader = Mock(spec=DatabaseLoader)
+        loader.load.side_effect = load
+        runner = PipelineRunner(self.extractor, ResponseTransformer(), loader, transform_workers=3, load_workers=3)
+        
+        result = runner.run(
+            '/customers', 'customers', custom_transforms=[slow_first_page], load_mode='upsert', unique_key='id'
+        )
+        
+        assert result['records_loaded'] == 6
+        assert loaded == [(page, 1) for page in range(6)]
+    
+    def test_validator_drops_invalid_records(self):
+        """Test pages are validated before transform and rejects are not loaded"""
+        validator = SchemaValidator({'customer_id': {'type': 'int', 'max': 24}})
+        runner = PipelineRunner(self.extractor, ResponseTransformer(), self.loader, validator=validator)
+        
+        result = runner.run('/customers', 'customers', load_mode='replace')
+        
+        assert result['records_rejected'] == 25
+        assert result['records_loaded'] == 25
+        assert validator.stats == {'validated': 50, 'valid': 25, 'invalid': 25}
+        with self.loader._get_engine().connect() as conn:
+            assert conn.execute(text("SELECT MAX(customer_id) FROM customers")).scalar() == 24
+    
+    def test_profile_report(self, tmp_path):
+        """Test a profiled run records every stage and writes a report"""
+        profiler = StageProfiler(cprofile=True, trace_memory=True, output_dir=str(tmp_path / 'profiles'))
+        runner = PipelineRunner(self.extractor, ResponseTransformer(), self.loader, profile=profiler)
+        
+        result = runner.run('/customers', 'customers')
+        
+        stages = result['profile']['stages']
+        assert set(stages) == {'extract', 'transform', 'load'}
+        assert stages['load']['calls'] == 5
+        assert sum(totals['share'] for totals in stages.values()) == pytest.approx(1.0)
+        report = (tmp_path / 'profiles').glob('profile-customers-customers-*.txt')
+        text_report = next(report).read_text()
+        assert 'Top functions:' in text_report
+        assert 'Top allocations:' in text_report
+    
+    def test_profile_from_env(self, tmp_path, monkeypatch):
+        """Test profiling is enabled by environment variable"""
+        monkeypatch.setenv('API_PROFILE', '1')
+        monkeypatch.setenv('API_PROFILE_DIR', str(tmp_path / 'profiles'))
+        
+        result = PipelineRunner(self.extractor, None, self.loader).run('/customers', 'customers')
+        
+        assert result['profile']['stages']['extract']['calls'] == 6
+        assert len(list((tmp_path / 'profiles').iterdir())) == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
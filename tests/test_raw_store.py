@@ -0,0 +1,136 @@
+"""
+Unit tests for the raw response store and replay
+"""
+
+import gzip
+import sys
+from datetime import datetime, timedelta, timezone
+import pytest
+from unittest.mock import Mock
+from sqlalchemy import text
+from benchmarks.mock_api import MockAPIServer
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+from src.extractors.raw_store import RawPage, RawResponseStore
+from src.extractors.replay_extractor import ReplayExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.pipeline.runner import PipelineRunner
+from src.transformers.response_transformer import ResponseTransformer
+
+
+def make_page(endpoint, body, params=None, content_type='application/json', fetched_at=None):
+    return RawPage(
+        endpoint=endpoint,
+        params=params or {},
+        fetched_at=fetched_at or datetime.now(timezone.utc),
+        status=200,
+        content_type=content_type,
+        url=None,
+        body=body
+    )
+
+
+class TestRawResponseStore:
+    """Test cases for RawResponseStore"""
+    
+    def test_capture_and_replay(self, tmp_path):
+        """Test captured pages replay in order and parse like the originals"""
+        with MockAPIServer(records=250) as server:
+            store = RawResponseStore(str(tmp_path / 'raw'))
+            client = RESTClient(server.base_url, log_every=0)
+            extracted = APIExtractor(client, raw_store=store).extract('records', pagination=True, page_size=100)
+        
+        replayed = ReplayExtractor(store).extract('records', pagination=True)
+        store.close()
+        
+        assert replayed == extracted
+        assert [entry['params']['page'] for entry in store.index('records')] == [1, 2, 3]
+        segments = list((tmp_path / 'raw' / 'records').glob('*.jsonl.gz'))
+        assert len(segments) == 1
+        with gzip.open(segments[0]) as f:
+            assert len(f.readlines()) == 3
+    
+    def test_replay_does_not_use_the_network(self, tmp_path):
+        """Test a replay extractor has no client to call"""
+        with RawResponseStore(str(tmp_path)) as store:
+            store.write(make_page('orders', b'{"data": [{"id": 1}]}'))
+        
+        extractor = ReplayExtractor(store)
+        
+        assert extractor.client is None
+        assert extractor.extract('orders', pagination=True) == [{'id': 1}]
+        assert extractor.extract_single('orders') == {'data': [{'id': 1}]}
+    
+    def test_index_filters(self, tmp_path):
+        """Test pages are selected by endpoint, params and time"""
+        old = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        store = RawResponseStore(str(tmp_path))
+        store.write(make_page('orders', b'[1]', {'status': 'open', 'page': 1}, fetched_at=old))
+        store.write(make_page('orders', b'[2]', {'status': 'closed', 'page': 1}))
+        store.write(make_page('users', b'[3]'))
+        
+        assert [page.body for page in store.pages('orders')] == [b'[1]', b'[2]']
+        assert [page.body for page in store.pages('orders', params={'status': 'open', 'page': 9})] == [b'[1]']
+        assert [page.body for page in store.pages(since=old + timedelta(days=1))] == [b'[2]', b'[3]']
+        assert [page.body for page in store.pages(until=datetime(2024, 1, 2))] == [b'[1]']
+    
+    def test_segments_roll_over(self, tmp_path):
+        """Test a new segment starts past segment_bytes and replay spans them"""
+        with RawResponseStore(str(tmp_path), segment_bytes=200) as store:
+            for i in range(5):
+                store.write(make_page('orders', b'[%d, "%s"]' % (i, b'x' * 100)))
+        
+        assert len(list((tmp_path / 'orders').iterdir())) == 5
+        assert [page.body[:2] for page in store.pages('orders')] == [b'[0', b'[1', b'[2', b'[3', b'[4']
+    
+    def test_xml_csv_and_binary_bodies(self, tmp_path):
+        """Test non-JSON and non-UTF-8 bodies survive the round trip"""
+        with RawResponseStore(str(tmp_path)) as store:
+            store.write(make_page('xml', b'<rows><row id="1"/></rows>', content_type='application/xml'))
+            store.write(make_page('csv', b'id,name\n1,Ann\n', content_type='text/csv'))
+            store.write(make_page('bin', b'\xff\x00\xfe', content_type='application/octet-stream'))
+        
+        extractor = ReplayExtractor(store)
+        assert extractor.extract('xml', pagination=True) == [{'id': '1'}]
+        assert extractor.extract('csv', pagination=True) == [{'id': '1', 'name': 'Ann'}]
+        assert next(store.pages('bin')).body == b'\xff\x00\xfe'
+    
+    def test_capture_closes_the_response(self, tmp_path):
+        """Test capturing downloads the body and releases the connection"""
+        response = Mock(content=b'[{"id": 1}]', status_code=200, url='http://api/x')
+        response.headers = {'Content-Type': 'application/json'}
+        
+        with RawResponseStore(str(tmp_path)) as store:
+            replayed = store.capture('x', {'page': 1}, response)
+        
+        response.close.assert_called_once()
+        assert replayed.json() == [{'id': 1}]
+    
+    def test_zstd_requires_zstandard(self, tmp_path, monkeypatch):
+        """Test zstd compression fails early without zstandard installed"""
+        monkeypatch.setitem(sys.modules, 'zstandard', None)
+        
+        with pytest.raises(ImportError):
+            RawResponseStore(str(tmp_path), compression='zstd')
+    
+    def test_replay_through_pipeline(self, tmp_path):
+        """Test a replayed capture loads through the pipeline like a live run"""
+        with MockAPIServer(records=120) as server:
+            with RawResponseStore(str(tmp_path / 'raw')) as store:
+                client = RESTClient(server.base_url, log_every=0)
+                APIExtractor(client, raw_store=store).extract('records', pagination=True, page_size=50)
+            requests_served = server.requests_served
+            
+            loader = DatabaseLoader(f"sqlite:///{tmp_path / 'replay.db'}")
+            result = PipelineRunner(ReplayExtractor(store), ResponseTransformer(), loader).run(
+                'records', 'customers', field_mapping={'id': 'id', 'name': 'name'}
+            )
+            assert server.requests_served == requests_served
+        
+        assert result['records_loaded'] == 120
+        with loader._get_engine().connect() as conn:
+            assert conn.execute(text("SELECT COUNT(DISTINCT id) FROM customers")).scalar() == 120
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,113 @@
+"""
+Unit tests for RecordBuffer
+"""
+
+import random
+import pytest
+from operator import itemgetter
+from benchmarks.mock_api import MockAPIServer
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+from src.loaders.database_loader import DatabaseLoader
+from src.utils.record_buffer import RecordBuffer
+from src.utils.records import RecordBatch
+
+
+def make_records(count, seed=0):
+    rng = random.Random(seed)
+    return [{'id': rng.randrange(count // 3), 'seq': i, 'name': f'name-{i}'} for i in range(count)]
+
+
+class TestRecordBuffer:
+    """Test cases for RecordBuffer"""
+    
+    def test_stays_in_memory_under_limit(self):
+        """Test small inputs never touch disk"""
+        records = make_records(100)
+        buffer = RecordBuffer.from_records(records)
+        
+        assert buffer.spilled_records == 0
+        assert buffer.bytes_on_disk == 0
+        assert list(buffer) == records
+    
+    def test_spills_and_reads_back(self, tmp_path):
+        """Test records past the limit are spilled and read back in order"""
+        records = make_records(5000)
+        buffer = RecordBuffer.from_records(records, memory_limit=20000, chunk_records=300, spill_dir=str(tmp_path))
+        
+        assert len(buffer) == 5000
+        assert buffer.spilled_records > 4000
+        assert buffer.stats()['chunks'] > 10
+        assert list(buffer) == records
+        assert [buffer[i] for i in (0, 299, 300, 2501, 4999, -1)] == [
+            records[i] for i in (0, 299, 300, 2501, 4999, -1)
+        ]
+        with pytest.raises(IndexError):
+            buffer[5000]
+    
+    def test_close_deletes_spilled_records(self):
+        """Test close drops the spill file"""
+        with RecordBuffer.from_records(make_records(2000), memory_limit=1000) as buffer:
+            assert buffer.bytes_on_disk > 0
+        
+        assert len(buffer) == 0
+        assert buffer.bytes_on_disk == 0
+    
+    @pytest.mark.parametrize('reverse', [False, True])
+    def test_external_sort(self, reverse):
+        """Test sorting across spilled runs matches a stable in-memory sort"""
+        records = make_records(6000)
+        buffer = RecordBuffer.from_records(records, memory_limit=30000, chunk_records=500)
+        
+        result = buffer.sort(key=itemgetter('id'), reverse=reverse)
+        
+        assert list(result) == sorted(records, key=itemgetter('id'), reverse=reverse)
+    
+    @pytest.mark.parametrize('keep', ['first', 'last'])
+    def test_dedupe(self, keep):
+        """Test one record is kept per key, ordered by key"""
+        records = make_records(6000)
+        buffer = RecordBuffer.from_records(records, memory_limit=30000, chunk_records=500)
+        
+        expected = {}
+        for record in records:
+            if keep == 'last' or record['id'] not in expected:
+                expected[record['id']] = record
+        
+        result = buffer.dedupe(itemgetter('id'), keep=keep)
+        
+        assert list(result) == [expected[key] for key in sorted(expected)]
+    
+    def test_record_views_are_stored_as_dicts(self):
+        """Test rows of a RecordBatch are stored as plain dicts"""
+        batch = RecordBatch.from_records([{'id': 1}, {'id': 2}])
+        buffer = RecordBuffer.from_records(batch, memory_limit=0)
+        
+        assert list(buffer) == [{'id': 1}, {'id': 2}]
+    
+    def test_extract_with_memory_limit(self, tmp_path):
+        """Test extraction into a spilling buffer that streams into the loader"""
+        with MockAPIServer(records=3000) as server:
+            client = RESTClient(server.base_url, log_every=0)
+            buffer = APIExtractor(client).extract(
+                'records', pagination=True, page_size=500, memory_limit=50000
+            )
+        
+        assert isinstance(buffer, RecordBuffer)
+        assert buffer.spilled_records > 0
+        assert buffer[2999]['id'] == 2999
+        
+        loader = DatabaseLoader(f"sqlite:///{tmp_path / 'buffer.db'}")
+        result = loader.load_stream(buffer.dedupe(itemgetter('id')), 'customers')
+        assert result['records_loaded'] == 3000
+    
+    def test_extract_rejects_compact_with_memory_limit(self):
+        """Test compact and memory_limit cannot be combined"""
+        extractor = APIExtractor(RESTClient('http://localhost', log_every=0))
+        
+        with pytest.raises(ValueError):
+            extractor.extract('records', compact=True, memory_limit=1000)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,244 @@
+"""
+Unit tests for compact records
+"""
+
+import pickle
+import tracemalloc
+import pytest
+from sqlalchemy import text
+from benchmarks.mock_api import MockAPIServer, make_record, timestamp_of
+from src.clients.rest_client import RESTClient
+from src.extractors.api_extractor import APIExtractor
+from src.extractors.incremental_extractor import IncrementalExtractor
+from src.loaders.database_loader import DatabaseLoader, _iter_batches, _partition
+from src.pipeline.runner import PipelineRunner
+from src.transformers.response_transformer import ResponseTransformer
+from src.utils.records import RecordBatch, RecordSchema, RecordView
+
+
+def add_total(record):
+    record['total'] = record['amount'] * 2
+    return record
+
+
+class TestRecordBatch:
+    """Test cases for RecordBatch and RecordView"""
+    
+    def test_from_records_unions_fields(self):
+        """Test new keys extend the schema and absent fields read as None"""
+        batch = RecordBatch.from_records([{'a': 1, 'b': 2}, {'b': 3, 'c': 4}])
+        
+        assert batch.schema.fields == ('a', 'b', 'c')
+        assert batch.rows == [(1, 2, None), (None, 3, 4)]
+        assert batch.to_dicts()[1] == {'a': None, 'b': 3, 'c': 4}
+        assert batch.column('c') == [None, 4]
+    
+    def test_view_writes_do_not_change_batch(self):
+        """Test a view copies its row on write"""
+        batch = RecordBatch.from_records([{'a': 1, 'b': 2}])
+        view = batch[0]
+        view['a'] = 10
+        view['new'] = 'x'
+        del view['b']
+        
+        assert batch.rows == [(1, 2)]
+        assert view.to_dict() == {'a': 10, 'new': 'x'}
+        assert dict(view) == {'a': 10, 'new': 'x'}
+        assert view.get('b', 'gone') == 'gone'
+        
+        batch.append(view)
+        assert batch.schema.fields == ('a', 'b', 'new')
+        assert batch.rows[-1] == (10, None, 'x')
+    
+    def test_project_matches_field_mapping(self):
+        """Test project renames fields and fills missing ones with None"""
+        batch = RecordBatch.from_records([{'id': 1, 'name': 'Ann'}])
+        projected = batch.project({'name': 'customer_name', 'id': 'customer_id', 'email': 'email'})
+        
+        assert projected.to_dicts() == [{'customer_name': 'Ann', 'customer_id': 1, 'email': None}]
+    
+    def test_concat_and_slices(self):
+        """Test batches with different schemas concatenate into their union"""
+        first = RecordBatch.from_records([{'a': 1}])
+        second = RecordBatch.from_records([{'b': 2, 'a': 3}])
+        combined = RecordBatch.concat([first, second])
+        
+        assert combined.schema == RecordSchema(['a', 'b'])
+        assert combined.rows == [(1, None), (3, 2)]
+        assert combined[1:].rows == [(3, 2)]
+        assert isinstance(combined[0], RecordView)
+        assert pickle.loads(pickle.dumps(combined)).rows == combined.rows
+    
+    def test_uses_less_memory_than_dicts(self):
+        """Test a batch takes well under half the memory of the same dicts"""
+        def allocated(build):
+            tracemalloc.start()
+            try:
+                value = build()
+                return tracemalloc.get_traced_memory()[0], value
+            finally:
+                tracemalloc.stop()
+        
+        source = [make_record(i) for i in range(2000)]
+        for record in source:
+            del record['address']
+        dict_bytes, _ = allocated(lambda: [dict(record) for record in source])
+        batch_bytes, _ = allocated(lambda: RecordBatch.from_records(source))
+        
+        assert batch_bytes < dict_bytes / 2
+
+
+class TestCompactPipeline:
+    """Test cases for RecordBatch support in the pipeline components"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        """Set up test fixtures"""
+        # A file database, so the pipeline's load threads see the same tables
+        self.loader = DatabaseLoader(f"sqlite:///{tmp_path / 'records.db'}")
+        with MockAPIServer(records=120) as self.server:
+            self.client = RESTClient(self.server.base_url, log_every=0)
+            yield
+    
+    def fetch(self, sql):
+        with self.loader._get_engine().connect() as conn:
+            return [tuple(row) for row in conn.execute(text(sql))]
+    
+    def test_extract_compact(self):
+        """Test the extractor returns a batch of every record"""
+        batch = APIExtractor(self.client).extract('records', pagination=True, page_size=50, compact=True)
+        
+        assert isinstance(batch, RecordBatch)
+        assert batch.column('id') == list(range(120))
+        assert batch[5]['address'] == make_record(5)['address']
+    
+    def test_pages_share_schema(self):
+        """Test compact pages reuse the schema of the page before"""
+        pages = list(APIExtractor(self.client).iter_pages('records', pagination=True, page_size=50, compact=True))
+        
+        assert [len(page) for page in pages] == [50, 50, 20]
+        assert pages[0].schema is pages[2].schema
+    
+    def test_incremental_compact(self, tmp_path):
+        """Test incremental filtering keeps the batch compact"""
+        state_file = tmp_path / 'last_sync.json'
+        state_file.write_text('{"last_sync": "%s"}' % timestamp_of(99).isoformat())
+        extractor = IncrementalExtractor(self.client, last_sync_file=str(state_file))
+        
+        batch = extractor.extract_incremental('records', compact=True)
+        
+        assert isinstance(batch, RecordBatch)
+        assert batch.column('id') == list(range(100, 120))
+    
+    def test_transform_compact(self):
+        """Test field mapping and custom transforms run on a batch"""
+        batch = RecordBatch.from_records([make_record(i) for i in range(3)])
+        transformed = ResponseTransformer().transform(
+            batch,
+            field_mapping={'id': 'customer_id', 'amount': 'amount'},
+            custom_transforms=[add_total]
+        )
+        
+        assert isinstance(transformed, RecordBatch)
+        assert transformed.schema.fields == ('customer_id', 'amount', 'total')
+        assert transformed.column('total') == [0.0, 2.5, 5.0]
+    
+    def test_transform_compact_parallel(self):
+        """Test a batch is split across worker processes and joined again"""
+        batch = RecordBatch.from_records([make_record(i) for i in range(40)])
+        transformed = ResponseTransformer().transform(
+            batch, custom_transforms=[add_total], parallel=2, batch_size=10, min_parallel_records=0
+        )
+        
+        assert isinstance(transformed, RecordBatch)
+        assert transformed.column('id') == list(range(40))
+    
+    def test_flatten_and_normalize_dates_compact(self):
+        """Test the built-in helpers return new batches"""
+        transformer = ResponseTransformer()
+        batch = transformer.flatten_nested(RecordBatch.from_records([make_record(1)]))
+        batch = transformer.normalize_dates(batch, ['updated_at'])
+        
+        assert isinstance(batch, RecordBatch)
+        assert batch[0]['address_city'] == make_record(1)['address']['city']
+        assert batch[0]['updated_at'] == timestamp_of(1).isoformat()
+    
+    @pytest.mark.parametrize('append_method', ['bulk', 'to_sql'])
+    def test_load_compact(self, append_method):
+        """Test a batch loads like the same list of dicts"""
+        batch = RecordBatch.from_records([{'id': 1, 'name': 'Ann'}, {'id': 2, 'email': 'bob@x.com'}])
+        result = self.loader.load(batch, 'people', append_method=append_method)
+        
+        assert result['records_loaded'] == 2
+        assert self.fetch("SELECT id, name, email FROM people ORDER BY id") == [
+            (1, 'Ann', None), (2, None, 'bob@x.com')
+        ]
+    
+    def test_upsert_and_parallel_compact(self):
+        """Test upserts and partitioned loads accept batches"""
+        with self.loader._get_engine().begin() as conn:
+            conn.execute(text("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT)"))
+        self.loader.load(RecordBatch.from_records([{'id': 1, 'name': 'Ann'}]), 'people')
+        
+        batch = RecordBatch.from_records([{'id': 1, 'name': 'Anna'}, {'id': 2, 'name': 'Bob'}])
+        self.loader.load(batch, 'people', load_mode='upsert', unique_key='id', upsert_strategy='merge')
+        self.loader.load_parallel(
+            RecordBatch.from_records([{'id': 3, 'name': 'Cat'}, {'id': 4, 'name': 'Dan'}]),
+            'people', load_mode='upsert', unique_key='id', workers=1, partitions=2
+        )
+        
+        assert self.fetch("SELECT id, name FROM people ORDER BY id") == [
+            (1, 'Anna'), (2, 'Bob'), (3, 'Cat'), (4, 'Dan')
+        ]
+    
+    def test_dropped_field_is_not_upserted(self):
+        """Test a field deleted by a transform keeps its stored value on upsert"""
+        with self.loader._get_engine().begin() as conn:
+            conn.execute(text("CREATE TABLE people (id INTEGER PRIMARY KEY, name TEXT, email TEXT)"))
+            conn.execute(text("INSERT INTO people VALUES (1, 'a', 'keep@x')"))
+        
+        def drop_email(record):
+            del record['email']
+            return record
+        
+        batch = RecordBatch.from_records([{'id': 1, 'name': 'b', 'email': None}])
+        transformed = ResponseTransformer().transform(batch, custom_transforms=[drop_email])
+        self.loader.load(transformed, 'people', load_mode='upsert', unique_key='id')
+        
+        assert transformed.schema.fields == ('id', 'name')
+        assert self.fetch("SELECT id, name, email FROM people") == [(1, 'b', 'keep@x')]
+    
+    def test_partition_batch(self):
+        """Test hash and range partitions of a batch are batches"""
+        batch = RecordBatch.from_records([{'id': i} for i in (5, 3, 9, 1)])
+        by_range = _partition(batch, 2, 'range', ['id'])
+        by_hash = _partition(batch, 2, 'hash', ['id'])
+        
+        assert [part.column('id') for part in by_range] == [[1, 3], [5, 9]]
+        assert all(isinstance(part, RecordBatch) for part in by_hash)
+        assert sorted(sum((part.column('id') for part in by_hash), [])) == [1, 3, 5, 9]
+    
+    def test_iter_batches_regroups_batches(self):
+        """Test streamed batches are regrouped without becoming dicts"""
+        pages = [RecordBatch.from_records([{'id': i} for i in range(start, start + 3)]) for start in (0, 3, 6)]
+        batches = list(_iter_batches(pages, 4))
+        
+        assert all(isinstance(batch, RecordBatch) for batch in batches)
+        assert [batch.column('id') for batch in batches] == [[0, 1, 2, 3], [4, 5, 6, 7], [8]]
+    
+    def test_pipeline_compact(self):
+        """Test a compact pipeline run loads every record"""
+        result = PipelineRunner(APIExtractor(self.client), ResponseTransformer(), self.loader).run(
+            'records',
+            'customers',
+            page_size=50,
+            field_mapping={'id': 'id', 'name': 'name'},
+            compact=True
+        )
+        
+        assert result['records_loaded'] == 120
+        assert self.fetch("SELECT COUNT(*), MAX(name) FROM customers") == [(120, 'customer-99')]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
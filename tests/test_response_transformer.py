@@ -0,0 +1,68 @@
+"""
+Unit tests for ResponseTransformer
+"""
+
+import pytest
+from src.transformers.response_transformer import ResponseTransformer
+
+
+def add_total(record):
+    record['total'] = record['price'] * record['qty']
+    return record
+
+
+ResponseTransformer.register_transform('upper_name', lambda r: {**r, 'name': r['name'].upper()})
+
+
+class TestResponseTransformer:
+    """Test cases for ResponseTransformer"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.transformer = ResponseTransformer()
+        self.data = [
+            {'id': i, 'name': f'item{i}', 'price': i, 'qty': 2}
+            for i in range(100)
+        ]
+    
+    def test_transform_field_mapping(self):
+        """Test field mapping fills missing fields with None"""
+        result = self.transformer.transform(
+            [{'customer_id': 1}],
+            field_mapping={'customer_id': 'id', 'customer_name': 'name'}
+        )
+        
+        assert result == [{'id': 1, 'name': None}]
+    
+    def test_transform_parallel_keeps_order(self):
+        """Test parallel transform matches in-process output and order"""
+        expected = self.transformer.transform(
+            [dict(r) for r in self.data],
+            custom_transforms=[add_total, 'upper_name']
+        )
+        
+        result = self.transformer.transform(
+            [dict(r) for r in self.data],
+            custom_transforms=[add_total, 'upper_name'],
+            parallel=2,
+            batch_size=10,
+            min_parallel_records=0
+        )
+        
+        assert result == expected
+        assert result[99] == {'id': 99, 'name': 'ITEM99', 'price': 99, 'qty': 2, 'total': 198}
+    
+    def test_transform_parallel_rejects_unpicklable(self):
+        """Test unpicklable transforms are reported before starting workers"""
+        with pytest.raises(ValueError, match='register_transform'):
+            self.transformer.transform(
+                self.data,
+                custom_transforms=[lambda r: r],
+                parallel=2,
+                batch_size=10,
+                min_parallel_records=0
+            )
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -2,11 +2,41 @@
 Unit tests for RESTClient
 """
 
+import threading
 import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import Mock, patch
 from src.clients.rest_client import RESTClient
 
 
+class FlakyHandler(BaseHTTPRequestHandler):
+    """Answers 503 to the first request and JSON afterwards"""
+    
+    requests_seen = 0
+    
+    def do_GET(self):
+        FlakyHandler.requests_seen += 1
+        status, body = (503, b'') if FlakyHandler.requests_seen == 1 else (200, b'{"data": [1, 2]}')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def flaky_server():
+    FlakyHandler.requests_seen = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FlakyHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
 class TestRESTClient:
     """Test cases for RESTClient"""
     
@@ -42,6 +72,44 @@ class TestRESTClient:
         assert result == {"data": "test"}
         mock_get.assert_called_once()
 
+    
+    def test_request_hooks(self, flaky_server):
+        """Test hooks see retries, timings and response size"""
+        client = RESTClient(flaky_server)
+        client.session.adapters['http://'].max_retries.backoff_factor = 0
+        events = []
+        client.add_hook('before_request', lambda e: events.append(('before', e.method)))
+        client.add_hook('on_retry', lambda e: events.append(('retry', e.retry_reason)))
+        client.add_hook('after_response', lambda e: events.append(('after', e)))
+        
+        response = client.get('/items')
+        
+        assert response.json() == {"data": [1, 2]}
+        assert events[:2] == [('before', 'GET'), ('retry', 'status 503')]
+        event = events[2][1]
+        assert event.status_code == 200
+        assert event.retries == 1
+        assert event.response_size == 16
+        assert event.timing.connect > 0
+        assert 0 < event.timing.ttfb <= event.timing.total
+        assert event.timing.download is not None
+    
+    def test_error_hook(self):
+        """Test on_error hooks receive the failure"""
+        client = RESTClient("http://127.0.0.1:9", max_retries=0)
+        errors = []
+        client.add_hook('on_error', lambda e: errors.append(e.error))
+        
+        with pytest.raises(Exception):
+            client.get('/items')
+            
+        assert len(errors) == 1
+    
+    def test_unknown_hook(self):
+        """Test registering an unknown hook event fails"""
+        with pytest.raises(ValueError):
+            self.client.add_hook('on_success', print)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,98 @@
+"""
+Unit tests for SchemaValidator
+"""
+
+import json
+import pytest
+from src.loaders.dead_letter import JSONLDeadLetterSink
+from src.utils.error_handler import ErrorHandler
+from src.utils.records import RecordBatch
+from src.validators.schema_validator import SchemaValidator, ValidationError
+
+
+class TestSchemaValidator:
+    """Test cases for SchemaValidator"""
+    
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.schema = {
+            'id': {'type': 'int', 'required': True},
+            'status': {'enum': ['active', 'inactive']},
+            'amount': {'type': 'number', 'min': 0, 'max': 100}
+        }
+        self.data = [
+            {'id': 1, 'status': 'active', 'amount': 10},
+            {'id': '2', 'status': 'active', 'amount': 10},
+            {'status': 'deleted', 'amount': -1},
+            {'id': 4, 'status': None, 'amount': 99.5}
+        ]
+    
+    def test_validate_collects_rejects(self):
+        """Test invalid records are routed to the reject list"""
+        validator = SchemaValidator(self.schema)
+        
+        result = validator.validate(self.data)
+        
+        assert [r['id'] for r in result] == [1, 4]
+        assert len(validator.rejected) == 2
+        assert len(validator.rejected[1]['errors']) == 3
+        assert validator.stats == {'validated': 4, 'valid': 2, 'invalid': 2}
+    
+    def test_validate_reject_file(self, tmp_path):
+        """Test invalid records are written to a JSONL reject sink"""
+        sink = tmp_path / 'rejects.jsonl'
+        validator = SchemaValidator(self.schema, reject_sink=str(sink))
+        
+        validator.validate(self.data)
+        
+        lines = [json.loads(line) for line in sink.read_text().splitlines()]
+        assert [line['record'].get('id') for line in lines] == ['2', None]
+    
+    def test_validate_fail_fast(self):
+        """Test fail_fast mode raises on the first invalid record"""
+        validator = SchemaValidator(self.schema, mode='fail_fast')
+        
+        with pytest.raises(ValidationError) as exc_info:
+            validator.validate(self.data)
+            
+        assert exc_info.value.record['id'] == '2'
+    
+    def test_validate_record_batch(self):
+        """Test compact batches are validated row by row and stay compact"""
+        validator = SchemaValidator(self.schema)
+        
+        result = validator.validate(RecordBatch.from_records(self.data))
+        
+        assert isinstance(result, RecordBatch)
+        assert result.column('id') == [1, 4]
+        assert validator.rejected[0]['record'] == {'id': '2', 'status': 'active', 'amount': 10}
+    
+    def test_reject_to_dead_letter_and_error_handler(self, tmp_path):
+        """Test rejects can go to a DeadLetterSink or an ErrorHandler"""
+        SchemaValidator(self.schema, reject_sink=JSONLDeadLetterSink(str(tmp_path / 'dead.jsonl'))).validate(
+            self.data, source='/orders'
+        )
+        handler = ErrorHandler()
+        SchemaValidator(self.schema, reject_sink=handler).validate(self.data, source='/orders')
+        
+        dead = [json.loads(line) for line in (tmp_path / 'dead.jsonl').read_text().splitlines()]
+        assert [(entry['table'], entry['record'].get('id')) for entry in dead] == [('/orders', '2'), ('/orders', None)]
+        assert 'id: expected int' in dead[0]['error']
+        assert handler.get_error_summary()['error_types'] == {'ValidationError': 2}
+        assert handler.get_error_summary()['errors_by_endpoint'] == {'/orders': 2}
+    
+    def test_infer_schema(self):
+        """Test schema inference from sample records"""
+        schema = SchemaValidator.infer_schema([
+            {'id': 1, 'price': 1.5, 'created': '2024-01-01T00:00:00Z', 'note': None},
+            {'id': 2, 'price': 2, 'created': '2024-01-02T00:00:00Z'}
+        ])
+        
+        assert schema['id'] == {'type': 'int', 'required': True, 'nullable': False}
+        assert schema['price']['type'] == 'number'
+        assert schema['created']['type'] == 'datetime'
+        assert schema['note']['required'] is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
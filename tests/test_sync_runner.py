@@ -0,0 +1,183 @@
+"""
+Unit tests for SyncRunner and the sync configuration
+"""
+
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from sqlalchemy import text
+from src.loaders.database_loader import DatabaseLoader
+from src.pipeline.config import build_jobs, expand_env
+from src.pipeline.sync import SyncRunner
+from src.validators.schema_validator import SchemaValidator
+
+RECORDS = {
+    '/a/customers': [{'customer_id': 1, 'updated_at': '2024-01-01T00:00:00'}],
+    '/a/orders': [{'id': 10, 'updated_at': '2024-01-02T00:00:00'}, {'id': 11, 'updated_at': '2024-01-03T00:00:00'}],
+    '/b/users': [{'id': 5, 'updated_at': '2024-01-01T00:00:00'}]
+}
+
+
+class APIHandler(BaseHTTPRequestHandler):
+    """Serves RECORDS as one JSON page per path"""
+    
+    seen = []
+    
+    def do_GET(self):
+        path, _, query = self.path.partition('?')
+        APIHandler.seen.append((path, query, self.headers.get('X-API-Key')))
+        if path not in RECORDS:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = json.dumps({'data': RECORDS[path], 'has_more': False}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        pass
+
+
+class TestSyncRunner:
+    """Test cases for SyncRunner"""
+    
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        """Set up test fixtures"""
+        APIHandler.seen = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), APIHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        monkeypatch.setenv('TEST_API_KEY', 'secret')
+        self.config = {
+            'apis': {
+                'a': {
+                    'base_url': base_url,
+                    'authentication': {'type': 'api_key', 'header': 'X-API-Key', 'value': '${TEST_API_KEY}'},
+                    'rate_limit': {'requests_per_second': 100},
+                    'retry': {'max_retries': 0},
+                    'endpoints': {
+                        'customers': {'path': '/a/customers', 'field_mapping': {'customer_id': 'id'}},
+                        'orders': {'path': '/a/orders', 'priority': 5, 'incremental': True}
+                    }
+                },
+                'b': {
+                    'base_url': base_url,
+                    'priority': 1,
+                    'retry': {'max_retries': 0},
+                    'endpoints': {'users': '/b/users', 'missing': '/b/missing'}
+                }
+            },
+            'extraction': {'default_pagination': False, 'timestamp_field': 'updated_at'},
+            'loading': {'database': {'load_mode': 'upsert', 'unique_key': 'id'}}
+        }
+        self.loader = DatabaseLoader(f"sqlite:///{tmp_path / 'sync.db'}")
+        with self.loader._get_engine().begin() as conn:
+            for table in ('a_customers', 'a_orders', 'b_users'):
+                conn.execute(text(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, updated_at TEXT)"))
+        yield
+        server.shutdown()
+        server.server_close()
+    
+    def table_ids(self, table):
+        with self.loader._get_engine().connect() as conn:
+            return [row[0] for row in conn.execute(text(f"SELECT id FROM {table} ORDER BY id"))]
+    
+    def test_jobs_are_ordered_by_priority(self):
+        """Test endpoint priority, then API priority, then config order"""
+        jobs = build_jobs(self.config)
+        assert [(job.api, job.name) for job in jobs] == [
+            ('a', 'orders'), ('b', 'users'), ('b', 'missing'), ('a', 'customers')
+        ]
+        assert jobs[-1].table == 'a_customers'
+    
+    def test_global_field_mappings_are_per_endpoint(self):
+        """Test transformation.field_mappings only applies to the endpoint it names"""
+        self.config['transformation'] = {'field_mappings': {
+            'customer_id': 'id',
+            'users': {'id': 'id'},
+            'a.orders': {'id': 'id', 'updated_at': 'updated_at'}
+        }}
+        mappings = {job.name: job.field_mapping for job in build_jobs(self.config)}
+        
+        assert mappings['users'] == {'id': 'id'}
+        assert mappings['orders'] == {'id': 'id', 'updated_at': 'updated_at'}
+        assert mappings['customers'] == {'customer_id': 'id'}
+        assert mappings['missing'] is None
+    
+    def test_run_syncs_every_endpoint(self):
+        """Test all endpoints are synced and a failing one is reported"""
+        result = SyncRunner(self.config, max_workers=1, loader=self.loader).run()
+        
+        statuses = {job['endpoint']: job['status'] for job in result['jobs']}
+        assert statuses == {'orders': 'success', 'users': 'success', 'missing': 'failed', 'customers': 'success'}
+        assert result['failed'] == 1
+        assert self.table_ids('a_customers') == [1]
+        assert self.table_ids('a_orders') == [10, 11]
+        assert self.table_ids('b_users') == [5]
+        assert [path for path, _, _ in APIHandler.seen] == ['/a/orders', '/b/users', '/b/missing', '/a/customers']
+        assert {key for path, _, key in APIHandler.seen if path.startswith('/a/')} == {'secret'}
+    
+    def test_concurrent_endpoints_share_a_sqlite_file(self):
+        """Test endpoints loading into one SQLite file at once wait for each other"""
+        get_table = self.loader._get_table
+        reading = threading.Barrier(3)
+        
+        def get_table_together(conn, table_name):
+            # Every load reads its table inside its transaction, then waits
+            # for the others, so all three would try to write at once
+            table = get_table(conn, table_name)
+            try:
+                reading.wait(timeout=0.5)
+            except threading.BrokenBarrierError:
+                pass
+            return table
+            
+        self.loader._get_table = get_table_together
+        result = SyncRunner(self.config, max_workers=4, loader=self.loader).run()
+        
+        statuses = {job['endpoint']: job['status'] for job in result['jobs']}
+        assert statuses == {'orders': 'success', 'users': 'success', 'missing': 'failed', 'customers': 'success'}
+        assert self.table_ids('a_customers') == [1]
+        assert self.table_ids('a_orders') == [10, 11]
+        assert self.table_ids('b_users') == [5]
+    
+    def test_incremental_endpoint_resumes_from_committed_watermark(self):
+        """Test a second run only asks for records after the stored watermark"""
+        SyncRunner(self.config, apis=['a'], loader=self.loader).run()
+        SyncRunner(self.config, apis=['a'], loader=self.loader).run()
+        
+        queries = [query for path, query, _ in APIHandler.seen if path == '/a/orders']
+        assert 'updated_at_gte' not in queries[0]
+        assert 'updated_at_gte=2024-01-03T00%3A00%3A00' in queries[1]
+    
+    def test_validators_per_endpoint(self):
+        """Test an endpoint's validator rejects records before they are loaded"""
+        validator = SchemaValidator({'id': {'type': 'int', 'max': 10}})
+        SyncRunner(self.config, apis=['a'], loader=self.loader, validator={'a.orders': validator}).run()
+        
+        assert self.table_ids('a_orders') == [10]
+        assert self.table_ids('a_customers') == [1]
+        assert validator.stats['invalid'] == 1
+    
+    def test_memory_budget_is_shared(self):
+        """Test sync.memory_budget gives every endpoint one governor"""
+        self.config['sync'] = {'memory_budget': '64MB'}
+        result = SyncRunner(self.config, apis=['b'], loader=self.loader).run()
+        
+        assert result['memory']['budget_bytes'] == 64 * 2 ** 20
+        assert result['memory']['peak_bytes'] > 0
+    
+    def test_missing_environment_variable(self, monkeypatch):
+        """Test unset ${VAR} references are reported"""
+        monkeypatch.delenv('TEST_API_KEY')
+        with pytest.raises(ValueError, match='TEST_API_KEY'):
+            expand_env(self.config['apis']['a'])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])